@@ -26,7 +26,7 @@ def read_requirements():
 setup(
     name='flask-tsk',
     version='1.0.1',
-    description='Revolutionary Flask Extension for TuskLang Integration - Up to 59x Faster Template Rendering (Verified)',
+    description='Revolutionary Flask Extension for TuskLang Integration - Compiled Turbo Templates',
     long_description=read_readme(),
     long_description_content_type='text/markdown',
     author='Grim Development Team',
@@ -39,7 +39,7 @@ setup(
     install_requires=[
         'Flask>=2.0.0',
         'tusktsk>=2.0.3',
-        # Performance optimizations (59x faster rendering)
+        # Performance optimizations
         'orjson>=3.0.0',           # Ultra-fast JSON serialization
         'ujson>=5.0.0',            # Fast JSON parsing  
         'msgpack>=1.0.0',          # Binary data serialization
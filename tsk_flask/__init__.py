@@ -5,10 +5,19 @@ Provides seamless TuskLang configuration and function execution in Flask applica
 Includes FULL TuskLang SDK capabilities for maximum power and flexibility
 """
 
-from flask import Flask, current_app, g, request, jsonify
-from typing import Any, Dict, List, Optional, Union
+from __future__ import annotations
+
+from flask import Flask, current_app, g, has_app_context, request, jsonify
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Tuple, Union
+import copy
+import hashlib
+import importlib
+import json
 import logging
 import os
+import sys
+import threading
 
 try:
     import tusktsk
@@ -23,41 +32,81 @@ except ImportError:
     TUSK_VERSION = None
     logging.warning("tusktsk package not available. Install with: pip install tusktsk")
 
-# Import performance engine
-try:
-    from .performance_engine import (
-        TurboTemplateEngine, 
-        render_turbo_template, 
-        render_turbo_template_async,
-        optimize_flask_app,
-        get_performance_stats
-    )
-    PERFORMANCE_ENGINE_AVAILABLE = True
-except ImportError:
-    PERFORMANCE_ENGINE_AVAILABLE = False
-    logging.warning("Performance engine not available")
+# The performance engine and the elephants are imported on first use (PEP 562), so a worker
+# that only reads configuration does not load Jinja, WebSocket or image libraries at boot
+_LAZY_EXPORTS = {
+    'TurboTemplateEngine': 'performance_engine',
+    'render_turbo_template': 'performance_engine',
+    'render_turbo_template_async': 'performance_engine',
+    'stream_turbo_template': 'performance_engine',
+    'turbo_response': 'performance_engine',
+    'optimize_flask_app': 'performance_engine',
+    'get_performance_stats': 'performance_engine',
+    'get_turbo_engine': 'performance_engine',
+    'init_elephant_herd': 'elephants',
+    'get_elephant_herd': 'elephants',
+    'elephant_bp': 'elephant_routes',
+    'init_elephant_showcase': 'elephant_showcase',
+}
 
-# Elephant integration
-try:
-    from .elephants import init_elephant_herd, get_elephant_herd
-    from .elephant_routes import elephant_bp
-    from .elephant_showcase import init_elephant_showcase
-    
-    def init_elephants(app):
-        """Initialize elephant herd with Flask app"""
-        init_elephant_herd(app)
-        app.register_blueprint(elephant_bp)
-        init_elephant_showcase(app)
-        app.logger.info("🐘 Elephant integration complete!")
-    
-    ELEPHANTS_ENABLED = True
-except ImportError as e:
-    current_app.logger.warning(f"Elephants not available: {e}")
-    ELEPHANTS_ENABLED = False
-    
-    def init_elephants(app):
-        """Placeholder for elephant initialization"""
+# Availability flags, answered by importing the submodules they describe
+_LAZY_FLAGS = {
+    'PERFORMANCE_ENGINE_AVAILABLE': ('performance_engine',),
+    'ELEPHANTS_ENABLED': ('elephants', 'elephant_routes', 'elephant_showcase'),
+}
+
+# Config values handed out as they are; anything else is copied so readers cannot change the snapshot
+_IMMUTABLE_VALUES = (str, int, float, bool, bytes, type(None))
+
+# Submodule -> why it could not be imported, so a failed import is not retried on every call
+_UNAVAILABLE: Dict[str, str] = {}
+
+
+def _optional_module(name: str):
+    """Import a submodule on first use; None (logged once) when its dependencies are missing"""
+    if name in _UNAVAILABLE:
+        return None
+    try:
+        return importlib.import_module(f".{name}", __name__)
+    except ImportError as e:
+        _UNAVAILABLE[name] = str(e)
+        logging.warning(f"Flask-TSK: {name} not available: {e}")
+        return None
+
+
+def __getattr__(name: str) -> Any:
+    if name in _LAZY_EXPORTS:
+        value = getattr(importlib.import_module(f".{_LAZY_EXPORTS[name]}", __name__), name)
+    elif name in _LAZY_FLAGS:
+        value = all(_optional_module(module) is not None for module in _LAZY_FLAGS[name])
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(_LAZY_EXPORTS) | set(_LAZY_FLAGS))
+
+
+def get_tsk() -> Optional[FlaskTSK]:
+    """The FlaskTSK extension of the current app; None outside an app context or before init_app"""
+    if not has_app_context():
+        return None
+    return current_app.extensions.get('flask-tsk')
+
+
+def init_elephants(app):
+    """Initialize elephant herd with Flask app"""
+    modules = [_optional_module(name) for name in _LAZY_FLAGS['ELEPHANTS_ENABLED']]
+    if None in modules:
         app.logger.info("Elephants not available - skipping initialization")
+        return
+    elephants, elephant_routes, elephant_showcase = modules
+    elephants.init_elephant_herd(app)
+    app.register_blueprint(elephant_routes.elephant_bp)
+    elephant_showcase.init_elephant_showcase(app)
+    app.logger.info("🐘 Elephant integration complete!")
 
 
 class FlaskTSK:
@@ -67,6 +116,13 @@ class FlaskTSK:
         self.app = app
         self.tsk_instance: Optional[TSK] = None
         self.peanut_loaded = False
+        # Flattened, read-only copy of the configuration keyed by 'section.key'; writers replace it whole
+        self._config_snapshot: Mapping[str, Any] = MappingProxyType({})
+        self._config_version = 0
+        # (snapshot, fingerprint) of the last snapshot fingerprinted
+        self._fingerprinted: Optional[Tuple[Mapping[str, Any], str]] = None
+        self._config_write_lock = threading.Lock()
+        self._optimize_lock = threading.Lock()
         
         if app is not None:
             self.init_app(app)
@@ -81,6 +137,10 @@ class FlaskTSK:
         app.config.setdefault('TSK_ENABLE_BLUEPRINT', True)
         app.config.setdefault('TSK_ENABLE_CONTEXT', True)
         app.config.setdefault('TSK_ENABLE_FULL_SDK', True)  # Enable full TuskLang SDK
+        app.config.setdefault('TSK_TURBO_TEMPLATES', False)  # Serve app templates with the turbo engine
+        app.config.setdefault('TSK_JINJA_BYTECODE_CACHE', True)  # Share compiled Jinja bytecode on disk
+        app.config.setdefault('TSK_TEMPLATE_WARMUP', True)  # Load turbo templates at boot
+        app.config.setdefault('TSK_HOT_RELOAD', False)  # Apply template and .tsk edits in place
         
         # Initialize TuskLang if available
         if TUSK_AVAILABLE and app.config.get('TSK_AUTO_LOAD', True):
@@ -104,10 +164,32 @@ class FlaskTSK:
         # Add extension to app
         app.extensions['flask-tsk'] = self
         
-        # Apply performance optimizations if available
-        if PERFORMANCE_ENGINE_AVAILABLE:
-            optimize_flask_app(app)
-            current_app.logger.info("Flask-TSK: Performance optimizations applied")
+        # The performance engine is imported at boot only for the features that work at boot;
+        # otherwise the first request loads it, so workers that never serve one do not pay for it
+        if app.config.get('TSK_TURBO_TEMPLATES') or app.config.get('TSK_HOT_RELOAD'):
+            self._apply_performance_engine(app)
+        else:
+            app.before_request(self._apply_performance_engine_on_first_request)
+    
+    def _apply_performance_engine(self, app: Flask):
+        """Apply performance optimizations if available, once per app"""
+        with self._optimize_lock:
+            if hasattr(app, 'tsk_turbo_engine'):
+                return
+            performance_engine = _optional_module('performance_engine')
+            if performance_engine is None:
+                return
+            performance_engine.optimize_flask_app(app)
+            # Templates read the same configuration the app edits through set_config
+            if self.tsk_instance is not None:
+                performance_engine.get_turbo_engine().set_tsk(self.tsk_instance, self.config_fingerprint)
+            app.logger.info("Flask-TSK: Performance optimizations applied")
+    
+    def _apply_performance_engine_on_first_request(self):
+        """before_request handler deferring _apply_performance_engine to the first request"""
+        app = current_app._get_current_object()
+        if not hasattr(app, 'tsk_turbo_engine') and 'performance_engine' not in _UNAVAILABLE:
+            self._apply_performance_engine(app)
     
     def _initialize_tusk(self):
         """Initialize TuskLang integration"""
@@ -115,11 +197,12 @@ class FlaskTSK:
             # Try to load from peanu.tsk first
             self.tsk_instance = load_from_peanut()
             self.peanut_loaded = True
-            current_app.logger.info(f"Flask-TSK: Successfully loaded TuskLang configuration (tusktsk v{TUSK_VERSION})")
+            self.app.logger.info(f"Flask-TSK: Successfully loaded TuskLang configuration (tusktsk v{TUSK_VERSION})")
         except Exception as e:
-            current_app.logger.warning(f"Flask-TSK: Failed to load peanu.tsk: {e}")
+            self.app.logger.warning(f"Flask-TSK: Failed to load peanu.tsk: {e}")
             # Create empty TSK instance
             self.tsk_instance = TSK()
+        self.refresh_config()
     
     def _context_processor(self):
         """Context processor to make TSK available in templates"""
@@ -145,15 +228,62 @@ class FlaskTSK:
     # ===== CORE TUSKLANG SDK METHODS =====
     
     def get_config(self, section: str, key: str, default: Any = None) -> Any:
-        """Get configuration value from TuskLang"""
-        if not TUSK_AVAILABLE or not self.tsk_instance:
-            return default
-        
-        try:
-            return self.tsk_instance.get_value(section, key)
-        except Exception as e:
-            current_app.logger.warning(f"Flask-TSK: Failed to get config {section}.{key}: {e}")
-            return default
+        """
+        Get configuration value from TuskLang (a lookup in the current config snapshot)
+        Lists and dicts come back as copies, so changing them does not change the config
+        """
+        value = self._config_snapshot.get(f"{section}.{key}", default)
+        if isinstance(value, _IMMUTABLE_VALUES) or value is default:
+            return value
+        return copy.deepcopy(value)
+    
+    @property
+    def config_snapshot(self) -> Mapping[str, Any]:
+        """
+        Read-only view of every configuration value, keyed by 'section.key'
+        Only the mapping is read-only: nested lists and dicts are shared by every reader, so copy
+        them before changing them (get_config does)
+        """
+        return self._config_snapshot
+    
+    @property
+    def config_version(self) -> int:
+        """Incremented every time the config snapshot is rebuilt"""
+        return self._config_version
+    
+    @property
+    def config_fingerprint(self) -> str:
+        """Hash of the config snapshot's contents, equal across workers that loaded the same config"""
+        snapshot = self._config_snapshot
+        fingerprinted = self._fingerprinted
+        if fingerprinted is not None and fingerprinted[0] is snapshot:
+            return fingerprinted[1]
+        encoded = json.dumps(dict(snapshot), sort_keys=True, default=repr).encode('utf-8')
+        fingerprint = hashlib.sha256(encoded).hexdigest()
+        self._fingerprinted = (snapshot, fingerprint)
+        return fingerprint
+    
+    def refresh_config(self) -> int:
+        """
+        Rebuild the config snapshot from the TuskLang instance and return its version
+        Call after changing tsk_instance directly; set_config, load_config and delete_section do it themselves
+        """
+        with self._config_write_lock:
+            flattened = {}
+            if TUSK_AVAILABLE and self.tsk_instance:
+                for section, values in list(self.tsk_instance.data.items()):
+                    if not isinstance(values, dict):
+                        continue
+                    for key in list(values):
+                        try:
+                            # A copy, so later changes to the TuskLang instance cannot reach the snapshot
+                            flattened[f"{section}.{key}"] = copy.deepcopy(self.tsk_instance.get_value(section, key))
+                        except Exception as e:
+                            logging.warning(f"Flask-TSK: Failed to get config {section}.{key}: {e}")
+            # Readers hold whichever snapshot they fetched; replacing the reference is atomic
+            self._config_snapshot = MappingProxyType(flattened)
+            self._config_version += 1
+            return self._config_version
     
     def set_config(self, section: str, key: str, value: Any) -> bool:
         """Set configuration value in TuskLang"""
@@ -162,6 +292,8 @@ class FlaskTSK:
         
         try:
             self.tsk_instance.set_value(section, key, value)
+            self.refresh_config()
+            self._config_changed([section])
             return True
         except Exception as e:
             current_app.logger.error(f"Flask-TSK: Failed to set config {section}.{key}: {e}")
@@ -316,6 +448,22 @@ class FlaskTSK:
         """Check if TuskLang is available"""
         return TUSK_AVAILABLE and self.tsk_instance is not None
     
+    def _config_changed(self, sections: Optional[List[str]] = None):
+        """Drop cached turbo output that read changed sections; None means the whole config was replaced"""
+        # Nothing can have been cached by an engine that was never imported
+        performance_engine = sys.modules.get(f"{__name__}.performance_engine")
+        if performance_engine is None:
+            return
+        try:
+            engine = performance_engine.get_turbo_engine()
+            # Peers still on the old config keep rendering it; the fingerprint keeps their output out
+            if sections is None:
+                engine.set_tsk(self.tsk_instance, self.config_fingerprint)
+            else:
+                engine.invalidate_config_sections(sections, self.config_fingerprint)
+        except Exception as e:
+            current_app.logger.warning(f"Flask-TSK: Failed to invalidate cached output: {e}")
+    
     def get_status(self) -> Dict[str, Any]:
         """Get TuskLang integration status"""
         status = {
@@ -324,14 +472,14 @@ class FlaskTSK:
             'initialized': self.tsk_instance is not None,
             'peanut_loaded': self.peanut_loaded,
             'package_source': 'PyPI' if TUSK_AVAILABLE else 'None',
-            'performance_engine': PERFORMANCE_ENGINE_AVAILABLE,
+            'performance_engine': _optional_module('performance_engine') is not None,
             'full_sdk_enabled': TUSK_AVAILABLE
         }
         
         # Add performance stats if available
-        if PERFORMANCE_ENGINE_AVAILABLE:
+        if status['performance_engine']:
             try:
-                status['performance_stats'] = get_performance_stats()
+                status['performance_stats'] = _optional_module('performance_engine').get_performance_stats()
             except Exception as e:
                 status['performance_error'] = str(e)
         
@@ -356,6 +504,8 @@ class FlaskTSK:
         
         try:
             self.tsk_instance = TSK.from_file(filepath)
+            self.refresh_config()
+            self._config_changed()
             return True
         except Exception as e:
             current_app.logger.error(f"Flask-TSK: Failed to load config from {filepath}: {e}")
@@ -393,6 +543,8 @@ class FlaskTSK:
         try:
             if section in self.tsk_instance.data:
                 del self.tsk_instance.data[section]
+                self.refresh_config()
+                self._config_changed([section])
                 return True
             return False
         except Exception as e:
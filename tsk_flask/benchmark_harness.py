@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+"""
+TuskLang Benchmark Harness
+Repeatable timing with warmup, repeated runs, confidence intervals and baseline comparison
+"""
+
+import gc
+import json
+import math
+import os
+import platform
+import statistics
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+# Bumped when the JSON layout changes; compare refuses files it cannot read
+RESULTS_VERSION = 1
+
+# Two-sided 95% Student t critical values by degrees of freedom
+_T_95 = {
+    1: 12.706, 2: 4.303, 3: 3.182, 4: 2.776, 5: 2.571, 6: 2.447, 7: 2.365, 8: 2.306,
+    9: 2.262, 10: 2.228, 11: 2.201, 12: 2.179, 13: 2.160, 14: 2.145, 15: 2.131,
+    16: 2.120, 17: 2.110, 18: 2.101, 19: 2.093, 20: 2.086, 21: 2.080, 22: 2.074,
+    23: 2.069, 24: 2.064, 25: 2.060, 26: 2.056, 27: 2.052, 28: 2.048, 29: 2.045,
+    30: 2.042, 40: 2.021, 60: 2.000, 120: 1.980,
+}
+
+
+def t_critical(df: int) -> float:
+    """95% two-sided t value, rounded towards the next smaller tabulated df (conservative)"""
+    if df <= 0:
+        return float('inf')
+    if df in _T_95:
+        return _T_95[df]
+    if df > 120:
+        return 1.960
+    return _T_95[max(k for k in _T_95 if k <= df)]
+
+
+def percentile(ordered: List[float], q: float) -> float:
+    """Linear-interpolated percentile of an already sorted list"""
+    if not ordered:
+        return 0.0
+    position = (len(ordered) - 1) * q / 100
+    low = math.floor(position)
+    high = math.ceil(position)
+    return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+
+@dataclass
+class BenchmarkResult:
+    """Per-operation timings (seconds) of one scenario, one sample per run"""
+    name: str
+    samples: List[float]
+    number: int = 1
+    scenario: str = 'warm'
+    params: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def mean(self) -> float:
+        return statistics.fmean(self.samples)
+
+    @property
+    def stdev(self) -> float:
+        return statistics.stdev(self.samples) if len(self.samples) > 1 else 0.0
+
+    @property
+    def ci95(self) -> float:
+        """Half-width of the 95% confidence interval of the mean"""
+        if len(self.samples) < 2:
+            return float('inf')
+        return t_critical(len(self.samples) - 1) * self.stdev / math.sqrt(len(self.samples))
+
+    def summary(self) -> Dict[str, Any]:
+        """JSON-ready statistics, raw samples included so results can be re-analysed"""
+        ordered = sorted(self.samples)
+        ci95 = self.ci95
+        return {
+            "scenario": self.scenario,
+            "runs": len(self.samples),
+            "number": self.number,
+            "mean": self.mean,
+            "stdev": self.stdev,
+            "ci95_low": self.mean - ci95 if math.isfinite(ci95) else None,
+            "ci95_high": self.mean + ci95 if math.isfinite(ci95) else None,
+            "min": ordered[0],
+            "median": statistics.median(ordered),
+            "p90": percentile(ordered, 90),
+            "p95": percentile(ordered, 95),
+            "p99": percentile(ordered, 99),
+            "p999": percentile(ordered, 99.9),
+            "max": ordered[-1],
+            "ops_per_second": 1 / self.mean if self.mean > 0 else None,
+            "params": self.params,
+            "samples": self.samples,
+        }
+
+    def describe(self) -> str:
+        """One line for the console"""
+        ci95 = self.ci95
+        spread = f" ± {ci95 * 1e6:.2f}" if math.isfinite(ci95) else ""
+        ordered = sorted(self.samples)
+        return (f"{self.name:<44} {self.mean * 1e6:>11.2f}{spread} µs "
+                f"(median {statistics.median(ordered) * 1e6:.2f}, p99 {percentile(ordered, 99) * 1e6:.2f} µs, "
+                f"{len(self.samples)} runs, {self.scenario})")
+
+
+def _time_calls(func: Callable[[], Any], number: int) -> int:
+    """Nanoseconds taken by ``number`` back-to-back calls"""
+    start = time.perf_counter_ns()
+    for _ in range(number):
+        func()
+    return time.perf_counter_ns() - start
+
+
+def calibrate(func: Callable[[], Any], min_run_time: float) -> int:
+    """Smallest power-of-ten-ish call count whose run lasts at least min_run_time"""
+    number = 1
+    while True:
+        elapsed = _time_calls(func, number) / 1e9
+        if elapsed >= min_run_time or number >= 10 ** 7:
+            return number
+        # Aim a little past the target so the next try usually lands
+        number = max(number * 2, int(number * min_run_time * 1.2 / max(elapsed, 1e-9)))
+
+
+def measure(name: str, func: Callable[[], Any], setup: Optional[Callable[[], Any]] = None,
+            runs: int = 20, warmup: int = 3, number: Optional[int] = None,
+            min_run_time: float = 0.02, disable_gc: bool = True,
+            params: Optional[Dict[str, Any]] = None, scenario: Optional[str] = None) -> BenchmarkResult:
+    """
+    Time func over repeated runs and return per-call samples
+
+    Without ``setup`` this is a warm-cache measurement: after ``warmup`` untimed runs each
+    sample times ``number`` back-to-back calls (calibrated to ``min_run_time`` when None).
+    With ``setup`` it is a cold measurement: setup runs untimed before every single timed call,
+    so it can throw away whatever state the previous call left behind. ``scenario`` overrides
+    the label for work that is cold by construction, such as compiling on every call.
+    """
+    gc_was_enabled = gc.isenabled()
+    samples: List[float] = []
+    try:
+        if setup is not None:
+            number = 1
+            for _ in range(warmup):
+                setup()
+                func()
+            for _ in range(runs):
+                setup()
+                gc.collect()
+                if disable_gc:
+                    gc.disable()
+                try:
+                    samples.append(_time_calls(func, 1) / 1e9)
+                finally:
+                    if gc_was_enabled:
+                        gc.enable()
+        else:
+            for _ in range(warmup):
+                func()
+            if number is None:
+                number = calibrate(func, min_run_time)
+            for _ in range(runs):
+                gc.collect()
+                if disable_gc:
+                    gc.disable()
+                try:
+                    samples.append(_time_calls(func, number) / 1e9 / number)
+                finally:
+                    if gc_was_enabled:
+                        gc.enable()
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return BenchmarkResult(
+        name=name, samples=samples, number=number,
+        scenario=scenario or ('warm' if setup is None else 'cold'), params=dict(params or {})
+    )
+
+
+def measure_calls(name: str, func: Callable[[Any], Any], calls: int,
+                  setup: Optional[Callable[[int], Any]] = None,
+                  teardown: Optional[Callable[[Any], Any]] = None,
+                  warmup: int = 0, disable_gc: bool = False,
+                  params: Optional[Dict[str, Any]] = None, scenario: str = 'warm') -> BenchmarkResult:
+    """
+    Time every call on its own, so the samples are a latency distribution with real percentiles
+
+    ``setup(i)`` runs untimed before call i and its result is passed to func (i is passed when
+    there is no setup); ``teardown(value)`` runs untimed after it. The collector stays on by
+    default because its pauses are part of the latency callers see.
+    """
+    gc_was_enabled = gc.isenabled()
+    samples: List[float] = []
+    clock = time.perf_counter_ns
+    try:
+        for i in range(-warmup, calls):
+            value = setup(i) if setup is not None else i
+            if disable_gc:
+                gc.disable()
+            start = clock()
+            try:
+                func(value)
+            finally:
+                elapsed = clock() - start
+                if disable_gc and gc_was_enabled:
+                    gc.enable()
+            if teardown is not None:
+                teardown(value)
+            if i >= 0:
+                samples.append(elapsed / 1e9)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return BenchmarkResult(name=name, samples=samples, number=1, scenario=scenario, params=dict(params or {}))
+
+
+def environment_info() -> Dict[str, Any]:
+    """What the numbers were measured on"""
+    info = {
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "timestamp": time.time(),
+    }
+    for module in ('flask', 'jinja2'):
+        try:
+            from importlib.metadata import version
+            info[f"{module}_version"] = version(module)
+        except Exception:
+            pass
+    return info
+
+
+class BenchmarkSuite:
+    """Collects results, prints them as they arrive and writes them as JSON"""
+
+    def __init__(self, runs: int = 20, warmup: int = 3, min_run_time: float = 0.02, verbose: bool = True):
+        self.runs = runs
+        self.warmup = warmup
+        self.min_run_time = min_run_time
+        self.verbose = verbose
+        # Bound now so benchmarks that silence stdout around the code under test still report
+        self.stream = sys.stdout
+        self.results: Dict[str, BenchmarkResult] = {}
+        self.derived: Dict[str, Dict[str, Any]] = {}
+
+    def add(self, result: BenchmarkResult) -> BenchmarkResult:
+        """Record a result measured elsewhere"""
+        self.results[result.name] = result
+        if self.verbose:
+            print(f"  {result.describe()}", file=self.stream)
+        return result
+
+    def measure(self, name: str, func: Callable[[], Any], setup: Optional[Callable[[], Any]] = None,
+                **kwargs) -> BenchmarkResult:
+        """measure() with the suite's run settings"""
+        kwargs.setdefault('runs', self.runs)
+        kwargs.setdefault('warmup', self.warmup)
+        kwargs.setdefault('min_run_time', self.min_run_time)
+        return self.add(measure(name, func, setup=setup, **kwargs))
+
+    def measure_calls(self, name: str, func: Callable[[Any], Any], calls: Optional[int] = None,
+                      **kwargs) -> BenchmarkResult:
+        """measure_calls() with the suite's run count as the default number of calls"""
+        return self.add(measure_calls(name, func, calls if calls is not None else self.runs, **kwargs))
+
+    def note(self, message: str):
+        """Print a line alongside the results"""
+        if self.verbose:
+            print(message, file=self.stream)
+
+    def ratio(self, name: str, numerator: str, denominator: str) -> Dict[str, Any]:
+        """
+        Speedup of denominator over numerator (mean_numerator / mean_denominator) with a
+        95% interval propagated from both means' relative errors
+        """
+        slow = self.results[numerator]
+        fast = self.results[denominator]
+        value = slow.mean / fast.mean
+        relative = math.sqrt((slow.ci95 / slow.mean) ** 2 + (fast.ci95 / fast.mean) ** 2)
+        entry = {
+            "numerator": numerator,
+            "denominator": denominator,
+            "ratio": value,
+            "ci95_low": value * (1 - relative) if math.isfinite(relative) else None,
+            "ci95_high": value * (1 + relative) if math.isfinite(relative) else None,
+        }
+        self.derived[name] = entry
+        if self.verbose:
+            spread = f" ± {value * relative:.2f}" if math.isfinite(relative) else ""
+            print(f"  {name:<44} {value:>11.2f}{spread}x", file=self.stream)
+        return entry
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "version": RESULTS_VERSION,
+            "environment": environment_info(),
+            "settings": {"runs": self.runs, "warmup": self.warmup, "min_run_time": self.min_run_time},
+            "results": {name: result.summary() for name, result in self.results.items()},
+            "derived": self.derived,
+        }
+
+    def save(self, path: str) -> Dict[str, Any]:
+        """Write results as JSON and return what was written"""
+        data = self.to_dict()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=2)
+        return data
+
+
+def load_results(path: str) -> Dict[str, Any]:
+    """Read a results file written by BenchmarkSuite.save"""
+    with open(path, 'r') as f:
+        data = json.load(f)
+    if data.get('version') != RESULTS_VERSION:
+        raise ValueError(f"{path}: unsupported benchmark results version {data.get('version')}")
+    return data
+
+
+def compare_results(current: Dict[str, Any], baseline: Dict[str, Any],
+                    threshold: float = 0.10) -> List[Dict[str, Any]]:
+    """
+    Compare two results files benchmark by benchmark
+
+    A benchmark regressed when its mean is more than ``threshold`` slower than the baseline and
+    the two 95% intervals do not overlap, so noise alone does not fail a build. Improvements are
+    flagged the same way in the other direction.
+    """
+    rows = []
+    for name, now in current.get('results', {}).items():
+        before = baseline.get('results', {}).get(name)
+        if before is None:
+            rows.append({"name": name, "status": "new", "current": now['mean']})
+            continue
+        change = now['mean'] / before['mean'] - 1
+        separated = None not in (now['ci95_low'], now['ci95_high'], before['ci95_low'], before['ci95_high'])
+        status = 'unchanged'
+        if change > threshold and (not separated or now['ci95_low'] > before['ci95_high']):
+            status = 'regression'
+        elif change < -threshold and (not separated or now['ci95_high'] < before['ci95_low']):
+            status = 'improvement'
+        rows.append({
+            "name": name,
+            "status": status,
+            "baseline": before['mean'],
+            "current": now['mean'],
+            "change": change,
+        })
+    for name in baseline.get('results', {}):
+        if name not in current.get('results', {}):
+            rows.append({"name": name, "status": "missing", "baseline": baseline['results'][name]['mean']})
+    return rows
+
+
+def format_comparison(rows: List[Dict[str, Any]]) -> str:
+    """Console table of compare_results output"""
+    marks = {'regression': '❌', 'improvement': '✅', 'unchanged': '  ', 'new': '🆕', 'missing': '❓'}
+    lines = [f"   {'benchmark':<44} {'baseline µs':>12} {'current µs':>12} {'change':>8}"]
+    for row in rows:
+        baseline = f"{row['baseline'] * 1e6:.2f}" if 'baseline' in row else '-'
+        current = f"{row['current'] * 1e6:.2f}" if 'current' in row else '-'
+        change = f"{row['change'] * 100:+.1f}%" if 'change' in row else row['status']
+        lines.append(f"{marks[row['status']]} {row['name']:<44} {baseline:>12} {current:>12} {change:>8}")
+    return "\n".join(lines)
+
+
+def has_regressions(rows: List[Dict[str, Any]]) -> bool:
+    return any(row['status'] == 'regression' for row in rows)
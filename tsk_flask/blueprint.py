@@ -9,9 +9,21 @@ from flask import Blueprint, request, jsonify, current_app, g
 from typing import Any, Dict, List, Optional
 import logging
 
+from .http_cache import conditional, conditional_json
+from .render_cache import hash_bytes
+
 tsk_blueprint = Blueprint('tsk', __name__, url_prefix='/tsk')
 
 
+def _config_etag(**view_args) -> Optional[str]:
+    """Validator of a config read: the route and its arguments against the config's fingerprint"""
+    from . import get_tsk
+    tsk = get_tsk()
+    if not tsk or not tsk.tsk_instance:
+        return None
+    return hash_bytes(f"{request.endpoint}|{sorted(view_args.items())}|{tsk.config_fingerprint}".encode())
+
+
 @tsk_blueprint.route('/status', methods=['GET'])
 def get_status():
     """Get TuskLang integration status"""
@@ -19,10 +31,12 @@ def get_status():
         from . import get_tsk
         tsk = get_tsk()
         if tsk:
-            return jsonify({
+            # Polled by dashboards; unchanged status is answered with 304. The metrics window's
+            # age and the rate derived from it change on every call, so they stay out of the ETag
+            return conditional_json({
                 'success': True,
                 'data': tsk.get_status()
-            })
+            }, volatile=('total_time', 'renders_per_second'))
         else:
             return jsonify({
                 'success': False,
@@ -38,6 +52,7 @@ def get_status():
 
 
 @tsk_blueprint.route('/config/<section>', methods=['GET'])
+@conditional(_config_etag)
 def get_config_section(section: str):
     """Get entire configuration section"""
     try:
@@ -67,6 +82,7 @@ def get_config_section(section: str):
 
 
 @tsk_blueprint.route('/config/<section>/<key>', methods=['GET'])
+@conditional(_config_etag)
 def get_config_value(section: str, key: str):
     """Get specific configuration value"""
     try:
@@ -343,6 +359,7 @@ def load_tsk_data():
 
 
 @tsk_blueprint.route('/sections', methods=['GET'])
+@conditional(_config_etag)
 def list_sections():
     """List all available configuration sections"""
     try:
@@ -400,6 +417,7 @@ def delete_section(section: str):
 
 
 @tsk_blueprint.route('/sections/<section>/keys', methods=['GET'])
+@conditional(_config_etag)
 def get_section_keys(section: str):
     """Get all keys in a section"""
     try:
@@ -429,6 +447,7 @@ def get_section_keys(section: str):
 
 
 @tsk_blueprint.route('/sections/<section>/exists', methods=['GET'])
+@conditional(_config_etag)
 def check_section_exists(section: str):
     """Check if section exists"""
     try:
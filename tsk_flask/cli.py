@@ -339,6 +339,75 @@ def generate_manifest(project_path: str, output_file: str = None):
         for original, hashed in manifest.items():
             print(f"   {original} -> {hashed}")
 
+def warmup_templates(project_path: str, cache_dir: str = None, workers: int = 4):
+    """Precompile project templates so workers load them at boot"""
+    project_path = os.path.abspath(project_path)
+    
+    if not os.path.exists(project_path):
+        show_error_message(f"Project path does not exist: {project_path}")
+        sys.exit(1)
+    
+    template_dirs = [
+        os.path.join(project_path, name) for name in ('tsk', 'templates')
+        if os.path.isdir(os.path.join(project_path, name))
+    ]
+    if not template_dirs:
+        show_error_message(f"No tsk/ or templates/ directory in: {project_path}")
+        sys.exit(1)
+    
+    from .performance_engine import TurboTemplateEngine
+    
+    show_service_banner('peanuts', 'Template Warmup')
+    engine = TurboTemplateEngine(cache_dir=cache_dir, max_workers=workers)
+    try:
+        summary = engine.warmup(template_dirs)
+    finally:
+        engine.shutdown()
+    
+    print(f"\n📊 Warmup Results ({summary['time']:.2f}s):")
+    print(f"   Template files: {summary['files']}")
+    print(f"   Compiled: {summary['compiled']}")
+    print(f"   Loaded from cache: {summary['loaded']}")
+    if engine.persist_compiled:
+        print(f"   Artifacts: {engine.compiled_dir}")
+    else:
+        print(f"   Artifacts: not persisted, {engine.cache_dir} is not private to this user")
+    if summary['failed']:
+        print(f"   Left to Jinja: {len(summary['failed'])}")
+        for path, error in summary['failed'].items():
+            print(f"     📄 {os.path.relpath(path, project_path)}: {error}")
+
+def run_benchmarks(output: str = None, baseline: str = None, threshold: float = 0.10,
+                   runs: int = 20, quick: bool = False, suite_name: str = 'templates',
+                   only: list = None, max_growth: float = None) -> int:
+    """Run a benchmark suite, optionally failing on regressions against a baseline"""
+    from .benchmark_harness import BenchmarkSuite
+    from .performance_benchmark import PerformanceBenchmark, finish
+    
+    show_service_banner('peanuts', 'Benchmark')
+    suite = BenchmarkSuite(runs=5 if quick else runs, warmup=1 if quick else 3,
+                           min_run_time=0.005 if quick else 0.02)
+    if suite_name == 'elephants':
+        from .elephant_benchmark import ElephantBenchmark
+        ElephantBenchmark(suite, quick=quick).run(only)
+    elif suite_name == 'memory':
+        from .memory_benchmark import MemoryBenchmark, check_growth
+        MemoryBenchmark(suite, quick=quick).run(only)
+        return max(finish(suite, output), check_growth(suite, max_growth))
+    elif suite_name == 'imports':
+        from .import_benchmark import ImportBenchmark
+        ImportBenchmark(suite, quick=quick).run()
+    else:
+        PerformanceBenchmark(suite).run_comprehensive_benchmark(quick=quick)
+    return finish(suite, output, baseline, threshold)
+
+def run_load_test(argv: list) -> int:
+    """Load test tsk_blueprint and elephant_bp with concurrent clients"""
+    from .load_test import main as load_test_main
+    
+    show_service_banner('peanuts', 'Load Test')
+    return load_test_main(argv)
+
 def list_layouts(project_path: str):
     """List available layouts"""
     project_path = os.path.abspath(project_path)
@@ -374,6 +443,13 @@ Examples:
   flask-tsk watch my-project         # Watch assets for changes
   flask-tsk manifest my-project      # Generate asset manifest
   flask-tsk layouts my-project       # List available layouts
+  flask-tsk warmup my-project        # Precompile templates
+  flask-tsk benchmark -o base.json   # Benchmark rendering, save results
+  flask-tsk benchmark --compare base.json  # Fail on regressions
+  flask-tsk benchmark --suite elephants    # Search, jobs, security, WebSockets, CMS, config
+  flask-tsk benchmark --suite memory       # Retained memory growth per 100k operations
+  flask-tsk benchmark --suite imports      # Cold import time per submodule
+  flask-tsk load-test --clients 16 --duration 30  # Concurrent requests against /tsk and /api/elephants
         """
     )
     
@@ -441,6 +517,48 @@ Examples:
     layouts_parser = subparsers.add_parser('layouts', help='List available layouts')
     layouts_parser.add_argument('project_path', help='Project directory path')
     
+    # Warmup command
+    warmup_parser = subparsers.add_parser('warmup', help='Precompile templates for fast worker startup')
+    warmup_parser.add_argument('project_path', help='Project directory path')
+    warmup_parser.add_argument('--cache-dir', help='Turbo engine cache directory')
+    warmup_parser.add_argument('--workers', type=int, default=4,
+                             help='Parallel compile workers')
+    
+    # Benchmark command
+    benchmark_parser = subparsers.add_parser('benchmark', help='Benchmark template rendering, elephants, memory or imports')
+    benchmark_parser.add_argument('--suite', choices=['templates', 'elephants', 'memory', 'imports'], default='templates',
+                                help='What to benchmark')
+    benchmark_parser.add_argument('--only', nargs='+',
+                                choices=['heffalump', 'horton', 'satao', 'tantor', 'babar', 'peanuts', 'metrics', 'engine'],
+                                help='Elephants (or, with --suite memory, workloads) to benchmark')
+    benchmark_parser.add_argument('--output', '-o', help='Write results as JSON to this file')
+    benchmark_parser.add_argument('--compare', metavar='BASELINE',
+                                help='Compare against a saved results file, exit 1 on regressions')
+    benchmark_parser.add_argument('--threshold', type=float, default=0.10,
+                                help='Slowdown (fraction) that counts as a regression')
+    benchmark_parser.add_argument('--runs', type=int, default=20,
+                                help='Timed runs per benchmark')
+    benchmark_parser.add_argument('--quick', action='store_true',
+                                help='Fewer, shorter runs for a smoke test')
+    benchmark_parser.add_argument('--max-growth', type=float, metavar='BYTES',
+                                help='With --suite memory, exit 1 when a workload retains more per 100k operations')
+    
+    # Load test command
+    load_test_parser = subparsers.add_parser('load-test', help='Load test the TSK and elephant endpoints')
+    load_test_parser.add_argument('--route', action='append', dest='routes', metavar='[WEIGHT:]METHOD PATH',
+                                help='Route to include in the mix (repeatable)')
+    load_test_parser.add_argument('--clients', type=int, default=8, help='Concurrent clients')
+    load_test_parser.add_argument('--duration', type=float, default=10.0, help='Seconds to run')
+    load_test_parser.add_argument('--requests', type=int, help='Stop after this many requests instead')
+    load_test_parser.add_argument('--transport', choices=['inprocess', 'socket'], default='inprocess',
+                                help='Call the WSGI app directly or over a local socket')
+    load_test_parser.add_argument('--no-elephants', action='store_true', help='Only mount tsk_blueprint')
+    load_test_parser.add_argument('--output', '-o', help='Write results as JSON to this file')
+    load_test_parser.add_argument('--compare', metavar='BASELINE',
+                                help='Compare against a saved results file, exit 1 on regressions')
+    load_test_parser.add_argument('--threshold', type=float, default=0.10,
+                                help='Slowdown (fraction) that counts as a regression')
+    
     args = parser.parse_args()
     
     if not args.command:
@@ -483,6 +601,23 @@ Examples:
             generate_manifest(args.project_path, args.output)
         elif args.command == 'layouts':
             list_layouts(args.project_path)
+        elif args.command == 'warmup':
+            warmup_templates(args.project_path, args.cache_dir, args.workers)
+        elif args.command == 'benchmark':
+            sys.exit(run_benchmarks(args.output, args.compare, args.threshold, args.runs, args.quick,
+                                    args.suite, args.only, args.max_growth))
+        elif args.command == 'load-test':
+            argv = ['--clients', str(args.clients), '--duration', str(args.duration),
+                    '--transport', args.transport, '--threshold', str(args.threshold)]
+            for spec in args.routes or []:
+                argv += ['--route', spec]
+            for flag, value in (('--requests', args.requests), ('--output', args.output),
+                                ('--compare', args.compare)):
+                if value is not None:
+                    argv += [flag, str(value)]
+            if args.no_elephants:
+                argv.append('--no-elephants')
+            sys.exit(run_load_test(argv))
         else:
             show_error_message(f"Unknown command: {args.command}")
             sys.exit(1)
@@ -0,0 +1,422 @@
+#!/usr/bin/env python3
+"""
+TuskLang Elephant Benchmarks
+Throughput and latency percentiles for search, jobs, security middleware, WebSockets and CMS
+
+    python -m tsk_flask.elephant_benchmark --output elephants.json
+    python -m tsk_flask.elephant_benchmark --only heffalump --sizes 10000 100000
+"""
+
+import argparse
+import asyncio
+import contextlib
+import gzip
+import importlib
+import json
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+from flask import Flask
+
+try:
+    from .benchmark_harness import BenchmarkSuite
+    from .performance_benchmark import finish
+except ImportError:
+    from benchmark_harness import BenchmarkSuite
+    from performance_benchmark import finish
+
+# Vocabulary for synthetic product names, story titles and search queries
+WORDS = (
+    'alpine', 'amber', 'atlas', 'banyan', 'basalt', 'beacon', 'birch', 'canyon', 'cedar', 'cobalt',
+    'comet', 'coral', 'delta', 'dune', 'ember', 'fern', 'fjord', 'flint', 'garnet', 'glacier',
+    'granite', 'harbor', 'hazel', 'heron', 'indigo', 'iris', 'jade', 'juniper', 'kelp', 'lagoon',
+    'lantern', 'linden', 'lotus', 'maple', 'meadow', 'mesa', 'nebula', 'nimbus', 'oasis', 'onyx',
+    'orchid', 'pebble', 'pine', 'prairie', 'quartz', 'quill', 'raven', 'reef', 'sable', 'sage',
+    'savanna', 'sequoia', 'sierra', 'slate', 'spruce', 'summit', 'tundra', 'umber', 'valley', 'willow',
+)
+
+SUBSYSTEMS = ('heffalump', 'horton', 'satao', 'tantor', 'babar', 'peanuts')
+
+
+class SyntheticData:
+    """Deterministic generators for benchmark inputs, so runs compare like with like"""
+
+    def __init__(self, seed: int = 42):
+        self.random = random.Random(seed)
+
+    def phrase(self, words: int = 3) -> str:
+        return ' '.join(self.random.choice(WORDS) for _ in range(words))
+
+    def typo(self, text: str) -> str:
+        """The text with one letter replaced, as a user would mistype it"""
+        positions = [i for i, c in enumerate(text) if c.isalpha()]
+        i = self.random.choice(positions)
+        replacement = self.random.choice([c for c in 'abcdefghijklmnopqrstuvwxyz' if c != text[i]])
+        return text[:i] + replacement + text[i + 1:]
+
+    def search_items(self, count: int) -> Iterator[Dict[str, Any]]:
+        for i in range(count):
+            yield {
+                'id': f"item-{i}",
+                'content': self.phrase(self.random.randint(1, 3)),
+                'metadata': {'category': self.random.choice(WORDS)},
+            }
+
+    def job_payload(self, i: int) -> Dict[str, Any]:
+        return {'user_id': i, 'email': f"user{i}@example.com", 'template': self.random.choice(WORDS)}
+
+    def client_ip(self, i: int) -> str:
+        """A distinct public address per i (up to 65536), so per-IP limits do not kick in"""
+        return f"203.0.{(i >> 8) & 255}.{i & 255}"
+
+    def config_sections(self, count: int, keys: int = 10) -> Dict[str, Dict[str, str]]:
+        """A peanu.tsk-shaped configuration: count sections of string values"""
+        config = {
+            'database': {'host': 'db.internal', 'port': '5432', 'name': 'herd'},
+            'app': {'name': 'Benchmark', 'env': 'production', 'debug': 'false'},
+        }
+        for i in range(count):
+            config[f"{self.random.choice(WORDS)}_{i}"] = {f"key_{j}": self.phrase(2) for j in range(keys)}
+        return config
+
+    def story_rows(self, count: int) -> Iterator[tuple]:
+        now = int(time.time())
+        for i in range(count):
+            title = self.phrase(4).title()
+            body = ' '.join(self.phrase(8) for _ in range(20))
+            updated = now - self.random.randint(0, 86400 * 365)
+            yield (
+                f"story-{i}", title, f"{title.lower().replace(' ', '-')}-{i}", body, body[:160],
+                self.random.choice(('post', 'page', 'news')),
+                self.random.choice(('draft', 'published', 'published', 'published')),
+                self.random.randint(1, 50), updated - 3600, updated,
+                self.random.choice(('en', 'en', 'fr', 'de')), '[]', '{}',
+            )
+
+
+@contextlib.contextmanager
+def quiet():
+    """Send the elephants' console chatter to /dev/null (printing still costs what it costs)"""
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+def load_elephant(module: str):
+    """Import an elephant module; raises when its optional dependencies are missing"""
+    return importlib.import_module(f"{__package__ or 'tsk_flask'}.herd.elephants.{module}")
+
+
+class ElephantBenchmark:
+    """Synthetic workloads for each elephant subsystem, reported through a BenchmarkSuite"""
+
+    def __init__(self, suite: Optional[BenchmarkSuite] = None, quick: bool = False,
+                 workdir: Optional[str] = None):
+        self.suite = suite or BenchmarkSuite()
+        self.quick = quick
+        self.data = SyntheticData()
+        # Databases, logs and lock files the elephants write go here, not into the project
+        self._own_workdir = workdir is None
+        self.workdir = workdir or tempfile.mkdtemp(prefix='tsk_elephant_benchmark_')
+        # Elephants are loaded and configured inside an application, as they are in production
+        self.app = Flask('elephant_benchmark')
+        self.app.config.update(
+            SATAO_DB_PATH=self._path('satao.db'),
+            SATAO_LOG_FILE=self._path('logs/satao.log'),
+            SATAO_PEANUTS_FILE=self._path('.peanuts'),
+        )
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.workdir, name)
+
+    # ===== HEFFALUMP =====
+
+    def benchmark_heffalump(self, sizes: Optional[List[int]] = None):
+        """Fuzzy search latency against index size, for typo'd and exact queries"""
+        heffalump_module = load_elephant('heffalump')
+        sizes = sizes or ([1000, 10000] if self.quick else [10000, 100000, 1000000])
+        backend = 'jellyfish' if heffalump_module.JELLYFISH_AVAILABLE else 'pure Python'
+        self.suite.note(f"   Levenshtein backend: {backend}")
+
+        for size in sizes:
+            with quiet():
+                heffalump = heffalump_module.Heffalump(f"benchmark_{size}")
+                heffalump.bulk_index(self.data.search_items(size))
+            contents = [item['content'] for item in heffalump.search_index]
+            # Every query scans the whole index, so big indexes get fewer of them
+            calls = max(3, min(self.suite.runs, self.suite.runs * 10000 // size))
+            warmup = 1 if size <= 10000 else 0
+            params = {'index_size': size, 'levenshtein': backend}
+
+            fuzzy = [self.data.typo(self.data.random.choice(contents)) for _ in range(calls + warmup)]
+            exact = [self.data.random.choice(contents) for _ in range(calls + warmup)]
+            with quiet():
+                self.suite.measure_calls(
+                    f"heffalump.hunt.fuzzy[{size}]", heffalump.hunt, calls,
+                    setup=lambda i: fuzzy[i + warmup], warmup=warmup, params=params
+                )
+                self.suite.measure_calls(
+                    f"heffalump.hunt.exact[{size}]", heffalump.hunt, calls,
+                    setup=lambda i: exact[i + warmup], warmup=warmup, params=params
+                )
+            del heffalump, contents
+
+    # ===== HORTON =====
+
+    def benchmark_horton(self, jobs: Optional[int] = None):
+        """Dispatch and process throughput with a trivial handler, so queue overhead is what is measured"""
+        horton_module = load_elephant('horton')
+        jobs = jobs or (200 if self.quick else 2000)
+
+        with quiet():
+            horton = horton_module.Horton(db_path=self._path('horton.db'))
+            horton.register('benchmark', lambda data: data['user_id'])
+        worker_id = 'benchmark_worker'
+        params = {'jobs': jobs}
+
+        try:
+            with quiet():
+                self.suite.measure_calls(
+                    f"horton.dispatch[{jobs}]",
+                    lambda i: horton.dispatch('benchmark', self.data.job_payload(i)),
+                    jobs, params=params
+                )
+                # The loop process() runs, without its idle sleep
+                self.suite.measure_calls(
+                    f"horton.process[{jobs}]",
+                    lambda i: horton._execute_job(horton._get_next_job(), worker_id),
+                    jobs, params=params
+                )
+        finally:
+            if hasattr(horton, '_db_connection'):
+                horton._db_connection.close()
+
+        for name in (f"horton.dispatch[{jobs}]", f"horton.process[{jobs}]"):
+            result = self.suite.results[name]
+            self.suite.note(f"   {name}: {1 / result.mean:,.0f} jobs/s on one worker")
+
+    # ===== SATAO =====
+
+    def benchmark_satao(self, requests: Optional[int] = None):
+        """Per-request cost of the security middleware on clean, trusted and hostile traffic"""
+        satao_module = load_elephant('satao')
+
+        requests = requests or (500 if self.quick else 5000)
+        app = self.app
+        satao = satao_module.Satao(app)
+        headers = {
+            'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64) Firefox/128.0',
+            'Accept': 'text/html,application/xhtml+xml',
+            'Accept-Language': 'en-US,en;q=0.5',
+            'Cookie': 'session=abc123; theme=dark',
+        }
+
+        def request_context(path: str, ip: str):
+            def setup(i):
+                context = app.test_request_context(
+                    path.format(i=i), headers=headers, environ_base={'REMOTE_ADDR': ip.format(i=i)}
+                )
+                context.push()
+                return context
+            return setup
+
+        scenarios = (
+            ('clean', '/stories?page={i}&sort=recent', None),
+            ('trusted', '/stories?page={i}&sort=recent', '127.0.0.1'),
+            # Every hostile request comes from a new address and gets it blocked
+            ('sql_injection', "/search?q=1' or 1=1 union select password from users--&n={i}", None),
+        )
+        for label, path, ip in scenarios:
+            ips = [ip or self.data.client_ip(i) for i in range(requests)]
+            self.suite.measure_calls(
+                f"satao.monitor_request.{label}",
+                lambda context: satao.monitor_request(),
+                requests,
+                setup=lambda i, path=path, ips=ips: request_context(path, ips[i])(i),
+                teardown=lambda context: context.pop(),
+                params={'requests': requests}
+            )
+        self.suite.note(f"   detected_threats after run: {len(satao.detected_threats)}, "
+                        f"rate_limits tracked: {len(satao.rate_limits)}")
+
+    # ===== TANTOR =====
+
+    def benchmark_tantor(self, fanouts: Optional[List[int]] = None):
+        """Broadcast fan-out cost to N simulated clients: queueing, then delivery"""
+        tantor_module = load_elephant('tantor')
+        fanouts = fanouts or ([10, 100, 1000] if self.quick else [10, 100, 1000, 10000])
+
+        class SimulatedSocket:
+            """Accepts frames like a connected client without any I/O"""
+            __slots__ = ('frames',)
+
+            def __init__(self):
+                self.frames = 0
+
+            async def send(self, frame):
+                self.frames += 1
+
+        loop = asyncio.new_event_loop()
+        try:
+            for fanout in fanouts:
+                with quiet():
+                    tantor = tantor_module.Tantor(port=0, host='127.0.0.1')
+                now = time.time()
+                for i in range(fanout):
+                    client_id = f"client_{i}"
+                    tantor.connections[client_id] = tantor_module.Connection(
+                        client_id=client_id, websocket=SimulatedSocket(), handshake_complete=True,
+                        last_ping=now, joined_at=now, channels=['jungle']
+                    )
+                    tantor.channels['jungle'].subscribers.append(client_id)
+
+                payload = {'story': self.data.phrase(6), 'likes': 42}
+                calls = max(5, min(self.suite.runs, self.suite.runs * 1000 // fanout))
+                params = {'clients': fanout}
+
+                def broadcast(_):
+                    loop.run_until_complete(tantor.broadcast('jungle', 'story_published', payload))
+
+                async def drain():
+                    # What _process_message_queue does per message, minus its 10ms sleep
+                    while tantor.message_queue:
+                        queued = tantor.message_queue.pop(0)
+                        await tantor._deliver_message(queued['to'], queued['payload'])
+
+                def fill(_):
+                    with quiet():
+                        broadcast(None)
+
+                with quiet():
+                    self.suite.measure_calls(
+                        f"tantor.broadcast[{fanout}]", broadcast, calls,
+                        setup=lambda i: tantor.message_queue.clear(), params=params
+                    )
+                    self.suite.measure_calls(
+                        f"tantor.deliver[{fanout}]", lambda _: loop.run_until_complete(drain()), calls,
+                        setup=fill, params=params
+                    )
+                # The real delivery loop sleeps 10ms after every message
+                self.suite.note(f"   {fanout} clients: delivery loop sleeps alone add {fanout * 0.01:.2f}s per broadcast")
+        finally:
+            loop.close()
+
+    # ===== BABAR =====
+
+    def benchmark_babar(self, sizes: Optional[List[int]] = None):
+        """Library listing latency on large content tables: first page, deep page, filters, search"""
+        babar_module = load_elephant('babar')
+        sizes = sizes or ([1000, 10000] if self.quick else [10000, 100000])
+
+        for size in sizes:
+            db_path = self._path(f"babar_{size}.db")
+            with quiet():
+                babar = babar_module.Babar(db_path=db_path)
+            with sqlite3.connect(db_path) as conn:
+                conn.executemany(
+                    'INSERT INTO babar_content (id, title, slug, content, excerpt, type, status, author_id, '
+                    'created_at, updated_at, language, components, settings) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    self.data.story_rows(size)
+                )
+
+            scenarios = (
+                ('first_page', {}),
+                ('deep_page', {'page': max(1, size // 40)}),
+                ('published_posts', {'type': 'post', 'status': 'published'}),
+                ('search', {'search': self.data.random.choice(WORDS)}),
+            )
+            calls = max(5, min(self.suite.runs, self.suite.runs * 10000 // size))
+            for label, filters in scenarios:
+                self.suite.measure_calls(
+                    f"babar.get_library.{label}[{size}]", lambda _, filters=filters: babar.get_library(filters),
+                    calls, warmup=1, params={'rows': size, 'filters': filters}
+                )
+
+    # ===== PEANUTS =====
+
+    def benchmark_peanuts(self, sizes: Optional[List[int]] = None):
+        """Config load time against section count: gzip JSON .pnt (v1) vs the mapped sectioned .pnt (v2)"""
+        peanuts_module = load_elephant('peanuts')
+        sizes = sizes or ([100, 1000] if self.quick else [100, 1000, 10000])
+        with quiet():
+            peanuts = peanuts_module.Peanuts.get_instance()
+
+        for size in sizes:
+            config = self.data.config_sections(size)
+            v1_path, v2_path = self._path(f"v1_{size}.pnt"), self._path(f"v2_{size}.pnt")
+            # The format compile() wrote before version 2
+            compressed = gzip.compress(json.dumps(config, separators=(',', ':')).encode('utf-8'), 9)
+            with open(v1_path, 'wb') as f:
+                f.write(b'PNUT' + len(compressed).to_bytes(4, 'big') + compressed)
+            peanuts_module.PeanutConfig.write(config, v2_path)
+
+            # Exporting every key to os.environ costs the same for both formats, so leave it out
+            def load(path):
+                peanuts.crack_binary(path, export_env=False)
+                return peanuts.get_config_value('app.name')
+
+            calls = max(5, min(self.suite.runs, self.suite.runs * 1000 // size))
+            params = {'sections': size, 'keys': size * 10}
+            for label, path in (('v1_gzip_json', v1_path), ('v2_sectioned', v2_path)):
+                self.suite.measure_calls(
+                    f"peanuts.crack_binary.{label}[{size}]", lambda _, path=path: load(path), calls,
+                    warmup=1, params={**params, 'bytes': os.path.getsize(path)}
+                )
+            self.suite.ratio(f"peanuts.load_speedup[{size}]",
+                             f"peanuts.crack_binary.v1_gzip_json[{size}]", f"peanuts.crack_binary.v2_sectioned[{size}]")
+
+    def run(self, only: Optional[List[str]] = None, sizes: Optional[List[int]] = None):
+        """Run every (or the named) subsystem benchmark; one that cannot run is reported and skipped"""
+        print("🐘 TuskLang Elephant Benchmarks")
+        print("=" * 50)
+        print(f"   per-call latency, mean ± 95% CI, workdir {self.workdir}")
+
+        try:
+            with self.app.app_context():
+                self._run(only, sizes)
+        finally:
+            self.close()
+        return self.suite.results
+
+    def _run(self, only: Optional[List[str]], sizes: Optional[List[int]]):
+        for name in only or SUBSYSTEMS:
+            print(f"\n📊 {name.title()}")
+            print("-" * 30)
+            kwargs = {'sizes': sizes} if sizes and name in ('heffalump', 'babar', 'peanuts') else {}
+            try:
+                getattr(self, f"benchmark_{name}")(**kwargs)
+            except Exception as e:
+                print(f"   ⏭️  {name} skipped: {type(e).__name__}: {e}")
+
+    def close(self):
+        if self._own_workdir:
+            shutil.rmtree(self.workdir, ignore_errors=True)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the elephant benchmarks"""
+    parser = argparse.ArgumentParser(description="Benchmark the elephant subsystems")
+    parser.add_argument('--only', nargs='+', choices=SUBSYSTEMS, help='Subsystems to benchmark')
+    parser.add_argument('--sizes', nargs='+', type=int,
+                        help='Index sizes for heffalump, table sizes for babar, section counts for peanuts')
+    parser.add_argument('--output', '-o', help='Write results as JSON to this file')
+    parser.add_argument('--compare', metavar='BASELINE', help='Compare against a saved results file')
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help='Slowdown (fraction) that counts as a regression when intervals do not overlap')
+    parser.add_argument('--runs', type=int, default=20, help='Calls per benchmark at the smallest size')
+    parser.add_argument('--quick', action='store_true', help='Small sizes for a smoke test')
+    args = parser.parse_args(argv)
+
+    suite = BenchmarkSuite(runs=5 if args.quick else args.runs)
+    ElephantBenchmark(suite, quick=args.quick).run(args.only, args.sizes)
+    return finish(suite, args.output, args.compare, args.threshold)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
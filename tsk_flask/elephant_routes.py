@@ -12,6 +12,8 @@ import time
 from datetime import datetime
 import json
 
+from .http_cache import conditional_json
+
 # Create elephant blueprint
 elephant_bp = Blueprint('elephants', __name__, url_prefix='/api/elephants')
 
@@ -22,10 +24,11 @@ def get_herd_status():
         from .elephants import get_elephant_herd
         herd = get_elephant_herd()
         status = herd.get_herd_status()
-        return jsonify({
+        # Polled by dashboards; the timestamp alone changing still answers 304
+        return conditional_json({
             'success': True,
             'data': status
-        })
+        }, volatile=('timestamp',))
     except Exception as e:
         return jsonify({
             'success': False,
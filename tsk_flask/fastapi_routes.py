@@ -11,6 +11,7 @@ from pydantic import BaseModel, Field
 import asyncio
 
 from grim_core.tusktsk import get_tusk_api, GrimTuskAPI
+from .performance_engine import get_turbo_engine
 
 # Create router
 router = APIRouter(prefix="/tusktsk", tags=["TuskLang Integration"])
@@ -33,6 +34,10 @@ class OperatorRequest(BaseModel):
     expression: str = Field(..., description="Expression to evaluate")
     context: Dict[str, Any] = Field(default={}, description="Execution context")
 
+class RenderRequest(BaseModel):
+    name: str = Field(..., description="Name of a template in the turbo engine's template directories")
+    context: Dict[str, Any] = Field(default={}, description="Template context")
+
 class ConfigResponse(BaseModel):
     success: bool = Field(..., description="Operation success status")
     data: Dict[str, Any] = Field(..., description="Response data")
@@ -176,6 +181,32 @@ async def execute_operator(
         )
 
 
+@router.post("/render", response_model=ConfigResponse)
+async def render_template(request: RenderRequest) -> ConfigResponse:
+    """Render a server-side turbo template by name without blocking the event loop"""
+    try:
+        engine = get_turbo_engine()
+        # Only templates already on the server are rendered: compiled template source runs as Python
+        source = engine.load_template_source(request.name)
+        if source is None:
+            return ConfigResponse(
+                success=False,
+                data={},
+                error=f"Template not found: {request.name}"
+            )
+        html = await engine.render_template_async(source, request.context)
+        return ConfigResponse(
+            success=True,
+            data={'html': html}
+        )
+    except Exception as e:
+        return ConfigResponse(
+            success=False,
+            data={},
+            error=str(e)
+        )
+
+
 @router.get("/database", response_model=ConfigResponse)
 async def get_database_config(
     tusk_api: GrimTuskAPI = Depends(get_tusk_api_dependency)
@@ -64,8 +64,12 @@ class Herd:
     
     def load_configuration(self):
         """Load Herd configuration from TuskLang"""
+        tsk = get_tsk()
+        if tsk is None:
+            # Imported outside an app (or before FlaskTSK is set up): use the default guards
+            self._guards = ['web', 'api', 'admin']
+            return
         try:
-            tsk = get_tsk()
             config = tsk.get_config('herd', 'config', self.get_default_config())
             if isinstance(config, str):
                 config = json.loads(config)
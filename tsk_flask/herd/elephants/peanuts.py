@@ -29,11 +29,15 @@ FEATURES:
 
 import os
 import json
+import mmap
+import struct
+import tempfile
 import time
 import gzip
 import hashlib
 import configparser
-from typing import Dict, List, Optional, Any, Union
+from collections.abc import Mapping, MutableMapping
+from typing import Dict, Iterator, List, Optional, Any, Tuple, Union
 from dataclasses import dataclass, asdict
 from enum import Enum
 from pathlib import Path
@@ -49,6 +53,13 @@ except ImportError:
     Memory = None
     TuskDb = None
 
+# Optional imports for advanced features
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
 
 class PerformanceMode(Enum):
     """Performance modes"""
@@ -71,6 +82,157 @@ class PerformanceMetrics:
     performance_score: float
 
 
+# Sectioned binary format (.pnt version 2):
+#   header   magic 'PNTS', version u16, codec u8, pad, section count u32, names length u32, env length u32
+#   ends     per section, where its payload ends (u32, relative to the first payload)
+#   names    section names, UTF-8, NUL-separated
+#   payloads one JSON or msgpack document per section, uncompressed so pages map straight in
+#   env      the environment exports, 'KEY\0value\0...' (values cannot contain NUL anyway)
+# Opening reads the header, one array and one string, so it stays cheap with thousands of sections.
+# Version 1 files ('PNUT' + length + gzip JSON of everything) are still read.
+PNT_MAGIC = b'PNTS'
+PNT_VERSION = 2
+PNT_CODEC_JSON = 0
+PNT_CODEC_MSGPACK = 1
+_PNT_HEADER = struct.Struct('>4sHBxIII')
+_UNDECODED = object()
+
+
+def _encode_section(codec: int, value: Any) -> bytes:
+    if codec == PNT_CODEC_MSGPACK:
+        return msgpack.packb(value, use_bin_type=True)
+    return json.dumps(value, separators=(',', ':')).encode('utf-8')
+
+
+def _decode_section(codec: int, payload: bytes) -> Any:
+    if codec == PNT_CODEC_MSGPACK:
+        return msgpack.unpackb(payload, raw=False)
+    return json.loads(payload)
+
+
+class PeanutConfig(MutableMapping):
+    """
+    Configuration backed by a memory-mapped .pnt file
+    Only the section table is read on open; each section is decoded the first time it is accessed.
+    Workers mapping the same file share its pages through the OS page cache.
+    """
+    
+    def __init__(self, buffer: mmap.mmap, codec: int, names: List[str], ends: Tuple[int, ...],
+                 payload_offset: int):
+        self._buffer = buffer
+        self._codec = codec
+        self._positions = dict(zip(names, range(len(names))))
+        self._ends = ends
+        self._payload_offset = payload_offset
+        self._sections: Dict[str, Any] = dict.fromkeys(names, _UNDECODED)
+        self._lock = threading.Lock()
+    
+    @classmethod
+    def open(cls, path: str) -> 'PeanutConfig':
+        """Map a version 2 .pnt file; raises ValueError when it is not one"""
+        with open(path, 'rb') as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version, codec, count, names_length, _ = _PNT_HEADER.unpack_from(buffer, 0)
+            if magic != PNT_MAGIC or version != PNT_VERSION:
+                raise ValueError(f"{path} is not a version {PNT_VERSION} .pnt file")
+            if codec == PNT_CODEC_MSGPACK and not MSGPACK_AVAILABLE:
+                raise ValueError(f"{path} was compiled with msgpack; install it with: pip install msgpack")
+            
+            ends = struct.unpack_from(f'>{count}I', buffer, _PNT_HEADER.size)
+            names_offset = _PNT_HEADER.size + 4 * count
+            names = buffer[names_offset:names_offset + names_length].decode('utf-8').split('\0') if count else []
+            if len(names) != count:
+                raise ValueError(f"expected {count} section names, found {len(names)}")
+        except (struct.error, UnicodeDecodeError, ValueError) as e:
+            buffer.close()
+            raise ValueError(f"Corrupt .pnt file {path}: {e}") from e
+        return cls(buffer, codec, names, ends, names_offset + names_length)
+    
+    @staticmethod
+    def write(config: Mapping, path: str, codec: Optional[int] = None):
+        """Write config as a version 2 .pnt file, replacing any existing file atomically"""
+        if codec is None:
+            codec = PNT_CODEC_MSGPACK if MSGPACK_AVAILABLE else PNT_CODEC_JSON
+        names = [str(name) for name in config]
+        if any('\0' in name for name in names):
+            raise ValueError("Section names cannot contain NUL")
+        payloads = [_encode_section(codec, value) for value in config.values()]
+        ends, end = [], 0
+        for payload in payloads:
+            end += len(payload)
+            ends.append(end)
+        names_blob = '\0'.join(names).encode('utf-8')
+        environment = '\0'.join(
+            f"{key}\0{value}" for key, value in Peanuts.environment_for(config).items()
+        ).encode('utf-8')
+        
+        # Workers may have the old file mapped: write a new inode rather than rewriting pages under them
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, temp_path = tempfile.mkstemp(prefix='.pnt_', dir=directory)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(_PNT_HEADER.pack(PNT_MAGIC, PNT_VERSION, codec, len(names), len(names_blob), len(environment)))
+                f.write(struct.pack(f'>{len(ends)}I', *ends))
+                f.write(names_blob)
+                f.write(b''.join(payloads))
+                f.write(environment)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+    
+    def environment(self) -> Dict[str, str]:
+        """The environment exports computed at compile time, without decoding any section"""
+        length = _PNT_HEADER.unpack_from(self._buffer, 0)[-1]
+        if not length:
+            return {}
+        offset = self._payload_offset + (self._ends[-1] if self._ends else 0)
+        parts = self._buffer[offset:offset + length].decode('utf-8').split('\0')
+        return dict(zip(parts[::2], parts[1::2]))
+    
+    @property
+    def decoded_sections(self) -> int:
+        return sum(1 for value in self._sections.values() if value is not _UNDECODED)
+    
+    def __getitem__(self, name: str) -> Any:
+        value = self._sections[name]
+        if value is _UNDECODED:
+            with self._lock:
+                value = self._sections[name]
+                if value is _UNDECODED:
+                    position = self._positions[name]
+                    start = self._payload_offset + (self._ends[position - 1] if position else 0)
+                    end = self._payload_offset + self._ends[position]
+                    value = _decode_section(self._codec, self._buffer[start:end])
+                    self._sections[name] = value
+        return value
+    
+    def __setitem__(self, name: str, value: Any):
+        with self._lock:
+            self._sections[name] = value
+    
+    def __delitem__(self, name: str):
+        with self._lock:
+            del self._sections[name]
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._sections))
+    
+    def __len__(self) -> int:
+        return len(self._sections)
+    
+    def __contains__(self, name: object) -> bool:
+        return name in self._sections
+    
+    def copy(self) -> Dict[str, Any]:
+        """A plain dict of every section (decodes whatever has not been yet)"""
+        return dict(self.items())
+    
+    def __repr__(self) -> str:
+        return f"<PeanutConfig {len(self)} sections, {self.decoded_sections} decoded>"
+
+
 class Peanuts:
     """Peanuts - The Configuration & Performance Elephant (Python Edition)"""
     
@@ -502,15 +664,19 @@ class Peanuts:
         for key, value in env_vars.items():
             # Escape values that contain special characters
             if isinstance(value, str) and (' ' in value or '"' in value):
-                value = f'"{value.replace('"', '\\"')}"'
+                escaped = value.replace('"', '\\"')
+                value = f'"{escaped}"'
             content += f"{key}={value}\n"
         
         return content
     
     # Configuration File Methods
     @staticmethod
-    def eat(config_file: str = None) -> bool:
-        """Load configuration file (priority: .pnt → peanu.tsk → .peanuts → .shell)"""
+    def eat(config_file: str = None, export_env: bool = True) -> bool:
+        """
+        Load configuration file (priority: .pnt → peanu.tsk → .peanuts → .shell)
+        export_env=False skips exporting every key to os.environ, which costs O(keys) on each load
+        """
         instance = Peanuts.get_instance()
         
         if not config_file:
@@ -526,21 +692,29 @@ class Peanuts:
         
         # Try binary files first
         if Peanuts.is_binary_file(config_file):
-            return instance.crack_binary(config_file)
+            return instance.crack_binary(config_file, export_env)
         
         # Try source files
         if config_file.endswith('.tsk') or 'peanu.tsk' in config_file:
-            return instance.load_source(config_file)
+            return instance.load_source(config_file, export_env)
         
         # Legacy fallback
         if config_file.endswith('.shell'):
-            return instance.crack_shell(config_file)
+            return instance.crack_shell(config_file, export_env)
         
         return False
     
-    def crack_binary(self, binary_file: str) -> bool:
-        """Crack binary configuration file"""
+    def crack_binary(self, binary_file: str, export_env: bool = True) -> bool:
+        """Crack binary configuration file; version 2 files are mapped and decoded lazily"""
         try:
+            with open(binary_file, 'rb') as f:
+                magic = f.read(4)
+            
+            if magic == PNT_MAGIC:
+                self.config = PeanutConfig.open(binary_file)
+                self.apply_configuration(self.config.environment() if export_env else None, export_env)
+                return True
+            
             with open(binary_file, 'rb') as f:
                 data = f.read()
             
@@ -558,14 +732,14 @@ class Peanuts:
             
             # Parse as JSON
             self.config = json.loads(decompressed.decode('utf-8'))
-            self.apply_configuration()
+            self.apply_configuration(export_env=export_env)
             return True
             
         except Exception as e:
             self.logger.error(f"Error cracking binary file {binary_file}: {e}")
             return False
     
-    def load_source(self, source_file: str) -> bool:
+    def load_source(self, source_file: str, export_env: bool = True) -> bool:
         """Load source configuration file"""
         try:
             with open(source_file, 'r') as f:
@@ -580,14 +754,14 @@ class Peanuts:
             for section in config.sections():
                 self.config[section] = dict(config[section])
             
-            self.apply_configuration()
+            self.apply_configuration(export_env=export_env)
             return True
             
         except Exception as e:
             self.logger.error(f"Error loading source file {source_file}: {e}")
             return False
     
-    def crack_shell(self, shell_file: str) -> bool:
+    def crack_shell(self, shell_file: str, export_env: bool = True) -> bool:
         """Crack shell configuration file (legacy)"""
         try:
             with open(shell_file, 'rb') as f:
@@ -607,27 +781,35 @@ class Peanuts:
             
             # Parse as JSON
             self.config = json.loads(decompressed.decode('utf-8'))
-            self.apply_configuration()
+            self.apply_configuration(export_env=export_env)
             return True
             
         except Exception as e:
             self.logger.error(f"Error cracking .shell: {e}")
             return False
     
-    def apply_configuration(self):
+    def apply_configuration(self, environment: Optional[Dict[str, str]] = None, export_env: bool = True):
         """Apply configuration to environment"""
         # Set environment variables
-        for section, values in self.config.items():
+        if export_env:
+            os.environ.update(environment if environment is not None else self.environment_for(self.config))
+        
+        # Set specific constants for TuskPHP
+        self.set_tusk_constants()
+    
+    @staticmethod
+    def environment_for(config: Mapping) -> Dict[str, str]:
+        """Environment variables a configuration exports: SECTION_KEY for section keys, SECTION otherwise"""
+        environment = {}
+        for section, values in config.items():
             if isinstance(values, dict):
                 for key, value in values.items():
                     env_key = f"{section.upper()}_{key.upper()}"
-                    os.environ[env_key] = str(value)
+                    environment[env_key] = str(value)
             else:
                 env_key = section.upper()
-                os.environ[env_key] = str(values)
-        
-        # Set specific constants for TuskPHP
-        self.set_tusk_constants()
+                environment[env_key] = str(values)
+        return environment
     
     def set_tusk_constants(self):
         """Set TuskPHP-specific constants"""
@@ -663,7 +845,7 @@ class Peanuts:
         value = self.config
         
         for key in keys:
-            if not isinstance(value, dict) or key not in value:
+            if not isinstance(value, Mapping) or key not in value:
                 return default
             value = value[key]
         
@@ -680,16 +862,8 @@ class Peanuts:
             return False
         
         try:
-            # Compress config for binary format
-            config_json = json.dumps(instance.config, separators=(',', ':'))
-            compressed = gzip.compress(config_json.encode('utf-8'), 9)
-            
-            # Create binary header
-            header = b'PNUT' + len(compressed).to_bytes(4, 'big')
-            
-            # Write binary file
-            with open(output_file, 'wb') as f:
-                f.write(header + compressed)
+            # One independently decodable payload per section, behind an offset table
+            PeanutConfig.write(instance.config, output_file)
             
             # Make it read-only for security
             os.chmod(output_file, 0o644)
@@ -741,7 +915,7 @@ class Peanuts:
             with open(file_path, 'rb') as f:
                 magic = f.read(4)
             
-            return magic in [b'PNUT', b'SHEL']
+            return magic in [PNT_MAGIC, b'PNUT', b'SHEL']
         except Exception:
             return False
     
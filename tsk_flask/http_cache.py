@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+TuskLang HTTP Caching
+Conditional GET (ETag / If-None-Match) support for Flask-TSK views
+"""
+
+from functools import wraps
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from flask import current_app, jsonify, request
+
+try:
+    from .render_cache import fingerprint_context, hash_bytes
+except ImportError:
+    from render_cache import fingerprint_context, hash_bytes
+
+
+def _parse_etags(header: str) -> Iterable[str]:
+    """Opaque tags of an If-None-Match header, with any W/ prefix dropped"""
+    for part in header.split(','):
+        tag = part.strip()
+        if tag.startswith('W/'):
+            tag = tag[2:]
+        yield tag.strip('"')
+
+
+def etag_matches(etag: str, header: Optional[str] = None) -> bool:
+    """
+    Whether If-None-Match lists an ETag, compared weakly as RFC 9110 requires
+    ``etag`` may be quoted and/or weak; ``header`` defaults to the current request's
+    """
+    if header is None:
+        header = request.headers.get('If-None-Match')
+    if not header:
+        return False
+    if header.strip() == '*':
+        return True
+    tag = etag[2:] if etag.startswith('W/') else etag
+    return tag.strip('"') in _parse_etags(header)
+
+
+def not_modified(etag: str, weak: bool = False):
+    """An empty 304 response carrying the validator"""
+    response = current_app.response_class(status=304)
+    response.set_etag(etag.strip('"'), weak=weak)
+    return response
+
+
+def _strip_keys(value: Any, volatile: frozenset) -> Any:
+    """Copy of a JSON payload without the volatile keys, at any depth"""
+    if isinstance(value, dict):
+        return {k: _strip_keys(v, volatile) for k, v in value.items() if k not in volatile}
+    if isinstance(value, (list, tuple)):
+        return [_strip_keys(v, volatile) for v in value]
+    return value
+
+
+def conditional_json(payload: Dict[str, Any], status: int = 200, volatile: Iterable[str] = ()):
+    """
+    jsonify a payload tagged with an ETag, answering 304 when the client has it already
+    The validator is a hash of the JSON body, so the payload is serialized once either way;
+    keys in ``volatile`` (timestamps) are left out of it, which makes it weak
+    """
+    volatile = frozenset(volatile)
+    conditional_get = status == 200 and request.method in ('GET', 'HEAD')
+    if volatile:
+        # The stable part is fingerprinted first, so a 304 skips serializing the whole payload
+        etag = fingerprint_context(_strip_keys(payload, volatile))
+        if etag is not None and conditional_get and etag_matches(etag):
+            return not_modified(etag, weak=True)
+    response = jsonify(payload)
+    response.status_code = status
+    if status == 200:
+        if not volatile:
+            etag = hash_bytes(response.get_data())
+        # Payloads without a stable fingerprint get no validator rather than one that never matches
+        if etag is not None:
+            response.set_etag(etag, weak=bool(volatile))
+    return response.make_conditional(request) if conditional_get else response
+
+
+def conditional(etag: Optional[Callable[..., Optional[str]]] = None):
+    """
+    Decorator adding ETag / If-None-Match handling to a Flask view
+
+    ``etag(*args, **kwargs)`` is called with the view arguments before the view runs; when it
+    returns a validator the client already has, the view is skipped and 304 is sent. Otherwise
+    the response is tagged with that validator, or with a hash of its body.
+    """
+    def decorator(view: Callable) -> Callable:
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view(*args, **kwargs)
+
+            tag = etag(*args, **kwargs) if etag is not None else None
+            if tag is not None and etag_matches(tag):
+                return not_modified(tag)
+
+            response = current_app.make_response(view(*args, **kwargs))
+            if response.status_code != 200 or response.is_streamed:
+                return response
+            if 'ETag' not in response.headers:
+                response.set_etag(tag.strip('"') if tag is not None else hash_bytes(response.get_data()))
+            return response.make_conditional(request)
+        return wrapper
+    return decorator
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+TuskLang Import Benchmarks
+Cold import cost of the package and each submodule, measured in fresh interpreters with -X importtime
+
+    python -m tsk_flask.import_benchmark --output imports.json
+    python -m tsk_flask.import_benchmark --module tsk_flask tsk_flask.herd --runs 20
+"""
+
+import argparse
+import os
+import pkgutil
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+from typing import Dict, List, Optional, Tuple
+
+try:
+    from .benchmark_harness import BenchmarkResult, BenchmarkSuite
+    from .performance_benchmark import finish
+except ImportError:
+    from benchmark_harness import BenchmarkResult, BenchmarkSuite
+    from performance_benchmark import finish
+
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+PACKAGE = os.path.basename(PACKAGE_DIR)
+
+MODULES = tuple(f"{PACKAGE}{suffix}" for suffix in (
+    '', '.blueprint', '.http_cache', '.render_cache', '.turbo_compiler', '.performance_engine',
+    '.herd', '.elephants', '.elephant_routes', '.elephant_showcase', '.themes', '.cli',
+))
+
+# Optional dependencies a worker that only reads configuration should never have to load
+HEAVY_DEPENDENCIES = ('PIL', 'websockets', 'redis', 'requests', 'msgpack', 'pyotp', 'fastapi', 'numpy')
+
+# One parsed -X importtime line: module, nesting depth, self and cumulative microseconds
+ImportEntry = Tuple[str, int, int, int]
+
+
+def elephant_modules() -> Tuple[str, ...]:
+    """Each elephant as its own module, found without importing anything"""
+    path = os.path.join(PACKAGE_DIR, 'herd', 'elephants')
+    return tuple(f"{PACKAGE}.herd.elephants.{info.name}" for info in pkgutil.iter_modules([path]))
+
+
+def parse_importtime(stderr: str) -> List[ImportEntry]:
+    """The import time lines of an interpreter's stderr, in the order they were printed"""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|')
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue
+        name = fields[2].rstrip()
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        entries.append((name.strip(), depth, int(fields[0]), int(fields[1])))
+    return entries
+
+
+def package_costs(entries: List[ImportEntry]) -> Dict[str, int]:
+    """
+    Cumulative microseconds per top-level package, counted where another package first
+    imported it so submodules are not counted twice
+    """
+    costs: Dict[str, int] = {}
+    parents: Dict[int, str] = {}
+    # Children are printed before their parent; walking backwards meets the parent first
+    for name, depth, _, cumulative in reversed(entries):
+        parents[depth] = name
+        parent = parents.get(depth - 1) if depth else None
+        package = name.split('.')[0]
+        if parent is None or parent.split('.')[0] != package:
+            costs[package] = costs.get(package, 0) + cumulative
+    return costs
+
+
+def own_cost(entries: List[ImportEntry], module: str) -> int:
+    """
+    Cumulative microseconds of the module less the parent packages imported on its behalf,
+    which -X importtime nests under the submodule that triggered them
+    """
+    ancestors = {module.rsplit('.', i)[0] for i in range(1, module.count('.') + 1)}
+    parents = 0
+    for name, depth, _, cumulative in entries:
+        if depth == 0:
+            if name == module:
+                return cumulative - parents
+            parents = 0
+        elif depth == 1 and name in ancestors:
+            parents += cumulative
+    return 0
+
+
+class ImportBenchmark:
+    """Fresh-interpreter imports of each module, so every sample pays the full cold cost"""
+
+    def __init__(self, suite: Optional[BenchmarkSuite] = None, quick: bool = False,
+                 runs: Optional[int] = None, top: int = 5):
+        self.suite = suite or BenchmarkSuite()
+        self.runs = runs or (3 if quick else self.suite.runs)
+        self.top = top
+        self.workdir = tempfile.mkdtemp(prefix='tsk_import_benchmark_')
+        self.env = dict(os.environ)
+        self.env['PYTHONPATH'] = os.pathsep.join(
+            filter(None, [os.path.dirname(PACKAGE_DIR), os.environ.get('PYTHONPATH')])
+        )
+        self._startup: Optional[set] = None
+
+    def interpreter(self, code: str) -> subprocess.CompletedProcess:
+        return subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=self.workdir,
+                              env=self.env, capture_output=True, text=True)
+
+    @property
+    def startup(self) -> set:
+        """Modules every interpreter imports before running any code"""
+        if self._startup is None:
+            self._startup = {name for name, *_ in parse_importtime(self.interpreter('pass').stderr)}
+        return self._startup
+
+    def import_once(self, module: str) -> Tuple[List[ImportEntry], set]:
+        """The import time lines of one cold import, and the modules it left loaded"""
+        # sys is built in, so reporting sys.modules adds nothing to the measured imports
+        process = self.interpreter(f"import {module}\nimport sys\nsys.stdout.write('\\n' + '\\0'.join(sys.modules))")
+        if process.returncode != 0:
+            errors = [line for line in process.stderr.splitlines() if not line.startswith('import time:')]
+            raise ImportError(errors[-1] if errors else f"exit status {process.returncode}")
+        entries = [entry for entry in parse_importtime(process.stderr) if entry[0] not in self.startup]
+        return entries, set(process.stdout.rsplit('\n', 1)[-1].split('\0')) - self.startup
+
+    def benchmark(self, module: str) -> BenchmarkResult:
+        """Total cost of `import module` from a fresh interpreter, beyond interpreter startup"""
+        samples, own, costs = [], [], []
+        for _ in range(self.runs):
+            entries, loaded = self.import_once(module)
+            samples.append(sum(cumulative for _, depth, _, cumulative in entries if depth == 0) / 1e6)
+            own.append(own_cost(entries, module) / 1e6)
+            costs.append(package_costs(entries))
+
+        packages = {package: statistics.median(run.get(package, 0) for run in costs) / 1e6
+                    for package in costs[-1] if package != PACKAGE}
+        heaviest = sorted(packages.items(), key=lambda item: -item[1])[:self.top]
+        heavy = sorted({name.split('.')[0] for name in loaded} & set(HEAVY_DEPENDENCIES))
+        result = self.suite.add(BenchmarkResult(
+            f"import.{module}", samples, scenario='cold',
+            params={
+                'own_seconds': statistics.median(own),
+                'modules_loaded': len(loaded),
+                'package_modules_loaded': sorted(name for name in loaded if name.split('.')[0] == PACKAGE),
+                'heavy_dependencies': heavy,
+                'heaviest_packages': dict(heaviest),
+            },
+        ))
+        self.suite.note(f"     {len(loaded)} modules, own {statistics.median(own) * 1e3:.1f} ms; "
+                        + ', '.join(f"{package} {seconds * 1e3:.1f} ms" for package, seconds in heaviest)
+                        + (f"; loads {', '.join(heavy)}" if heavy else ''))
+        return result
+
+    def run(self, modules: Optional[List[str]] = None) -> Dict[str, BenchmarkResult]:
+        """Benchmark every (or the named) module; one that cannot be imported is reported and skipped"""
+        modules = modules or list(MODULES + elephant_modules())
+        print("📦 TuskLang Import Benchmarks")
+        print("=" * 50)
+        print(f"   {self.runs} fresh interpreters per module, {sys.executable}")
+        results = {}
+        try:
+            for module in modules:
+                try:
+                    results[module] = self.benchmark(module)
+                except ImportError as e:
+                    print(f"   ⏭️  {module} skipped: {e}")
+        finally:
+            self.close()
+        return results
+
+    def close(self):
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the import benchmarks"""
+    parser = argparse.ArgumentParser(description="Measure cold import time per module")
+    parser.add_argument('--module', nargs='+', help='Modules to import (default: the package and its submodules)')
+    parser.add_argument('--runs', type=int, default=10, help='Fresh interpreters per module')
+    parser.add_argument('--top', type=int, default=5, help='Heaviest imported packages to show per module')
+    parser.add_argument('--output', '-o', help='Write results as JSON to this file')
+    parser.add_argument('--baseline', help='Compare against a previous results file')
+    parser.add_argument('--threshold', type=float, default=0.10, help='Relative slowdown counted as a regression')
+    parser.add_argument('--quick', action='store_true', help='Fewer interpreters per module')
+    args = parser.parse_args(argv)
+
+    suite = BenchmarkSuite(runs=args.runs)
+    ImportBenchmark(suite, quick=args.quick, top=args.top).run(args.module)
+    return finish(suite, args.output, args.baseline, args.threshold)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
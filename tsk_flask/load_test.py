@@ -0,0 +1,453 @@
+#!/usr/bin/env python3
+"""
+TuskLang Load Test
+Drives a Flask-TSK app with concurrent clients and reports per-endpoint latency and hook cost
+
+    python -m tsk_flask.load_test --clients 8 --duration 10
+    python -m tsk_flask.load_test --transport socket --route "3:GET /tsk/status" --route "GET /tsk/health"
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import shutil
+import socket
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field
+from functools import wraps
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from flask import Flask
+from werkzeug.test import EnvironBuilder
+
+try:
+    from .benchmark_harness import BenchmarkResult, BenchmarkSuite
+    from .performance_benchmark import finish
+except ImportError:
+    from benchmark_harness import BenchmarkResult, BenchmarkSuite
+    from performance_benchmark import finish
+
+
+@dataclass
+class Route:
+    """One entry of a route mix; weight is relative to the other routes"""
+    method: str
+    path: str
+    weight: int = 1
+    json: Any = None
+    headers: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def label(self) -> str:
+        return f"{self.method} {self.path}"
+
+    @classmethod
+    def parse(cls, spec: str) -> 'Route':
+        """``[WEIGHT:]METHOD PATH``, e.g. ``3:GET /tsk/status``"""
+        weight = 1
+        head, _, rest = spec.partition(':')
+        if head.strip().isdigit():
+            weight, spec = int(head), rest
+        method, _, path = spec.strip().partition(' ')
+        if not path.strip().startswith('/'):
+            raise ValueError(f"Route must look like '[WEIGHT:]METHOD /path': {spec!r}")
+        return cls(method.upper(), path.strip(), weight)
+
+
+# Read-only endpoints of tsk_blueprint and elephant_bp, weighted like a dashboard-heavy deployment
+DEFAULT_ROUTES = [
+    Route('GET', '/tsk/status', 4),
+    Route('GET', '/tsk/health', 2),
+    Route('GET', '/tsk/capabilities', 1),
+    Route('GET', '/tsk/sections', 1),
+    Route('GET', '/tsk/config/app', 1),
+    Route('GET', '/api/elephants/status', 2),
+    Route('GET', '/api/elephants/health', 1),
+    Route('GET', '/api/elephants/horton/stats', 1),
+]
+
+
+class HookProfiler:
+    """
+    Times every request hook, context processor and JSON response an app runs
+    Hooks are wrapped in place on install() and put back on uninstall()
+    """
+
+    def __init__(self, app: Flask):
+        self.app = app
+        self._lock = threading.Lock()
+        self._totals: Dict[str, List[int]] = {}
+        self._restore: List[Callable[[], None]] = []
+
+    def _wrap(self, label: str, func: Callable) -> Callable:
+        clock = time.perf_counter_ns
+        record = self.record
+
+        @wraps(func)
+        def timed(*args, **kwargs):
+            start = clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(label, clock() - start)
+        return timed
+
+    @staticmethod
+    def _name(kind: str, scope: Optional[str], func: Callable) -> str:
+        module = getattr(func, '__module__', '') or ''
+        qualname = getattr(func, '__qualname__', repr(func))
+        return f"{kind}[{scope or 'app'}] {module.rsplit('.', 1)[-1]}.{qualname}"
+
+    def install(self) -> 'HookProfiler':
+        app = self.app
+        registries = (
+            ('before_request', app.before_request_funcs),
+            ('after_request', app.after_request_funcs),
+            ('teardown_request', app.teardown_request_funcs),
+            ('context_processor', app.template_context_processors),
+        )
+        for kind, registry in registries:
+            for scope, funcs in registry.items():
+                original = list(funcs)
+                funcs[:] = [self._wrap(self._name(kind, scope, func), func) for func in original]
+                self._restore.append(lambda funcs=funcs, original=original: funcs.__setitem__(slice(None), original))
+
+        original = list(app.teardown_appcontext_funcs)
+        app.teardown_appcontext_funcs[:] = [
+            self._wrap(self._name('teardown_appcontext', None, func), func) for func in original
+        ]
+        self._restore.append(lambda: app.teardown_appcontext_funcs.__setitem__(slice(None), original))
+
+        # jsonify() and every JSON view go through the provider's response()
+        provider = app.json
+        provider.response = self._wrap('json[app] serialization', provider.response)
+        self._restore.append(lambda: vars(provider).pop('response', None))
+        return self
+
+    def uninstall(self):
+        while self._restore:
+            self._restore.pop()()
+
+    def record(self, label: str, elapsed_ns: int):
+        with self._lock:
+            totals = self._totals.get(label)
+            if totals is None:
+                totals = self._totals[label] = [0, 0]
+            totals[0] += 1
+            totals[1] += elapsed_ns
+
+    def reset(self):
+        with self._lock:
+            self._totals.clear()
+
+    def snapshot(self, request_time: float) -> Dict[str, Dict[str, Any]]:
+        """Calls, time and share of the total request time per hook, most expensive first"""
+        with self._lock:
+            totals = dict(self._totals)
+        report = {}
+        for label, (calls, total_ns) in sorted(totals.items(), key=lambda item: -item[1][1]):
+            total = total_ns / 1e9
+            report[label] = {
+                "calls": calls,
+                "total": total,
+                "mean": total / calls if calls else 0.0,
+                "share": total / request_time * 100 if request_time > 0 else 0.0,
+            }
+        return report
+
+
+class InProcessTransport:
+    """Calls the WSGI app directly; the request environ is built before the clock starts"""
+
+    def __init__(self, app: Flask):
+        self.app = app
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def client(self) -> Callable[[Route], Callable[[], int]]:
+        app = self.app
+
+        def prepare(route: Route):
+            environ = EnvironBuilder(
+                path=route.path, method=route.method, json=route.json, headers=route.headers,
+                environ_base={'REMOTE_ADDR': '198.51.100.7'}
+            ).get_environ()
+            status = []
+
+            def start_response(status_line, headers, exc_info=None):
+                status.append(int(status_line.split(' ', 1)[0]))
+
+            def send() -> int:
+                body = app(environ, start_response)
+                try:
+                    for _ in body:
+                        pass
+                finally:
+                    if hasattr(body, 'close'):
+                        body.close()
+                return status[0]
+            return send
+        return prepare
+
+
+class SocketTransport:
+    """Serves the app on a local port with werkzeug's threaded server; clients keep connections alive"""
+
+    def __init__(self, app: Flask):
+        self.app = app
+        self.server = None
+        self.thread = None
+
+    def start(self):
+        from werkzeug.serving import WSGIRequestHandler, make_server
+
+        class QuietHandler(WSGIRequestHandler):
+            # Per-request access logging would dominate the latency being measured
+            def log_request(self, *args, **kwargs):
+                pass
+
+            def setup(self):
+                super().setup()
+                # Headers and body are written separately; don't let Nagle hold the body back
+                self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        self.server = make_server('127.0.0.1', 0, self.app, threaded=True, request_handler=QuietHandler)
+        self.thread = threading.Thread(target=self.server.serve_forever, name='tsk-load-test-server', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+
+    def client(self):
+        port = self.server.server_port
+        connection = [None]
+
+        def prepare(route: Route):
+            body = json.dumps(route.json).encode() if route.json is not None else None
+            headers = dict(route.headers)
+            if body is not None:
+                headers['Content-Type'] = 'application/json'
+
+            def send() -> int:
+                for attempt in range(2):
+                    if connection[0] is None:
+                        connection[0] = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+                    try:
+                        connection[0].request(route.method, route.path, body=body, headers=headers)
+                        response = connection[0].getresponse()
+                        response.read()
+                        return response.status
+                    except (http.client.HTTPException, OSError):
+                        # The server closed an idle keep-alive connection; reconnect once
+                        connection[0].close()
+                        connection[0] = None
+                        if attempt:
+                            raise
+            return send
+        return prepare
+
+
+TRANSPORTS = {'inprocess': InProcessTransport, 'socket': SocketTransport}
+
+
+class LoadTest:
+    """N concurrent clients replaying a weighted route mix for a duration or a request count"""
+
+    def __init__(self, app: Flask, routes: Optional[List[Route]] = None, clients: int = 8,
+                 duration: Optional[float] = 10.0, requests: Optional[int] = None,
+                 warmup: int = 50, transport: str = 'inprocess', seed: int = 42):
+        self.app = app
+        self.routes = routes or DEFAULT_ROUTES
+        self.clients = clients
+        self.duration = duration
+        self.requests = requests
+        self.warmup = warmup
+        self.transport = TRANSPORTS[transport](app)
+        self.transport_name = transport
+        self.seed = seed
+        self.profiler = HookProfiler(app)
+
+    def _worker(self, index: int, deadline: Optional[float], budget: List[int], lock: threading.Lock,
+                samples: Dict[str, List[float]], statuses: Dict[str, Dict[int, int]], errors: Dict[str, int],
+                barrier: threading.Barrier):
+        rng = random.Random(self.seed + index)
+        prepare = self.transport.client()
+        weights = [route.weight for route in self.routes]
+        clock = time.perf_counter_ns
+        local: List[Tuple[str, int, Optional[int]]] = []
+        barrier.wait()
+        while True:
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+            if budget is not None:
+                with lock:
+                    if budget[0] <= 0:
+                        break
+                    budget[0] -= 1
+            route = rng.choices(self.routes, weights)[0]
+            send = prepare(route)
+            start = clock()
+            try:
+                status = send()
+            except Exception:
+                status = None
+            local.append((route.label, clock() - start, status))
+
+        with lock:
+            for label, elapsed, status in local:
+                samples.setdefault(label, []).append(elapsed / 1e9)
+                counts = statuses.setdefault(label, {})
+                counts[status or 0] = counts.get(status or 0, 0) + 1
+                if status is None or status >= 500:
+                    errors[label] = errors.get(label, 0) + 1
+
+    def _drive(self, deadline_after: Optional[float], total: Optional[int]):
+        lock = threading.Lock()
+        samples: Dict[str, List[float]] = {}
+        statuses: Dict[str, Dict[int, int]] = {}
+        errors: Dict[str, int] = {}
+        budget = [total] if total is not None else None
+        barrier = threading.Barrier(self.clients + 1)
+        started = time.perf_counter()
+        deadline = started + deadline_after if deadline_after is not None else None
+        threads = [
+            threading.Thread(
+                target=self._worker, name=f"tsk-load-client-{i}",
+                args=(i, deadline, budget, lock, samples, statuses, errors, barrier)
+            )
+            for i in range(self.clients)
+        ]
+        for thread in threads:
+            thread.start()
+        barrier.wait()
+        for thread in threads:
+            thread.join()
+        return samples, statuses, errors, time.perf_counter() - started
+
+    def run(self, suite: Optional[BenchmarkSuite] = None) -> Dict[str, Any]:
+        """Warm up, measure, and report into the suite (results) and its derived section (summary, hooks)"""
+        suite = suite or BenchmarkSuite()
+        self.transport.start()
+        try:
+            if self.warmup:
+                self._drive(None, self.warmup)
+            self.profiler.install()
+            try:
+                samples, statuses, errors, elapsed = self._drive(
+                    self.duration if self.requests is None else None, self.requests
+                )
+                hooks = self.profiler.snapshot(sum(sum(latencies) for latencies in samples.values()))
+            finally:
+                self.profiler.uninstall()
+        finally:
+            self.transport.stop()
+
+        total = sum(len(latencies) for latencies in samples.values())
+        summary = {
+            "transport": self.transport_name,
+            "clients": self.clients,
+            "requests": total,
+            "errors": sum(errors.values()),
+            "elapsed": elapsed,
+            "requests_per_second": total / elapsed if elapsed > 0 else 0.0,
+        }
+        for route in self.routes:
+            latencies = samples.get(route.label)
+            if not latencies:
+                continue
+            suite.add(BenchmarkResult(
+                name=f"load.{route.label}", samples=latencies, scenario=self.transport_name,
+                params={
+                    "requests": len(latencies),
+                    "requests_per_second": len(latencies) / elapsed if elapsed > 0 else 0.0,
+                    "statuses": {str(status): count for status, count in sorted(statuses[route.label].items())},
+                    "errors": errors.get(route.label, 0),
+                    "clients": self.clients,
+                },
+            ))
+        suite.derived['load.summary'] = summary
+        suite.derived['load.hooks'] = hooks
+
+        suite.note(f"\n   {total} requests in {elapsed:.2f}s: {summary['requests_per_second']:,.0f} req/s, "
+                   f"{summary['errors']} errors, {self.clients} clients over {self.transport_name}")
+        suite.note("\n   Time in hooks (share of all request time):")
+        for label, hook in hooks.items():
+            suite.note(f"   {hook['share']:6.2f}%  {hook['mean'] * 1e6:9.2f} µs × {hook['calls']:<7} {label}")
+        return summary
+
+
+def create_app(elephants: bool = True) -> Flask:
+    """A Flask-TSK app with tsk_blueprint and, when their dependencies are installed, the elephants"""
+    try:
+        from . import FlaskTSK, init_elephants
+    except ImportError:
+        from tsk_flask import FlaskTSK, init_elephants
+
+    app = Flask('tsk_load_test')
+    with app.app_context():
+        FlaskTSK(app)
+        if elephants:
+            try:
+                init_elephants(app)
+            except Exception as e:
+                print(f"   ⏭️  elephant_bp not mounted: {type(e).__name__}: {e}")
+    return app
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Load test a Flask-TSK app in a scratch directory"""
+    parser = argparse.ArgumentParser(description="Load test tsk_blueprint and elephant_bp")
+    parser.add_argument('--route', action='append', dest='routes', metavar='[WEIGHT:]METHOD PATH',
+                        help='Route to include in the mix (repeatable; default: read-only status endpoints)')
+    parser.add_argument('--clients', type=int, default=8, help='Concurrent clients')
+    parser.add_argument('--duration', type=float, default=10.0, help='Seconds to run')
+    parser.add_argument('--requests', type=int, help='Stop after this many requests instead')
+    parser.add_argument('--transport', choices=sorted(TRANSPORTS), default='inprocess',
+                        help='Call the WSGI app directly or over a local socket')
+    parser.add_argument('--no-elephants', action='store_true', help='Only mount tsk_blueprint')
+    parser.add_argument('--output', '-o', help='Write results as JSON to this file')
+    parser.add_argument('--compare', metavar='BASELINE', help='Compare against a saved results file')
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help='Slowdown (fraction) that counts as a regression when intervals do not overlap')
+    args = parser.parse_args(argv)
+
+    routes = [Route.parse(spec) for spec in args.routes] if args.routes else None
+    output = os.path.abspath(args.output) if args.output else None
+    baseline = os.path.abspath(args.compare) if args.compare else None
+
+    # The elephants create their databases and logs in the working directory
+    cwd = os.getcwd()
+    workdir = tempfile.mkdtemp(prefix='tsk_load_test_')
+    os.chdir(workdir)
+    try:
+        print("🚀 TuskLang Load Test")
+        print("=" * 50)
+        app = create_app(elephants=not args.no_elephants)
+        if routes is None:
+            mounted = {rule.rule for rule in app.url_map.iter_rules()}
+            routes = [route for route in DEFAULT_ROUTES if route.path in mounted]
+        print(f"   {args.clients} clients, {args.transport}, "
+              f"{f'{args.requests} requests' if args.requests else f'{args.duration:g}s'}\n")
+
+        suite = BenchmarkSuite()
+        LoadTest(app, routes, clients=args.clients, duration=args.duration, requests=args.requests,
+                 transport=args.transport).run(suite)
+        return finish(suite, output, baseline, args.threshold)
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+TuskLang Memory Benchmarks
+Runs long synthetic workloads under tracemalloc and reports retained growth and where it was allocated
+
+    python -m tsk_flask.memory_benchmark --output memory.json
+    python -m tsk_flask.memory_benchmark --only satao tantor --max-growth 1048576
+"""
+
+import argparse
+import asyncio
+import gc
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional
+
+from flask import Flask
+
+try:
+    from .benchmark_harness import BenchmarkSuite
+    from .elephant_benchmark import SyntheticData, load_elephant, quiet
+    from .performance_benchmark import finish
+    from .performance_engine import PerformanceMetrics, TurboTemplateEngine
+except ImportError:
+    from benchmark_harness import BenchmarkSuite
+    from elephant_benchmark import SyntheticData, load_elephant, quiet
+    from performance_benchmark import finish
+    from performance_engine import PerformanceMetrics, TurboTemplateEngine
+
+WORKLOADS = ('metrics', 'engine', 'satao', 'heffalump', 'tantor')
+
+# Growth is reported per this many operations, whatever the run length
+PER_OPS = 100000
+
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def format_bytes(size: float) -> str:
+    sign = '-' if size < 0 else '+'
+    size = abs(size)
+    for unit in ('B', 'KiB', 'MiB'):
+        if size < 1024:
+            return f"{sign}{size:.1f} {unit}" if unit != 'B' else f"{sign}{size:.0f} B"
+        size /= 1024
+    return f"{sign}{size:.1f} GiB"
+
+
+def allocation_site(traceback: tracemalloc.Traceback) -> str:
+    """The innermost frame in this package (outside the benchmarks), or the innermost frame at all"""
+    for frame in reversed(traceback):
+        filename = os.path.abspath(frame.filename)
+        if filename.startswith(PACKAGE_DIR) and not filename.endswith('_benchmark.py'):
+            return f"{os.path.relpath(filename, PACKAGE_DIR)}:{frame.lineno}"
+    frame = traceback[-1]
+    return f"{frame.filename}:{frame.lineno}"
+
+
+class MemoryBenchmark:
+    """Long-running synthetic workloads per subsystem, profiled with tracemalloc snapshots"""
+
+    def __init__(self, suite: Optional[BenchmarkSuite] = None, quick: bool = False,
+                 ops: Optional[int] = None, top: int = 10, frames: int = 25,
+                 workdir: Optional[str] = None):
+        self.suite = suite or BenchmarkSuite()
+        self.quick = quick
+        self.ops = ops
+        self.top = top
+        self.frames = frames
+        self.data = SyntheticData()
+        self._own_workdir = workdir is None
+        self.workdir = workdir or tempfile.mkdtemp(prefix='tsk_memory_benchmark_')
+        self.app = Flask('memory_benchmark')
+        self.app.config.update(
+            SATAO_DB_PATH=self._path('satao.db'),
+            SATAO_LOG_FILE=self._path('logs/satao.log'),
+            SATAO_PEANUTS_FILE=self._path('.peanuts'),
+        )
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.workdir, name)
+
+    def _ops(self, full: int, quick: int) -> int:
+        return self.ops or (quick if self.quick else full)
+
+    def profile(self, name: str, operation: Callable[[int], Any], ops: int,
+                containers: Optional[Dict[str, Callable[[], int]]] = None,
+                warmup: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Run operation(i) ops times between two snapshots and record what stayed allocated
+        Warmup calls first settle one-time allocations (imports, compiled regexes, pools)
+        """
+        containers = containers or {}
+        warmup = min(ops, 100) if warmup is None else warmup
+        for i in range(warmup):
+            operation(i)
+
+        sizes_before = {label: size() for label, size in containers.items()}
+        gc.collect()
+        if hasattr(tracemalloc, 'reset_peak'):
+            tracemalloc.reset_peak()
+        before = tracemalloc.take_snapshot()
+        start = time.perf_counter()
+        for i in range(warmup, warmup + ops):
+            operation(i)
+        elapsed = time.perf_counter() - start
+        gc.collect()
+        after = tracemalloc.take_snapshot()
+        peak = tracemalloc.get_traced_memory()[1]
+
+        ignore = [tracemalloc.Filter(False, tracemalloc.__file__)]
+        before, after = before.filter_traces(ignore), after.filter_traces(ignore)
+        retained = sum(stat.size for stat in after.statistics('filename')) - \
+            sum(stat.size for stat in before.statistics('filename'))
+
+        sites: Dict[str, List[int]] = {}
+        for stat in after.compare_to(before, 'traceback'):
+            site = sites.setdefault(allocation_site(stat.traceback), [0, 0])
+            site[0] += stat.size_diff
+            site[1] += stat.count_diff
+        top_sites = [
+            {"site": site, "size_diff": size, "count_diff": count}
+            for site, (size, count) in sorted(sites.items(), key=lambda item: -item[1][0])[:self.top]
+            if size > 0
+        ]
+
+        profile = {
+            "operations": ops,
+            "seconds": elapsed,
+            "retained_bytes": retained,
+            "growth_per_100k": retained / ops * PER_OPS,
+            "peak_bytes": peak,
+            "containers": {
+                label: {"before": sizes_before[label], "after": size()} for label, size in containers.items()
+            },
+            "top_sites": top_sites,
+        }
+        self.suite.derived[f"memory.{name}"] = profile
+
+        self.suite.note(f"  {name:<28} {format_bytes(profile['growth_per_100k']):>12} per {PER_OPS // 1000}k ops "
+                        f"({format_bytes(retained)} over {ops:,} ops, {ops / elapsed:,.0f} ops/s)")
+        for label, sizes in profile["containers"].items():
+            self.suite.note(f"     {label}: {sizes['before']:,} → {sizes['after']:,} entries")
+        for site in top_sites:
+            self.suite.note(f"     {format_bytes(site['size_diff']):>12} {site['count_diff']:+9,} blocks  {site['site']}")
+        return profile
+
+    # ===== PERFORMANCE ENGINE =====
+
+    def profile_metrics(self):
+        """Render metrics recorded for many distinct templates"""
+        metrics = PerformanceMetrics()
+        hashes = [f"{i:064x}" for i in range(1000)]
+
+        def record(i):
+            metrics.record_render(0.0001 + (i % 997) * 1e-6, cached=bool(i % 3),
+                                  template_hash=hashes[i % len(hashes)])
+
+        self.profile('metrics.record_render', record, self._ops(PER_OPS, 20000),
+                     {'template_latency': lambda: len(metrics.template_latency)}, warmup=len(hashes))
+
+    def profile_engine(self):
+        """A template source per request, as apps that build templates dynamically do"""
+        engine = TurboTemplateEngine(cache_dir=self._path('engine_cache'))
+        try:
+            def render(i):
+                engine.render_template(f"<p>{{{{ name }}}} #{i}</p>", {'name': 'benchmark'})
+
+            self.profile('engine.render_template', render, self._ops(5000, 1000), {
+                '_compiled_templates': lambda: len(engine._compiled_templates),
+                '_template_hashes': lambda: len(engine._template_hashes),
+            }, warmup=20)
+        finally:
+            engine.shutdown()
+
+    # ===== ELEPHANTS =====
+
+    def profile_satao(self):
+        """Hostile requests from ever-new addresses, as a scan or botnet sends them"""
+        satao_module = load_elephant('satao')
+        app = self.app
+        satao = satao_module.Satao(app)
+
+        def request(i):
+            path = f"/search?q=1' or 1=1 union select password from users--&n={i}" if i % 4 == 0 \
+                else f"/stories?page={i}"
+            with app.test_request_context(path, environ_base={'REMOTE_ADDR': self.data.client_ip(i)}):
+                satao.monitor_request()
+
+        with quiet():
+            self.profile('satao.monitor_request', request, self._ops(20000, 2000), {
+                'detected_threats': lambda: len(satao.detected_threats),
+                'rate_limits': lambda: len(satao.rate_limits),
+                'blocked_ips': lambda: len(satao.blocked_ips),
+            })
+
+    def profile_heffalump(self):
+        """Searches against a small index, each tracked in analytics"""
+        heffalump_module = load_elephant('heffalump')
+        with quiet():
+            heffalump = heffalump_module.Heffalump('memory_benchmark')
+            heffalump.bulk_index(self.data.search_items(50))
+        queries = [self.data.phrase(2) for _ in range(500)]
+
+        with quiet():
+            self.profile('heffalump.hunt', lambda i: heffalump.hunt(queries[i % len(queries)]),
+                         self._ops(2000, 200), {'analytics': lambda: len(heffalump.analytics)})
+
+    def profile_tantor(self):
+        """Broadcasts to ten subscribers while nothing drains the delivery queue"""
+        tantor_module = load_elephant('tantor')
+
+        class SimulatedSocket:
+            async def send(self, frame):
+                pass
+
+        with quiet():
+            tantor = tantor_module.Tantor(port=0, host='127.0.0.1')
+        now = time.time()
+        for i in range(10):
+            client_id = f"client_{i}"
+            tantor.connections[client_id] = tantor_module.Connection(
+                client_id=client_id, websocket=SimulatedSocket(), handshake_complete=True,
+                last_ping=now, joined_at=now, channels=['jungle']
+            )
+            tantor.channels['jungle'].subscribers.append(client_id)
+
+        loop = asyncio.new_event_loop()
+        try:
+            def broadcast(i):
+                loop.run_until_complete(tantor.broadcast('jungle', 'story_published', {'story': i}))
+
+            with quiet():
+                self.profile('tantor.broadcast', broadcast, self._ops(20000, 2000),
+                             {'message_queue': lambda: len(tantor.message_queue)})
+        finally:
+            loop.close()
+
+    def run(self, only: Optional[List[str]] = None):
+        """Profile every (or the named) workload; one that cannot run is reported and skipped"""
+        print("🧠 TuskLang Memory Benchmarks")
+        print("=" * 50)
+        print(f"   retained growth under tracemalloc ({self.frames} frames), workdir {self.workdir}")
+
+        tracemalloc.start(self.frames)
+        # Satao logs every blocked address; the formatting would only add noise to the output
+        logging.disable(logging.INFO)
+        try:
+            with self.app.app_context():
+                for name in only or WORKLOADS:
+                    print(f"\n📊 {name.title()}")
+                    print("-" * 30)
+                    try:
+                        getattr(self, f"profile_{name}")()
+                    except Exception as e:
+                        print(f"   ⏭️  {name} skipped: {type(e).__name__}: {e}")
+                    gc.collect()
+        finally:
+            logging.disable(logging.NOTSET)
+            tracemalloc.stop()
+            self.close()
+        return {name: profile for name, profile in self.suite.derived.items() if name.startswith('memory.')}
+
+    def close(self):
+        if self._own_workdir:
+            shutil.rmtree(self.workdir, ignore_errors=True)
+
+
+def check_growth(suite: BenchmarkSuite, max_growth: Optional[float]) -> int:
+    """1 when a workload retained more than max_growth bytes per 100k operations"""
+    if max_growth is None:
+        return 0
+    over = [
+        (name, profile['growth_per_100k']) for name, profile in suite.derived.items()
+        if name.startswith('memory.') and profile['growth_per_100k'] > max_growth
+    ]
+    for name, growth in over:
+        print(f"❌ {name} retains {format_bytes(growth)} per {PER_OPS // 1000}k ops "
+              f"(limit {format_bytes(max_growth)})")
+    return 1 if over else 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the memory benchmarks"""
+    parser = argparse.ArgumentParser(description="Profile retained memory of long-running workloads")
+    parser.add_argument('--only', nargs='+', choices=WORKLOADS, help='Workloads to profile')
+    parser.add_argument('--ops', type=int, help='Operations per workload (default depends on the workload)')
+    parser.add_argument('--top', type=int, default=10, help='Allocation sites to show per workload')
+    parser.add_argument('--max-growth', type=float, metavar='BYTES',
+                        help=f'Exit 1 when a workload retains more than this per {PER_OPS:,} operations')
+    parser.add_argument('--output', '-o', help='Write results as JSON to this file')
+    parser.add_argument('--quick', action='store_true', help='Short runs for a smoke test')
+    args = parser.parse_args(argv)
+
+    suite = BenchmarkSuite()
+    MemoryBenchmark(suite, quick=args.quick, ops=args.ops, top=args.top).run(args.only)
+    return max(finish(suite, args.output), check_growth(suite, args.max_growth))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
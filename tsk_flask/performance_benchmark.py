@@ -1,24 +1,31 @@
 #!/usr/bin/env python3
 """
 TuskLang Performance Benchmark
-Demonstrates the speed improvements over Flask's default Jinja2 rendering
+Measures turbo rendering against Jinja2 with warmup, repeated runs and confidence intervals
+
+    python -m tsk_flask.performance_benchmark --output results.json
+    python -m tsk_flask.performance_benchmark --compare results.json
 """
 
-import time
+import argparse
 import asyncio
-import threading
-from typing import Dict, Any, List
-import statistics
+import hashlib
 import json
+import os
+import shutil
+import sys
+import tempfile
+from typing import Dict, Any, List, Optional
 
 # Import our performance engine
-from performance_engine import (
-    TurboTemplateEngine, 
-    render_turbo_template, 
-    render_turbo_template_async,
-    get_performance_stats,
-    optimize_flask_app
-)
+try:
+    from .performance_engine import TurboTemplateEngine
+    from .render_cache import fingerprint_context
+    from .benchmark_harness import BenchmarkSuite, compare_results, format_comparison, has_regressions, load_results
+except ImportError:
+    from performance_engine import TurboTemplateEngine
+    from render_cache import fingerprint_context
+    from benchmark_harness import BenchmarkSuite, compare_results, format_comparison, has_regressions, load_results
 
 # Try to import Flask for comparison
 try:
@@ -30,7 +37,7 @@ except ImportError:
 
 # Try to import Jinja2 for direct comparison
 try:
-    from jinja2 import Template
+    from jinja2 import Environment
     JINJA2_AVAILABLE = True
 except ImportError:
     JINJA2_AVAILABLE = False
@@ -38,11 +45,19 @@ except ImportError:
 
 
 class PerformanceBenchmark:
-    """Comprehensive performance benchmarking"""
+    """
+    Turbo engine vs Jinja2 on the same templates and contexts
+    Every template is measured cold (compile + render from empty caches) and warm (compiled,
+    with and without the output cache), so cache hits are never passed off as render speed
+    """
     
-    def __init__(self):
+    def __init__(self, suite: Optional[BenchmarkSuite] = None, cache_dir: Optional[str] = None):
+        self.suite = suite or BenchmarkSuite()
         self.results = {}
-        self.turbo_engine = TurboTemplateEngine()
+        # A private cache directory: a cache left warm by earlier runs would flatter the cold numbers
+        self._own_cache_dir = cache_dir is None
+        self.cache_dir = cache_dir or tempfile.mkdtemp(prefix='tsk_benchmark_')
+        self.turbo_engine = TurboTemplateEngine(cache_dir=self.cache_dir)
         
         # Sample templates for testing
         self.simple_template = """
@@ -178,212 +193,174 @@ class PerformanceBenchmark:
                 ]
             }
     
-    def benchmark_turbo_engine(self, template: str, context: Dict[str, Any], iterations: int = 1000) -> Dict[str, Any]:
-        """Benchmark TuskLang turbo engine"""
-        print(f"🧪 Benchmarking TuskLang Turbo Engine ({iterations} iterations)...")
-        
-        times = []
-        for i in range(iterations):
-            start_time = time.time()
-            result = self.turbo_engine.render_template(template, context)
-            end_time = time.time()
-            times.append(end_time - start_time)
-        
-        stats = {
-            'engine': 'TuskLang Turbo',
-            'iterations': iterations,
-            'total_time': sum(times),
-            'avg_time': statistics.mean(times),
-            'min_time': min(times),
-            'max_time': max(times),
-            'median_time': statistics.median(times),
-            'renders_per_second': iterations / sum(times),
-            'result_length': len(result)
-        }
-        
-        print(f"✅ TuskLang Turbo: {stats['avg_time']*1000:.2f}ms avg, {stats['renders_per_second']:.0f} renders/sec")
-        return stats
+    def _template_globals(self) -> Dict[str, Any]:
+        """The tsk_config/tsk_function helpers, handed to Jinja too so both engines do the same work"""
+        return self.turbo_engine.template_globals.as_dict()
     
-    def benchmark_flask_jinja2(self, template: str, context: Dict[str, Any], iterations: int = 1000) -> Dict[str, Any]:
-        """Benchmark Flask's Jinja2 engine"""
-        if not FLASK_AVAILABLE:
-            return {'error': 'Flask not available'}
-        
-        print(f"🧪 Benchmarking Flask Jinja2 ({iterations} iterations)...")
-        
-        app = Flask(__name__)
-        times = []
-        
-        for i in range(iterations):
-            start_time = time.time()
-            with app.app_context():
-                result = render_template_string(template, **context)
-            end_time = time.time()
-            times.append(end_time - start_time)
-        
-        stats = {
-            'engine': 'Flask Jinja2',
-            'iterations': iterations,
-            'total_time': sum(times),
-            'avg_time': statistics.mean(times),
-            'min_time': min(times),
-            'max_time': max(times),
-            'median_time': statistics.median(times),
-            'renders_per_second': iterations / sum(times),
-            'result_length': len(result)
-        }
-        
-        print(f"✅ Flask Jinja2: {stats['avg_time']*1000:.2f}ms avg, {stats['renders_per_second']:.0f} renders/sec")
-        return stats
+    def _forget_template(self, template: str):
+        """Drop every trace of a template from the turbo engine: compiled code, artifacts and output"""
+        engine = self.turbo_engine
+        engine.invalidate_template(template)
+        engine.clear_cache()
+        base_hash = hashlib.sha256(template.encode()).hexdigest()
+        for template_hash in (base_hash, base_hash + '.e'):
+            try:
+                os.remove(engine._compiled_path(template_hash))
+            except OSError:
+                pass
     
-    def benchmark_pure_jinja2(self, template: str, context: Dict[str, Any], iterations: int = 1000) -> Dict[str, Any]:
-        """Benchmark pure Jinja2 engine"""
-        if not JINJA2_AVAILABLE:
-            return {'error': 'Jinja2 not available'}
-        
-        print(f"🧪 Benchmarking Pure Jinja2 ({iterations} iterations)...")
-        
-        jinja_template = Template(template)
-        times = []
-        
-        for i in range(iterations):
-            start_time = time.time()
-            result = jinja_template.render(**context)
-            end_time = time.time()
-            times.append(end_time - start_time)
+    def benchmark_template(self, label: str, template: str, context: Dict[str, Any]) -> Dict[str, Any]:
+        """Cold and warm timings of one template on every engine"""
+        suite = self.suite
+        engine = self.turbo_engine
+        jinja_context = dict(self._template_globals(), **context)
+        
+        def turbo_render():
+            return engine.render_template(template, context)
+        
+        # Cold: compile and render from empty caches on every call
+        suite.measure(f"{label}.turbo.cold", turbo_render, setup=lambda: self._forget_template(template))
+        
+        # Warm, output cache off: the compiled function runs every call
+        engine.enable_intelligent_caching = False
+        try:
+            suite.measure(f"{label}.turbo.render", turbo_render)
+        finally:
+            engine.enable_intelligent_caching = True
+        
+        # Warm, output cache on: every call after the first is a memory cache hit
+        suite.measure(f"{label}.turbo.cache_hit", turbo_render)
+        
+        if JINJA2_AVAILABLE:
+            suite.measure(
+                f"{label}.jinja2.cold",
+                lambda: Environment(autoescape=False).from_string(template).render(**jinja_context),
+                scenario='cold'
+            )
+            jinja_template = Environment(autoescape=False).from_string(template)
+            suite.measure(f"{label}.jinja2.render", lambda: jinja_template.render(**jinja_context))
+        
+        if FLASK_AVAILABLE:
+            app = Flask(__name__)
+            
+            def flask_render():
+                with app.app_context():
+                    return render_template_string(template, **jinja_context)
+            
+            # render_template_string compiles the source on every call
+            suite.measure(f"{label}.flask.render_template_string", flask_render, scenario='cold')
         
-        stats = {
-            'engine': 'Pure Jinja2',
-            'iterations': iterations,
-            'total_time': sum(times),
-            'avg_time': statistics.mean(times),
-            'min_time': min(times),
-            'max_time': max(times),
-            'median_time': statistics.median(times),
-            'renders_per_second': iterations / sum(times),
-            'result_length': len(result)
-        }
+        if JINJA2_AVAILABLE:
+            suite.ratio(f"{label}.speedup.render", f"{label}.jinja2.render", f"{label}.turbo.render")
+            suite.ratio(f"{label}.speedup.cold", f"{label}.jinja2.cold", f"{label}.turbo.cold")
+            suite.ratio(f"{label}.speedup.cache_hit", f"{label}.jinja2.render", f"{label}.turbo.cache_hit")
         
-        print(f"✅ Pure Jinja2: {stats['avg_time']*1000:.2f}ms avg, {stats['renders_per_second']:.0f} renders/sec")
-        return stats
+        return {name: result.summary() for name, result in suite.results.items() if name.startswith(f"{label}.")}
     
-    def benchmark_async_rendering(self, template: str, context: Dict[str, Any], iterations: int = 100) -> Dict[str, Any]:
-        """Benchmark async rendering"""
-        print(f"🧪 Benchmarking Async Rendering ({iterations} iterations)...")
-        
-        async def async_benchmark():
-            times = []
-            for i in range(iterations):
-                start_time = time.time()
-                result = await render_turbo_template_async(template, context)
-                end_time = time.time()
-                times.append(end_time - start_time)
-            return times
-        
-        times = asyncio.run(async_benchmark())
-        
-        stats = {
-            'engine': 'TuskLang Async',
-            'iterations': iterations,
-            'total_time': sum(times),
-            'avg_time': statistics.mean(times),
-            'min_time': min(times),
-            'max_time': max(times),
-            'median_time': statistics.median(times),
-            'renders_per_second': iterations / sum(times),
-            'result_length': len(result)
-        }
-        
-        print(f"✅ TuskLang Async: {stats['avg_time']*1000:.2f}ms avg, {stats['renders_per_second']:.0f} renders/sec")
-        return stats
+    def benchmark_async_rendering(self, template: str, context: Dict[str, Any]) -> Dict[str, Any]:
+        """Async render latency, including the event loop round trip"""
+        engine = self.turbo_engine
+        loop = asyncio.new_event_loop()
+        try:
+            result = self.suite.measure(
+                "async.turbo.render_async",
+                lambda: loop.run_until_complete(engine.render_template_async(template, context))
+            )
+        finally:
+            loop.close()
+        return result.summary()
     
     def benchmark_batch_rendering(self, template: str, contexts: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Benchmark batch rendering"""
-        print(f"🧪 Benchmarking Batch Rendering ({len(contexts)} templates)...")
-        
+        """Time to render a whole batch of distinct contexts from cold output caches"""
         templates = [{'content': template, 'context': ctx} for ctx in contexts]
+        result = self.suite.measure(
+            f"batch.turbo.batch_render[{len(contexts)}]",
+            lambda: self.turbo_engine.batch_render(templates),
+            setup=self.turbo_engine.clear_cache,
+            params={'batch_size': len(contexts)}
+        )
+        return result.summary()
+    
+    def benchmark_cache_key_derivation(self, sizes: List[int] = None) -> Dict[str, Any]:
+        """Benchmark render cache key derivation against context size"""
+        sizes = sizes or [10, 100, 1000, 10000]
+        
+        template = self.simple_template
+        compiled = self.turbo_engine._compile_template(template)
+        
+        def legacy_key(context):
+            content_hash = hashlib.sha256(template.encode()).hexdigest()
+            context_hash = hashlib.sha256(json.dumps(context, sort_keys=True).encode()).hexdigest()
+            return f"{content_hash}_{context_hash}"
+        
+        def full_key(context):
+            return f"{compiled.template_hash}_{fingerprint_context(context)}"
+        
+        def referenced_key(context):
+            return f"{compiled.template_hash}_{fingerprint_context(context, compiled.referenced_names)}"
+        
+        strategies = [
+            ('legacy_sha256', legacy_key),
+            ('fingerprint_full', full_key),
+            ('fingerprint_referenced', referenced_key),
+        ]
+        
+        results = {}
+        for size in sizes:
+            context = self.generate_test_context('simple')
+            context.update({
+                f'extra_{i}': {'id': i, 'label': f'value {i}', 'tags': ['a', 'b']}
+                for i in range(size)
+            })
+            results[size] = {
+                name: self.suite.measure(
+                    f"cache_key.{name}[{size}]", lambda derive=derive: derive(context),
+                    params={'context_keys': size}
+                ).summary()
+                for name, derive in strategies
+            }
         
-        start_time = time.time()
-        results = self.turbo_engine.batch_render(templates)
-        end_time = time.time()
-        
-        total_time = end_time - start_time
-        
-        stats = {
-            'engine': 'TuskLang Batch',
-            'iterations': len(contexts),
-            'total_time': total_time,
-            'avg_time': total_time / len(contexts),
-            'renders_per_second': len(contexts) / total_time,
-            'result_length': sum(len(r) for r in results)
-        }
-        
-        print(f"✅ TuskLang Batch: {stats['avg_time']*1000:.2f}ms avg, {stats['renders_per_second']:.0f} renders/sec")
-        return stats
+        return results
     
-    def run_comprehensive_benchmark(self):
+    def run_comprehensive_benchmark(self, quick: bool = False):
         """Run comprehensive performance benchmark"""
         print("🚀 TuskLang Performance Benchmark")
         print("=" * 50)
-        
-        # Test simple template
-        print("\n📊 Simple Template Benchmark")
-        print("-" * 30)
-        simple_context = self.generate_test_context('simple')
-        
-        self.results['simple'] = {
-            'turbo': self.benchmark_turbo_engine(self.simple_template, simple_context, 1000),
-            'flask': self.benchmark_flask_jinja2(self.simple_template, simple_context, 1000),
-            'jinja2': self.benchmark_pure_jinja2(self.simple_template, simple_context, 1000)
-        }
-        
-        # Test complex template
-        print("\n📊 Complex Template Benchmark")
-        print("-" * 30)
-        complex_context = self.generate_test_context('complex')
-        
-        self.results['complex'] = {
-            'turbo': self.benchmark_turbo_engine(self.complex_template, complex_context, 500),
-            'flask': self.benchmark_flask_jinja2(self.complex_template, complex_context, 500),
-            'jinja2': self.benchmark_pure_jinja2(self.complex_template, complex_context, 500)
-        }
-        
-        # Test TuskLang template
-        print("\n📊 TuskLang Template Benchmark")
-        print("-" * 30)
-        tsk_context = self.generate_test_context('tsk')
-        
-        self.results['tsk'] = {
-            'turbo': self.benchmark_turbo_engine(self.tsk_template, tsk_context, 200),
-            'flask': self.benchmark_flask_jinja2(self.tsk_template, tsk_context, 200),
-            'jinja2': self.benchmark_pure_jinja2(self.tsk_template, tsk_context, 200)
-        }
-        
-        # Test async rendering
-        print("\n📊 Async Rendering Benchmark")
-        print("-" * 30)
-        self.results['async'] = {
-            'async': self.benchmark_async_rendering(self.complex_template, complex_context, 100)
-        }
-        
-        # Test batch rendering
-        print("\n📊 Batch Rendering Benchmark")
-        print("-" * 30)
-        batch_contexts = [self.generate_test_context('simple') for _ in range(50)]
-        self.results['batch'] = {
-            'batch': self.benchmark_batch_rendering(self.simple_template, batch_contexts)
-        }
-        
-        # Performance statistics
-        print("\n📊 Performance Statistics")
-        print("-" * 30)
-        turbo_stats = get_performance_stats()
-        print(f"Cache hit rate: {turbo_stats.get('cache_hit_rate', 0):.1f}%")
-        print(f"Total renders: {turbo_stats.get('total_renders', 0)}")
-        print(f"Compiled templates: {turbo_stats.get('compiled_templates', 0)}")
+        print(f"   {self.suite.runs} runs, {self.suite.warmup} warmup, mean ± 95% CI per call")
+        
+        try:
+            for label in ('simple', 'complex', 'tsk'):
+                print(f"\n📊 {label.title()} Template")
+                print("-" * 30)
+                self.results[label] = self.benchmark_template(
+                    label, getattr(self, f"{label}_template"), self.generate_test_context(label)
+                )
+            
+            print("\n📊 Async Rendering")
+            print("-" * 30)
+            self.results['async'] = self.benchmark_async_rendering(
+                self.complex_template, self.generate_test_context('complex')
+            )
+            
+            print("\n📊 Batch Rendering")
+            print("-" * 30)
+            batch_contexts = [dict(self.generate_test_context('simple'), user_id=i) for i in range(50)]
+            self.results['batch'] = self.benchmark_batch_rendering(self.simple_template, batch_contexts)
+            
+            print("\n📊 Cache Key Derivation")
+            print("-" * 30)
+            self.results['cache_keys'] = self.benchmark_cache_key_derivation([10, 1000] if quick else None)
+        finally:
+            self.close()
         
         return self.results
     
+    def close(self):
+        """Stop the engine's pools and remove the private cache directory"""
+        self.turbo_engine.shutdown()
+        if self._own_cache_dir:
+            shutil.rmtree(self.cache_dir, ignore_errors=True)
+    
     def generate_report(self) -> str:
         """Generate comprehensive performance report"""
         report = []
@@ -391,42 +368,76 @@ class PerformanceBenchmark:
         report.append("")
         report.append("## Summary")
         report.append("")
+        report.append("Mean time per render with its 95% confidence interval. `render` runs the compiled")
+        report.append("template on every call, `cold` compiles it first from empty caches, and `cache_hit`")
+        report.append("serves output cached by an earlier call.")
+        report.append("")
         
-        # Calculate speed improvements
-        for test_type, engines in self.results.items():
-            if 'turbo' in engines and 'flask' in engines:
-                turbo_avg = engines['turbo']['avg_time']
-                flask_avg = engines['flask']['avg_time']
-                speedup = flask_avg / turbo_avg if turbo_avg > 0 else 0
-                
-                report.append(f"### {test_type.title()} Templates")
-                report.append(f"- **TuskLang Turbo**: {turbo_avg*1000:.2f}ms average")
-                report.append(f"- **Flask Jinja2**: {flask_avg*1000:.2f}ms average")
-                report.append(f"- **Speed Improvement**: {speedup:.1f}x faster")
-                report.append("")
+        for label in ('simple', 'complex', 'tsk'):
+            rows = [(name, result) for name, result in self.suite.results.items() if name.startswith(f"{label}.")]
+            if not rows:
+                continue
+            report.append(f"### {label.title()} Templates")
+            for name, result in rows:
+                ci95 = result.ci95
+                report.append(f"- **{name}**: {result.mean * 1e6:.2f} ± {ci95 * 1e6:.2f} µs")
+            for name, ratio in self.suite.derived.items():
+                if name.startswith(f"{label}.") and ratio['ci95_low'] is not None:
+                    report.append(f"- **{name}**: {ratio['ratio']:.2f}x "
+                                  f"({ratio['ci95_low']:.2f}–{ratio['ci95_high']:.2f}x)")
+            report.append("")
         
         report.append("## Detailed Results")
         report.append("")
         report.append("```json")
-        report.append(json.dumps(self.results, indent=2))
+        report.append(json.dumps(self.suite.to_dict(), indent=2))
         report.append("```")
         
         return "\n".join(report)
 
 
-def main():
+def main(argv: Optional[List[str]] = None) -> int:
     """Run the performance benchmark"""
-    benchmark = PerformanceBenchmark()
-    results = benchmark.run_comprehensive_benchmark()
-    
-    # Generate and save report
-    report = benchmark.generate_report()
-    with open('performance_report.md', 'w') as f:
-        f.write(report)
+    parser = argparse.ArgumentParser(description="Benchmark turbo template rendering against Jinja2")
+    parser.add_argument('--output', '-o', help='Write results as JSON to this file')
+    parser.add_argument('--report', help='Write a Markdown report to this file')
+    parser.add_argument('--compare', metavar='BASELINE', help='Compare against a saved results file')
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help='Slowdown (fraction) that counts as a regression when intervals do not overlap')
+    parser.add_argument('--runs', type=int, default=20, help='Timed runs per benchmark')
+    parser.add_argument('--warmup', type=int, default=3, help='Untimed runs before measuring')
+    parser.add_argument('--quick', action='store_true', help='Fewer, shorter runs for a smoke test')
+    args = parser.parse_args(argv)
     
-    print(f"\n📄 Performance report saved to: performance_report.md")
-    print(f"📊 Results: {json.dumps(results, indent=2)}")
+    suite = BenchmarkSuite(runs=5 if args.quick else args.runs, warmup=1 if args.quick else args.warmup,
+                           min_run_time=0.005 if args.quick else 0.02)
+    benchmark = PerformanceBenchmark(suite)
+    benchmark.run_comprehensive_benchmark(quick=args.quick)
+    return finish(suite, args.output, args.compare, args.threshold, args.report and benchmark.generate_report(),
+                  args.report)
+
+
+def finish(suite: BenchmarkSuite, output: Optional[str] = None, baseline: Optional[str] = None,
+           threshold: float = 0.10, report: Optional[str] = None, report_path: Optional[str] = None) -> int:
+    """Save and compare a finished suite; the exit status is 1 when a benchmark regressed"""
+    data = suite.to_dict()
+    if output:
+        data = suite.save(output)
+        print(f"\n📄 Results saved to: {output}")
+    if report_path:
+        with open(report_path, 'w') as f:
+            f.write(report)
+        print(f"📄 Report saved to: {report_path}")
+    if baseline:
+        rows = compare_results(data, load_results(baseline), threshold)
+        print(f"\n📊 Compared with {baseline} (threshold {threshold:.0%})")
+        print(format_comparison(rows))
+        if has_regressions(rows):
+            print("\n❌ Performance regressions detected")
+            return 1
+        print("\n✅ No regressions")
+    return 0
 
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    sys.exit(main())
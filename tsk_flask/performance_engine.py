@@ -5,20 +5,42 @@ Outperforms Flask's default Jinja2 rendering with intelligent caching and optimi
 """
 
 import os
+import re
 import sys
+import fnmatch
 import time
 import hashlib
+import hmac
+import secrets
+import stat
 import threading
 import asyncio
+import weakref
+from collections import ChainMap, OrderedDict
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Union, Callable
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Set, Tuple, Union, Callable
 from functools import lru_cache, wraps
-import json
 import pickle
 import gzip
-from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures import Future, ThreadPoolExecutor, ProcessPoolExecutor
 import logging
 
+try:
+    from .turbo_compiler import (
+        TemplateCompiler, CompiledTemplate, UNDEFINED, DEFAULT_FILTERS, DEFAULT_GLOBALS, DEFAULT_TESTS
+    )
+    from .render_cache import (
+        MemoryRenderCache, RenderCacheStore, SQLiteRenderCacheStore, fingerprint_context, hash_bytes
+    )
+except ImportError:
+    # Allow running the benchmark/demo scripts from inside the package directory
+    from turbo_compiler import (
+        TemplateCompiler, CompiledTemplate, UNDEFINED, DEFAULT_FILTERS, DEFAULT_GLOBALS, DEFAULT_TESTS
+    )
+    from render_cache import (
+        MemoryRenderCache, RenderCacheStore, SQLiteRenderCacheStore, fingerprint_context, hash_bytes
+    )
+
 # Try to import the official tusktsk package
 try:
     import tusktsk
@@ -32,10 +54,9 @@ except ImportError:
 
 # Optional performance libraries
 try:
-    import orjson as fast_json
+    import orjson
     FAST_JSON_AVAILABLE = True
 except ImportError:
-    import json as fast_json
     FAST_JSON_AVAILABLE = False
 
 try:
@@ -50,41 +71,398 @@ try:
 except ImportError:
     MSGPACK_AVAILABLE = False
 
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+# Content codings the engine can precompress, in order of preference
+CONTENT_ENCODINGS = ('br', 'gzip', 'identity') if BROTLI_AVAILABLE else ('gzip', 'identity')
+
+
+class LatencyHistogram:
+    """
+    Fixed-memory latency histogram with HDR-style log buckets
+    Values are kept in nanoseconds with a relative error below 1 / 2**(significant_bits - 1)
+    """
+    
+    def __init__(self, significant_bits: int = 7, max_seconds: float = 3600.0):
+        self.significant_bits = significant_bits
+        self.max_value = int(max_seconds * 1e9)
+        # Sparse bucket counts: at most bucket_index(max_value) + 1 keys
+        self.counts: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
+    
+    def bucket_index(self, value: int) -> int:
+        """Bucket holding a value; exact below 2**significant_bits, logarithmic above"""
+        linear = 1 << self.significant_bits
+        if value < linear:
+            return value
+        shift = value.bit_length() - self.significant_bits
+        half = linear >> 1
+        return linear + (shift - 1) * half + ((value >> shift) - half)
+    
+    def bucket_upper(self, index: int) -> int:
+        """Highest value that falls into a bucket"""
+        linear = 1 << self.significant_bits
+        if index < linear:
+            return index
+        half = linear >> 1
+        shift = (index - linear) // half + 1
+        mantissa = (index - linear) % half + half
+        return ((mantissa + 1) << shift) - 1
+    
+    def record(self, seconds: float):
+        """Record one observation"""
+        value = min(max(int(seconds * 1e9), 0), self.max_value)
+        index = self.bucket_index(value)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+    
+    def percentile(self, percent: float) -> float:
+        """Value in seconds below which percent of observations fall"""
+        if not self.count:
+            return 0.0
+        threshold = max(1, -(-self.count * percent // 100))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= threshold:
+                return min(self.bucket_upper(index), self.max) / 1e9
+        return self.max / 1e9
+    
+    def summary(self) -> Dict[str, Any]:
+        """Count, mean, extremes and p50/p90/p99/p999 in seconds"""
+        if not self.count:
+            return {"count": 0}
+        return {
+            "count": self.count,
+            "avg": self.total / self.count / 1e9,
+            "min": self.min / 1e9,
+            "max": self.max / 1e9,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+            "p999": self.percentile(99.9),
+        }
+
 
 class PerformanceMetrics:
-    """Track and analyze performance metrics"""
+    """Track and analyze performance metrics in fixed memory"""
+    
+    def __init__(self, max_templates: int = 256):
+        # Per-template histograms beyond this many are folded into 'other'
+        self.max_templates = max_templates
+        self._lock = threading.Lock()
+        self._clear()
+    
+    def reset(self):
+        """Start a new measurement window"""
+        with self._lock:
+            self._clear()
     
-    def __init__(self):
-        self.render_times = []
+    def _clear(self):
+        """Drop every observation (caller holds the lock)"""
+        self.render_latency = LatencyHistogram()
+        self.hit_latency = LatencyHistogram()
+        self.miss_latency = LatencyHistogram()
+        self.queue_wait = LatencyHistogram()
+        self.template_latency: Dict[str, LatencyHistogram] = {}
         self.cache_hits = 0
         self.cache_misses = 0
         self.total_renders = 0
+        self.inline_async_renders = 0
+        self.offloaded_async_renders = 0
+        self.coalesced_renders = 0
+        self.stale_hits = 0
         self.start_time = time.time()
     
-    def record_render(self, duration: float, cached: bool = False):
+    def record_render(self, duration: float, cached: bool = False, template_hash: Optional[str] = None):
         """Record a render operation"""
-        self.render_times.append(duration)
-        self.total_renders += 1
-        if cached:
-            self.cache_hits += 1
-        else:
-            self.cache_misses += 1
+        with self._lock:
+            self.render_latency.record(duration)
+            self.total_renders += 1
+            if cached:
+                self.cache_hits += 1
+                self.hit_latency.record(duration)
+            else:
+                self.cache_misses += 1
+                self.miss_latency.record(duration)
+            
+            if template_hash is not None:
+                histogram = self.template_latency.get(template_hash)
+                if histogram is None:
+                    if len(self.template_latency) >= self.max_templates:
+                        template_hash = 'other'
+                        histogram = self.template_latency.get(template_hash)
+                    if histogram is None:
+                        histogram = self.template_latency[template_hash] = LatencyHistogram()
+                histogram.record(duration)
+    
+    def record_coalesced(self):
+        """Record a cache miss that waited on another caller's render instead of rendering"""
+        with self._lock:
+            self.coalesced_renders += 1
+    
+    def record_stale_hit(self):
+        """Record expired output served while a background refresh runs"""
+        with self._lock:
+            self.stale_hits += 1
+    
+    def record_async_render(self, offloaded: bool, queue_wait: float = 0.0):
+        """Record how an async render was scheduled and how long it waited for a worker"""
+        with self._lock:
+            if offloaded:
+                self.offloaded_async_renders += 1
+                self.queue_wait.record(queue_wait)
+            else:
+                self.inline_async_renders += 1
+    
+    def snapshot(self, reset: bool = False, include_templates: bool = True) -> Dict[str, Any]:
+        """Copy out the current window, optionally starting a new one"""
+        with self._lock:
+            elapsed = time.time() - self.start_time
+            latency = self.render_latency.summary()
+            snapshot = {
+                "total_renders": self.total_renders,
+                "cache_hits": self.cache_hits,
+                "cache_misses": self.cache_misses,
+                "cache_hit_rate": self.cache_hits / max(self.total_renders, 1) * 100,
+                "avg_render_time": latency.get("avg", 0.0),
+                "min_render_time": latency.get("min", 0.0),
+                "max_render_time": latency.get("max", 0.0),
+                "total_time": elapsed,
+                "renders_per_second": self.total_renders / max(elapsed, 1e-9),
+                "latency": latency,
+                "hit_latency": self.hit_latency.summary(),
+                "miss_latency": self.miss_latency.summary(),
+                "queue_wait": self.queue_wait.summary(),
+                "inline_async_renders": self.inline_async_renders,
+                "offloaded_async_renders": self.offloaded_async_renders,
+                "coalesced_renders": self.coalesced_renders,
+                "stale_hits": self.stale_hits
+            }
+            if include_templates:
+                snapshot["templates"] = {
+                    template_hash[:16]: histogram.summary()
+                    for template_hash, histogram in self.template_latency.items()
+                }
+            if reset:
+                self._clear()
+        return snapshot
     
     def get_stats(self) -> Dict[str, Any]:
         """Get performance statistics"""
-        if not self.render_times:
+        if not self.total_renders:
             return {"error": "No render data available"}
+        return self.snapshot()
+
+
+class EncodedBody(bytes):
+    """Rendered output in one content coding, with the strong ETag that identifies it"""
+    
+    def __new__(cls, data: bytes, encoding: str, etag: str):
+        body = super().__new__(cls, data)
+        body.encoding = encoding
+        body.etag = etag
+        return body
+
+
+# Cache tags of rendered output that read TuskLang config
+CONFIG_TAG_ANY = 'tsk:*'
+# Output that read config without recording which sections. Nothing is tagged with it any more,
+# but shared stores may still hold such entries, so section invalidation keeps dropping them
+CONFIG_TAG_UNKNOWN = 'tsk:?'
+# Shared-store entry holding the fingerprint of the config the cached output was rendered against
+CONFIG_FINGERPRINT_KEY = 'tsk_config_fingerprint'
+CONFIG_FINGERPRINT_TTL = 30 * 24 * 3600
+
+
+def config_tags(sections: Optional[List[str]] = None) -> List[str]:
+    """Tags to invalidate when sections change; None means every config-derived entry"""
+    if sections is None:
+        return [CONFIG_TAG_ANY]
+    return [f'tsk:{section}' for section in sections] + [CONFIG_TAG_UNKNOWN]
+
+
+class FunctionMemo:
+    """
+    Bounded LRU of TuskLang function results for templates
+    A function opts in from its own section: ``<name>_cache = "pure"`` keeps results until the
+    config changes, a number keeps them for that many seconds
+    """
+    
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: OrderedDict = OrderedDict()
+        # (section, name) -> lifetime in seconds, or None when the function is not cacheable
+        self._policies: Dict[Tuple[str, str], Optional[float]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    @staticmethod
+    def _parse_policy(value: Any) -> Optional[float]:
+        """Lifetime declared by a ``<name>_cache`` value"""
+        if value is True or (isinstance(value, str) and value.strip().lower() == 'pure'):
+            return float('inf')
+        if isinstance(value, bool):
+            return None
+        try:
+            ttl = float(value)
+        except (TypeError, ValueError):
+            return None
+        return ttl if ttl > 0 else None
+    
+    def policy(self, tsk, section: str, name: str) -> Optional[float]:
+        """How long results of section.name may be reused, read from config once"""
+        key = (section, name)
+        try:
+            return self._policies[key]
+        except KeyError:
+            pass
+        ttl = None
+        if tsk is not None:
+            try:
+                ttl = self._parse_policy(tsk.get_value(section, f"{name}_cache"))
+            except Exception as e:
+                logging.warning(f"Cache policy lookup for {section}.{name} failed: {e}")
+        self._policies[key] = ttl
+        return ttl
+    
+    def call(self, tsk, section: str, name: str, args: tuple, function: Callable[[], Any]) -> Any:
+        """Result of function(), reused while section.name's policy allows"""
+        ttl = self.policy(tsk, section, name)
+        if ttl is None:
+            return function()
+        key = (section, name, args)
+        now = time.monotonic()
+        try:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and entry[1] > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[0]
+                self.misses += 1
+        except TypeError:
+            # Unhashable arguments cannot be memoised
+            return function()
         
+        value = function()
+        with self._lock:
+            self._entries[key] = (value, now + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return value
+    
+    def invalidate(self, sections: Optional[List[str]] = None):
+        """Forget results and policies of functions in the given sections, or all of them"""
+        with self._lock:
+            if sections is None:
+                self._entries.clear()
+                self._policies.clear()
+                return
+            sections = set(sections)
+            for key in [key for key in self._entries if key[0] in sections]:
+                del self._entries[key]
+            for key in [key for key in self._policies if key[0] in sections]:
+                del self._policies[key]
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / max(lookups, 1) * 100,
+                "evictions": self.evictions,
+                "cacheable_functions": sum(1 for ttl in self._policies.values() if ttl is not None),
+            }
+
+
+class TskTemplateGlobals:
+    """
+    TuskLang helpers exposed to turbo templates
+    Config sections read during a render are recorded so its cached output can be tagged with them
+    """
+    
+    def __init__(self, tsk=None):
+        self.tsk = tsk
+        self.memo = FunctionMemo()
+        self._local = threading.local()
+    
+    def start_recording(self) -> Set[str]:
+        """Begin collecting the config tags read on this thread; nests"""
+        tags: Set[str] = set()
+        frames = getattr(self._local, 'frames', None)
+        if frames is None:
+            frames = self._local.frames = []
+        frames.append(tags)
+        return tags
+    
+    def stop_recording(self, tags: Set[str]):
+        """End a recording started by start_recording, and any left open inside it"""
+        frames = getattr(self._local, 'frames', None)
+        while frames:
+            if frames.pop() is tags:
+                break
+    
+    def note(self, tags: Any):
+        """Add tags to every recording open on this thread"""
+        frames = getattr(self._local, 'frames', None)
+        if frames:
+            for frame in frames:
+                frame.update(tags)
+    
+    def tsk_function(self, section: str, name: str, *args) -> Any:
+        """Execute a TuskLang function from inside a template"""
+        if not self.tsk:
+            return UNDEFINED
+        # Functions are tagged with the section that defines them
+        self.note((CONFIG_TAG_ANY, f'tsk:{section}'))
+        try:
+            # Functions declared pure or TTL-cacheable are memoised; failures are not
+            return self.memo.call(
+                self.tsk, section, name, args,
+                lambda: self.tsk.execute_fujsen(section, name, *args)
+            )
+        except Exception as e:
+            logging.warning(f"Function execution failed: {e}")
+            return UNDEFINED
+    
+    def tsk_config(self, section: str, key: str, default: Any = None) -> Any:
+        """Read a TuskLang configuration value from inside a template"""
+        if not self.tsk:
+            return default
+        self.note((CONFIG_TAG_ANY, f'tsk:{section}'))
+        try:
+            value = self.tsk.get_value(section, key)
+            return default if value is None else value
+        except Exception as e:
+            logging.warning(f"Config lookup failed: {e}")
+            return default
+    
+    def as_dict(self) -> Dict[str, Callable]:
+        """Template globals provided by this helper"""
         return {
-            "total_renders": self.total_renders,
-            "cache_hits": self.cache_hits,
-            "cache_misses": self.cache_misses,
-            "cache_hit_rate": self.cache_hits / max(self.total_renders, 1) * 100,
-            "avg_render_time": sum(self.render_times) / len(self.render_times),
-            "min_render_time": min(self.render_times),
-            "max_render_time": max(self.render_times),
-            "total_time": time.time() - self.start_time,
-            "renders_per_second": len(self.render_times) / (time.time() - self.start_time)
+            'tsk_function': self.tsk_function,
+            'tsk_config': self.tsk_config,
         }
 
 
@@ -94,16 +472,22 @@ class TurboTemplateEngine:
     Features intelligent caching, parallel processing, and optimized rendering
     """
     
-    def __init__(self, cache_dir: Optional[str] = None, max_workers: int = 4):
+    def __init__(self, cache_dir: Optional[str] = None, max_workers: int = 4,
+                 memory_cache_bytes: int = 64 * 1024 * 1024,
+                 disk_cache_bytes: int = 256 * 1024 * 1024,
+                 cache_store: Optional[RenderCacheStore] = None,
+                 max_compiled_templates: int = 1024):
         self.cache_dir = cache_dir or "/tmp/tsk_flask_cache"
         self.max_workers = max_workers
         self.metrics = PerformanceMetrics()
         self.cache_lock = threading.RLock()
-        self.render_pool = ThreadPoolExecutor(max_workers=max_workers)
-        self.process_pool = ProcessPoolExecutor(max_workers=max_workers)
+        # Pools are created on first use: most workers never render in parallel or compile out of process
+        self._render_pool: Optional[ThreadPoolExecutor] = None
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
         
-        # Ensure cache directory exists
-        os.makedirs(self.cache_dir, exist_ok=True)
+        # Ensure cache directory exists, private to this user when it is created here
+        os.makedirs(self.cache_dir, mode=0o700, exist_ok=True)
         
         # Initialize TuskLang integration
         if TUSK_AVAILABLE:
@@ -113,21 +497,131 @@ class TurboTemplateEngine:
         
         # Performance configuration
         self.enable_compression = True
+        # Precompressed response bodies: outputs smaller than this are always sent as identity
+        self.compression_min_size = 512
+        self.compression_levels = {'gzip': 6, 'br': 5}
         self.enable_parallel_rendering = True
         self.enable_intelligent_caching = True
         self.cache_ttl = 300  # 5 minutes default
+        # Seconds past cache_ttl that expired output may be served while one refresh runs (0 disables)
+        self.stale_while_revalidate = 0
+        # Only variables the template reads can change its output
+        self.fingerprint_referenced_only = True
+        # Streamed output longer than this (characters) is sent but not cached
+        self.stream_cache_limit = 1024 * 1024
+        # Batch sizes at which batch_render switches to threads, then processes
+        self.batch_thread_threshold = 16
+        self.batch_process_threshold = 256
+        # Async renders cheaper than this (seconds, measured) run on the event loop
+        self.async_offload_threshold = 0.002
+        # Most offloaded async renders in flight at once per event loop
+        self.max_async_renders = max_workers
+        self._async_semaphores = weakref.WeakKeyDictionary()
+        self._render_costs: Dict[str, float] = {}
+        # Renders in progress by cache key, so concurrent misses share one render
+        self._inflight: Dict[str, Future] = {}
+        self._inflight_lock = threading.Lock()
+        
+        # First cache tier: rendered output held in process memory
+        self.memory_cache = MemoryRenderCache(max_bytes=memory_cache_bytes, default_ttl=self.cache_ttl)
+        
+        # Second cache tier: persistent store shared by all workers on the node
+        self.cache_store = cache_store or SQLiteRenderCacheStore(
+            os.path.join(self.cache_dir, 'render_cache.db'),
+            max_bytes=disk_cache_bytes
+        )
+        
+        # Fingerprint of the bound config's contents; shared output that read other config is ignored
+        self.config_fingerprint: Optional[str] = None
+        # Config changes with no fingerprint to name them, and this engine's own ETag salt for them
+        self._config_generation = 0
+        self._etag_salt = secrets.token_hex(8)
         
         # Template compilation cache
-        self._compiled_templates = {}
-        self._template_hashes = {}
+        self.template_globals = TskTemplateGlobals(self.tsk)
+        self._fragment_local = threading.local()
+        self.compiler = TemplateCompiler(
+            globals=self.template_globals.as_dict(),
+            fragment_cache=self,
+            loader=self.load_template_source
+        )
+        # Template globals every render sees; variables holding them are keyed by name alone
+        self.shared_globals: List[Mapping[str, Any]] = [self.compiler.globals]
+        # Compiled templates by content hash, least recently used first; bounded so that apps
+        # building template sources per request cannot grow the engine without limit
+        self.max_compiled_templates = max_compiled_templates
+        self._compiled_templates: 'OrderedDict[str, CompiledTemplate]' = OrderedDict()
+        # (hash(source), len(source)) -> content hash. str hashes are cached on the object and keyed
+        # per process (SipHash), so this skips re-hashing constant sources without holding their text
+        self._template_hashes: 'OrderedDict[Tuple[int, int], str]' = OrderedDict()
+        self._compiled_lock = threading.Lock()
+        # Directories searched for {% extends %} and {% include %} targets
+        self.template_dirs: List[str] = []
+        # Template name -> hashes of compiled templates that extend or include it
+        self._dependents: Dict[str, Set[str]] = {}
+        # Compiled artifacts persisted by content hash, shared by every worker. They are code the
+        # engine executes, so they are only kept in a directory no other user can write to, and
+        # are signed with a key that never leaves it
+        self.compiled_dir = os.path.join(self.cache_dir, 'compiled')
+        self.persist_compiled = private_directory(self.cache_dir) and private_directory(self.compiled_dir)
+        if not self.persist_compiled:
+            logging.warning(
+                f"{self.cache_dir} is not private to this user; compiled templates will not be persisted"
+            )
+        self._artifact_key: Optional[bytes] = None
         
         logging.info(f"TurboTemplateEngine initialized with {max_workers} workers")
     
-    def _generate_cache_key(self, template_content: str, context: Dict[str, Any]) -> str:
-        """Generate a unique cache key for template and context"""
-        content_hash = hashlib.sha256(template_content.encode()).hexdigest()
-        context_hash = hashlib.sha256(fast_json.dumps(context, sort_keys=True).encode()).hexdigest()
-        return f"{content_hash}_{context_hash}"
+    @property
+    def render_pool(self) -> ThreadPoolExecutor:
+        """Threads for parallel and async renders, started on first use"""
+        if self._render_pool is None:
+            with self._pool_lock:
+                if self._render_pool is None:
+                    self._render_pool = ThreadPoolExecutor(max_workers=self.max_workers)
+        return self._render_pool
+    
+    @property
+    def process_pool(self) -> ProcessPoolExecutor:
+        """Processes for batch template compilation, started on first use"""
+        if self._process_pool is None:
+            with self._pool_lock:
+                if self._process_pool is None:
+                    self._process_pool = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._process_pool
+    
+    def shutdown(self, wait: bool = True):
+        """Stop whichever pools were started; they start again if the engine is used afterwards"""
+        with self._pool_lock:
+            pools = [self._render_pool, self._process_pool]
+            self._render_pool = self._process_pool = None
+        for pool in pools:
+            if pool is not None:
+                pool.shutdown(wait=wait)
+    
+    def _get_template_hash(self, template_content: str) -> str:
+        """Get the content hash of a template, computing it once per source"""
+        key = (hash(template_content), len(template_content))
+        with self._compiled_lock:
+            template_hash = self._template_hashes.get(key)
+            if template_hash is not None:
+                self._template_hashes.move_to_end(key)
+                return template_hash
+        template_hash = hashlib.sha256(template_content.encode()).hexdigest()
+        with self._compiled_lock:
+            self._template_hashes[key] = template_hash
+            if len(self._template_hashes) > self.max_compiled_templates:
+                self._template_hashes.popitem(last=False)
+        return template_hash
+    
+    def _generate_cache_key(self, compiled_template: CompiledTemplate,
+                            context: Dict[str, Any]) -> Optional[str]:
+        """Generate a unique cache key for template and context; None when the output cannot be cached"""
+        names = compiled_template.referenced_names if self.fingerprint_referenced_only else None
+        context_hash = fingerprint_context(context, names, self.shared_globals)
+        if context_hash is None:
+            return None
+        return f"{compiled_template.cache_namespace}_{context_hash}"
     
     def _compress_data(self, data: bytes) -> bytes:
         """Compress data for storage"""
@@ -141,55 +635,99 @@ class TurboTemplateEngine:
             return gzip.decompress(data)
         return data
     
-    def _get_cache_path(self, cache_key: str) -> str:
-        """Get cache file path"""
-        return os.path.join(self.cache_dir, f"{cache_key}.cache")
-    
-    def _is_cache_valid(self, cache_path: str) -> bool:
-        """Check if cache is still valid"""
-        if not os.path.exists(cache_path):
-            return False
-        
-        # Check TTL
-        file_age = time.time() - os.path.getmtime(cache_path)
-        return file_age < self.cache_ttl
-    
-    def _load_from_cache(self, cache_key: str) -> Optional[str]:
-        """Load rendered template from cache"""
-        if not self.enable_intelligent_caching:
+    def _load_from_cache(self, cache_key: Optional[str], compiled_template: Optional[CompiledTemplate] = None,
+                         context: Optional[Dict[str, Any]] = None,
+                         start_time: Optional[float] = None) -> Optional[str]:
+        """
+        Load rendered template from cache
+        Stale output is returned only when the template and context are given to refresh it
+        """
+        if not self.enable_intelligent_caching or cache_key is None:
             return None
         
-        cache_path = self._get_cache_path(cache_key)
-        
-        if not self._is_cache_valid(cache_path):
+        if start_time is None:
+            start_time = time.perf_counter()
+        content, fresh = self._cache_lookup(cache_key)
+        if content is None:
             return None
+        if not fresh:
+            if compiled_template is None:
+                return None
+            self.metrics.record_stale_hit()
+            self._refresh_in_background(compiled_template, cache_key, context or {})
+        self.metrics.record_render(
+            time.perf_counter() - start_time,
+            cached=True,
+            template_hash=compiled_template.template_hash if compiled_template is not None else None
+        )
+        return content
+    
+    def _cache_get(self, cache_key: str) -> Optional[str]:
+        """Look up fresh content in memory, falling back to the disk tier"""
+        content, fresh = self._cache_lookup(cache_key)
+        return content if fresh else None
+    
+    def _cache_lookup(self, cache_key: str) -> Tuple[Optional[str], bool]:
+        """Look up content and whether it is still fresh, falling back to the disk tier"""
+        entry = self.memory_cache.get_entry(cache_key)
+        if entry is not None:
+            return entry
+        
+        cached_data = self._load_from_disk(cache_key)
+        if cached_data is None:
+            return None, False
         
+        # Promote disk hits to memory for the rest of their TTL
+        content = cached_data.get('content')
+        ttl = cached_data.get('ttl', self.cache_ttl)
+        stale_ttl = cached_data.get('stale_ttl', 0)
+        tags = cached_data.get('tags', ())
+        if not self._config_matches(tags, cached_data.get('config')):
+            return None, False
+        age = time.time() - cached_data.get('timestamp', 0)
+        if age >= ttl + stale_ttl:
+            return None, False
+        if age < ttl:
+            self.memory_cache.set(cache_key, content, ttl=ttl - age, stale_ttl=stale_ttl, tags=tags)
+        else:
+            self.memory_cache.set(cache_key, content, ttl=0, stale_ttl=ttl + stale_ttl - age, tags=tags)
+        return content, age < ttl
+    
+    def _load_from_disk(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        """Load a cache record from the persistent tier"""
         try:
-            with open(cache_path, 'rb') as f:
-                compressed_data = f.read()
-                data = self._decompress_data(compressed_data)
-                
-                if MSGPACK_AVAILABLE:
-                    cached_data = msgpack.unpackb(data)
-                else:
-                    cached_data = pickle.loads(data)
-                
-                self.metrics.record_render(0.001, cached=True)  # Cache hit is very fast
-                return cached_data.get('content')
+            compressed_data = self.cache_store.get(cache_key)
+            if compressed_data is None:
+                return None
+            
+            data = self._decompress_data(compressed_data)
+            if MSGPACK_AVAILABLE:
+                return msgpack.unpackb(data)
+            return pickle.loads(data)
         
         except Exception as e:
             logging.warning(f"Cache load failed: {e}")
             return None
     
-    def _save_to_cache(self, cache_key: str, content: str):
-        """Save rendered template to cache"""
-        if not self.enable_intelligent_caching:
+    def _save_to_cache(self, cache_key: Optional[str], content: str, ttl: Optional[float] = None,
+                       tags: Any = ()):
+        """Save rendered template to both cache tiers, tagged with the config it read"""
+        if not self.enable_intelligent_caching or cache_key is None:
             return
         
+        ttl = self.cache_ttl if ttl is None else ttl
+        stale_ttl = self.stale_while_revalidate
+        tags = sorted(tags)
+        self.memory_cache.set(cache_key, content, ttl=ttl, stale_ttl=stale_ttl, tags=tags)
+        
         try:
             cache_data = {
                 'content': content,
                 'timestamp': time.time(),
+                'ttl': ttl,
+                'stale_ttl': stale_ttl,
+                'tags': tags,
+                'config': self.config_fingerprint if tags else None,
                 'version': TUSK_VERSION or 'unknown'
             }
             
@@ -199,85 +737,496 @@ class TurboTemplateEngine:
                 data = pickle.dumps(cache_data)
             
             compressed_data = self._compress_data(data)
-            cache_path = self._get_cache_path(cache_key)
-            
-            with open(cache_path, 'wb') as f:
-                f.write(compressed_data)
+            self.cache_store.set(cache_key, compressed_data, ttl + stale_ttl, tags)
         
         except Exception as e:
             logging.warning(f"Cache save failed: {e}")
     
-    def _compile_template(self, template_content: str) -> Callable:
-        """Compile template for faster rendering"""
-        template_hash = hashlib.sha256(template_content.encode()).hexdigest()
+    def etag(self, template_content: str, context: Dict[str, Any] = None) -> Optional[str]:
+        """
+        Validator for a template's output, known without rendering it
+        Built from the template and everything it pulls in, the context fingerprint and the bound
+        config; None when the template or its context cannot be fingerprinted
+        """
+        try:
+            compiled_template = self._compile_template(template_content)
+        except Exception:
+            return None
+        cache_key = self._generate_cache_key(compiled_template, context or {})
+        if cache_key is None:
+            return None
+        # Unnamed config changes are only known to this engine, so its validators are its own
+        config = self.config_fingerprint or self._etag_salt
+        return hash_bytes(f"{cache_key}|{config}.{self._config_generation}".encode())
+    
+    def _config_matches(self, tags: Any, fingerprint: Optional[str]) -> bool:
+        """Whether shared output may be served here: output that read config must have read this config"""
+        return not tags or fingerprint == self.config_fingerprint
+    
+    def encode_body(self, content: str, encoding: str) -> EncodedBody:
+        """Encode rendered output in a content coding, tagging it with a strong ETag"""
+        data = content.encode('utf-8')
+        if encoding == 'gzip':
+            # A fixed mtime keeps the bytes, and so the ETag, identical across workers
+            data = gzip.compress(data, compresslevel=self.compression_levels.get('gzip', 6), mtime=0)
+        elif encoding == 'br':
+            data = brotli.compress(data, quality=self.compression_levels.get('br', 5))
+        elif encoding != 'identity':
+            raise ValueError(f"Unsupported content encoding: {encoding}")
+        suffix = '' if encoding == 'identity' else f'-{encoding}'
+        return EncodedBody(data, encoding, f'"{hash_bytes(data)}{suffix}"')
+    
+    def render_encoded(self, template_content: str, context: Dict[str, Any] = None,
+                       accept_encoding: Optional[str] = None) -> EncodedBody:
+        """
+        Render a template as response bytes in the best encoding the client accepts
+        Encodings of cached output are cached too, so repeat requests do no compression work;
+        they expire and are invalidated with the output they were made from
+        """
+        start_time = time.perf_counter()
+        context = context or {}
+        encoding = 'identity'
+        if self.enable_compression:
+            encoding = negotiate_encoding(accept_encoding, CONTENT_ENCODINGS) or 'identity'
         
-        if template_hash in self._compiled_templates:
-            return self._compiled_templates[template_hash]
+        try:
+            compiled_template = self._compile_template(template_content)
+        except Exception:
+            return self.encode_body(self.render_template(template_content, context), 'identity')
+        cache_key = self._generate_cache_key(compiled_template, context)
+        if cache_key is None:
+            return self.encode_body(self.render_template(template_content, context), encoding)
         
-        # Simple but fast template compilation
-        def compiled_render(context: Dict[str, Any]) -> str:
-            result = template_content
-            
-            # Fast variable substitution
-            for key, value in context.items():
-                placeholder = f"{{{{ {key} }}}}"
-                if placeholder in result:
-                    result = result.replace(placeholder, str(value))
-            
-            # Handle TuskLang specific syntax
-            if self.tsk:
-                # Process TuskLang functions
-                import re
-                function_pattern = r'\{\{\s*tsk_function\(([^)]+)\)\s*\}\}'
-                
-                def replace_function(match):
+        if self.enable_intelligent_caching:
+            body = self._encoded_get(f"{cache_key}~{encoding}")
+            if body is not None:
+                self.metrics.record_render(
+                    time.perf_counter() - start_time, cached=True, template_hash=compiled_template.template_hash
+                )
+                return body
+        
+        content = self.render_template(template_content, context)
+        # Only fresh cached output (not an error comment or stale copy) gets encodings stored
+        source = self.memory_cache.peek(cache_key) if self.enable_intelligent_caching else None
+        if source is not None:
+            content = source[0]
+        if len(content) < self.compression_min_size and encoding != 'identity':
+            # Not worth compressing; answer with the (also cached) identity body
+            encoding = 'identity'
+            body = self._encoded_get(f"{cache_key}~identity") if source is not None else None
+            if body is not None:
+                return body
+        
+        body = self.encode_body(content, encoding)
+        if source is not None:
+            _, ttl, tags = source
+            self._encoded_set(f"{cache_key}~{encoding}", body, self.cache_ttl if ttl is None else ttl, tags)
+        return body
+    
+    def _encoded_get(self, encoded_key: str) -> Optional[EncodedBody]:
+        """Look up an encoded body in memory, falling back to the disk tier"""
+        body = self.memory_cache.get(encoded_key)
+        if body is not None:
+            return body
+        try:
+            record = self.cache_store.get(encoded_key)
+        except Exception as e:
+            logging.warning(f"Cache load failed: {e}")
+            return None
+        if record is None:
+            return None
+        # Stored as "<etag> <expiry> <config fingerprint> <tags>\n<encoded bytes>",
+        # served without touching the payload
+        header, _, data = record.partition(b'\n')
+        try:
+            etag, expires_at, fingerprint, *tags = header.decode('utf-8').split(' ')
+            ttl = float(expires_at) - time.time()
+        except ValueError:
+            return None
+        if ttl <= 0 or not self._config_matches(tags, fingerprint or None):
+            return None
+        encoding = encoded_key.rsplit('~', 1)[1]
+        body = EncodedBody(data, encoding, etag)
+        self.memory_cache.set(encoded_key, body, ttl=ttl, tags=tags)
+        return body
+    
+    def _encoded_set(self, encoded_key: str, body: EncodedBody, ttl: float, tags: Any = ()):
+        """Save an encoded body to both cache tiers for the rest of its source output's lifetime"""
+        self.memory_cache.set(encoded_key, body, ttl=ttl, tags=tags)
+        try:
+            fingerprint = self.config_fingerprint if tags else None
+            expires_at = f"{time.time() + ttl:.3f}"
+            header = ' '.join([body.etag, expires_at, fingerprint or '', *sorted(tags)]).encode('utf-8')
+            self.cache_store.set(encoded_key, header + b'\n' + bytes(body), ttl, tags)
+        except Exception as e:
+            logging.warning(f"Cache save failed: {e}")
+    
+    def _fragment_cache_key(self, key: str, variables: Dict[str, Any]) -> Optional[str]:
+        """Cache key of a {% cache %} fragment; None when its variables cannot be fingerprinted"""
+        variables_hash = fingerprint_context(variables, shared=self.shared_globals)
+        if variables_hash is None:
+            return None
+        return f"frag_{hash_bytes(key.encode())}_{variables_hash}"
+    
+    def get_fragment(self, key: str, variables: Dict[str, Any]) -> Optional[str]:
+        """
+        Look up a cached template fragment
+        A hit passes the fragment's config tags on to the page; a miss starts recording them
+        """
+        if not self.enable_intelligent_caching:
+            return None
+        fragment_key = self._fragment_cache_key(key, variables)
+        if fragment_key is None:
+            return None
+        content = self._cache_get(fragment_key)
+        if content is not None:
+            self.template_globals.note(self.memory_cache.tags_of(fragment_key))
+        else:
+            self._fragment_tags()[fragment_key] = self.template_globals.start_recording()
+        return content
+    
+    def set_fragment(self, key: str, variables: Dict[str, Any], content: Optional[str],
+                     ttl: Optional[float] = None):
+        """
+        Cache a rendered template fragment and end the recording get_fragment started
+        Content is None when the fragment failed to render: the recording ends, nothing is cached
+        """
+        fragment_key = self._fragment_cache_key(key, variables)
+        if fragment_key is None:
+            return
+        tags = self._fragment_tags().pop(fragment_key, None)
+        if tags is not None:
+            self.template_globals.stop_recording(tags)
+        if content is not None:
+            self._save_to_cache(fragment_key, content, ttl, tags or ())
+    
+    def _fragment_tags(self) -> Dict[str, Set[str]]:
+        """Recordings of the fragments being rendered on this thread"""
+        pending = getattr(self._fragment_local, 'pending', None)
+        if pending is None:
+            pending = self._fragment_local.pending = {}
+        return pending
+    
+    def _compile_template(self, template_content: str, autoescape: bool = False,
+                          loader: Optional[Callable[[str], Optional[str]]] = None) -> CompiledTemplate:
+        """
+        Compile template into a native Python render function
+        Extended and included templates come from loader, or from template_dirs by default
+        """
+        template_hash = self._get_template_hash(template_content)
+        if autoescape:
+            # Escaped output differs, so it gets its own compiled code and cache entries
+            template_hash += '.e'
+        
+        compiled_template = self._get_compiled(template_hash)
+        if compiled_template is not None:
+            # An explicit loader is only passed when reloading, so re-check what was flattened in
+            if loader is None or self.compiler.is_current(compiled_template.dependencies, loader):
+                return compiled_template
+        
+        compiled_template = self._load_compiled(template_hash, loader)
+        if compiled_template is None:
+            compiled_template = self.compiler.compile(
+                template_content, template_hash, autoescape=autoescape, loader=loader
+            )
+            self._save_compiled(compiled_template)
+        self._add_compiled(compiled_template)
+        return compiled_template
+    
+    def _get_compiled(self, template_hash: str) -> Optional[CompiledTemplate]:
+        """An interned compiled template, marked as recently used"""
+        with self._compiled_lock:
+            compiled_template = self._compiled_templates.get(template_hash)
+            if compiled_template is not None:
+                self._compiled_templates.move_to_end(template_hash)
+            return compiled_template
+    
+    def _add_compiled(self, compiled_template: CompiledTemplate):
+        """Intern a compiled template and record which templates it was built from"""
+        with self._compiled_lock:
+            self._compiled_templates[compiled_template.template_hash] = compiled_template
+            self._compiled_templates.move_to_end(compiled_template.template_hash)
+            evicted = []
+            while len(self._compiled_templates) > self.max_compiled_templates:
+                evicted.append(self._compiled_templates.popitem(last=False)[1])
+        for old in evicted:
+            self._forget_compiled(old)
+        for name in compiled_template.dependency_names:
+            self._dependents.setdefault(name, set()).add(compiled_template.template_hash)
+        # Call sites are known at compile time, so their cache policies are read once here
+        for func, constants in compiled_template.call_sites:
+            if func == 'tsk_function' and len(constants) >= 2:
+                self.template_globals.memo.policy(self.tsk, str(constants[0]), str(constants[1]))
+    
+    def _forget_compiled(self, compiled_template: CompiledTemplate):
+        """Drop what the engine keeps about an evicted compiled template (its cached output expires)"""
+        self._render_costs.pop(compiled_template.template_hash, None)
+        for name in compiled_template.dependency_names:
+            dependents = self._dependents.get(name)
+            if dependents is not None:
+                dependents.discard(compiled_template.template_hash)
+                if not dependents:
+                    self._dependents.pop(name, None)
+    
+    def load_template_source(self, name: str) -> Optional[str]:
+        """
+        Source of a named template in template_dirs, or None
+        The default loader for {% extends %} and {% include %}
+        """
+        for directory in self.template_dirs:
+            root = os.path.realpath(directory)
+            path = os.path.realpath(os.path.join(root, name))
+            # Names may not climb out of their template directory
+            if not path.startswith(root + os.sep) or not os.path.isfile(path):
+                continue
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    return f.read()
+            except (OSError, UnicodeDecodeError) as e:
+                logging.warning(f"Template {name} could not be read: {e}")
+        return None
+    
+    def _compiled_path(self, template_hash: str) -> str:
+        """Get compiled artifact file path"""
+        return os.path.join(self.compiled_dir, f"{template_hash}.tpc")
+    
+    @property
+    def artifact_key(self) -> bytes:
+        """Key signing this node's compiled artifacts, created on first use and shared by its workers"""
+        if self._artifact_key is None:
+            path = os.path.join(self.compiled_dir, '.artifact_key')
+            try:
+                fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+            except FileExistsError:
+                with open(path, 'rb') as f:
+                    key = f.read()
+                if len(key) < 32:
+                    raise ValueError(f"{path} is not a valid artifact key")
+            else:
+                key = secrets.token_bytes(32)
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(key)
+            self._artifact_key = key
+        return self._artifact_key
+    
+    def _sign_artifact(self, artifact: bytes) -> bytes:
+        return hmac.new(self.artifact_key, artifact, hashlib.sha256).digest()
+    
+    def _load_compiled(self, template_hash: str,
+                       loader: Optional[Callable[[str], Optional[str]]] = None) -> Optional[CompiledTemplate]:
+        """Load a persisted compiled template, if a usable, signed and up-to-date one exists"""
+        if not self.persist_compiled:
+            return None
+        try:
+            with open(self._compiled_path(template_hash), 'rb') as f:
+                data = f.read()
+            signature, artifact = data[:32], data[32:]
+            if not hmac.compare_digest(signature, self._sign_artifact(artifact)):
+                logging.warning(f"Compiled template {template_hash} has a bad signature, ignoring it")
+                return None
+            return self.compiler.load(artifact, loader)
+        except FileNotFoundError:
+            return None
+        except ValueError as e:
+            # Outdated artifacts are expected after upgrades and layout edits
+            logging.info(f"Compiled template rebuilt: {e}")
+            return None
+        except Exception as e:
+            logging.warning(f"Compiled template load failed: {e}")
+            return None
+    
+    def _save_compiled(self, compiled_template: CompiledTemplate):
+        """Persist a compiled template so other workers can skip compiling it"""
+        if compiled_template.artifact is None or not self.persist_compiled:
+            return
+        path = self._compiled_path(compiled_template.template_hash)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            artifact = compiled_template.artifact
+            signature = self._sign_artifact(artifact)
+            with open(temp_path, 'wb') as f:
+                f.write(signature + artifact)
+            os.replace(temp_path, path)
+        except (OSError, ValueError) as e:
+            logging.warning(f"Compiled template save failed: {e}")
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+    
+    def warmup(self, paths: List[str], parallel: bool = True) -> Dict[str, Any]:
+        """
+        Compile every template file under paths ahead of the first request
+        Artifacts already on disk are loaded instead; new ones are compiled on the process pool
+        """
+        start_time = time.perf_counter()
+        summary = {'files': 0, 'loaded': 0, 'compiled': 0, 'failed': {}}
+        
+        # Warmed directories are also where extended and included templates are found
+        for path in paths:
+            if os.path.isdir(path) and path not in self.template_dirs:
+                self.template_dirs.append(path)
+        
+        # Each file is warmed as given and as the Flask integration serves it
+        jobs: Dict[str, Tuple[str, str, bool]] = {}
+        for path in discover_templates(paths):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    source = f.read()
+            except (OSError, UnicodeDecodeError) as e:
+                summary['failed'][path] = str(e)
+                continue
+            summary['files'] += 1
+            for variant, autoescape in ((source, False), (jinja_template_source(source), flask_autoescape(path))):
+                template_hash = self._get_template_hash(variant) + ('.e' if autoescape else '')
+                jobs.setdefault(template_hash, (path, variant, autoescape))
+        
+        pending = {}
+        for template_hash, job in jobs.items():
+            if self._get_compiled(template_hash) is not None:
+                summary['loaded'] += 1
+                continue
+            compiled_template = self._load_compiled(template_hash)
+            if compiled_template is not None:
+                self._add_compiled(compiled_template)
+                summary['loaded'] += 1
+            else:
+                pending[template_hash] = job
+        
+        futures = {}
+        if parallel and self.enable_parallel_rendering and len(pending) > 1 and (os.cpu_count() or 1) > 1:
+            fragments = self.compiler.fragment_cache is not None
+            for template_hash, (path, source, autoescape) in pending.items():
+                try:
+                    futures[template_hash] = self.process_pool.submit(
+                        _compile_artifact, source, template_hash, autoescape, fragments
+                    )
+                except Exception:
+                    break
+        
+        for template_hash, (path, source, autoescape) in pending.items():
+            try:
+                compiled_template = None
+                future = futures.get(template_hash)
+                if future is not None:
                     try:
-                        func_args = match.group(1).split(',')
-                        if len(func_args) >= 2:
-                            section = func_args[0].strip().strip('"\'')
-                            func_name = func_args[1].strip().strip('"\'')
-                            args = [arg.strip().strip('"\'') for arg in func_args[2:]]
-                            return str(self.tsk.execute_function(section, func_name, *args))
-                    except Exception as e:
-                        logging.warning(f"Function execution failed: {e}")
-                    return match.group(0)
-                
-                result = re.sub(function_pattern, replace_function, result)
-            
-            return result
+                        compiled_template = self.compiler.load(future.result())
+                    except Exception:
+                        # Worker compilers lack app filters and a template loader; compile here instead
+                        compiled_template = None
+                if compiled_template is None:
+                    compiled_template = self.compiler.compile(source, template_hash, autoescape=autoescape)
+            except Exception as e:
+                # Templates the turbo compiler rejects are left to Jinja
+                summary['failed'].setdefault(path, str(e))
+                continue
+            self._save_compiled(compiled_template)
+            self._add_compiled(compiled_template)
+            summary['compiled'] += 1
         
-        self._compiled_templates[template_hash] = compiled_render
-        return compiled_render
+        summary['time'] = time.perf_counter() - start_time
+        logging.info(
+            f"Template warmup: {summary['files']} files, {summary['compiled']} compiled, "
+            f"{summary['loaded']} loaded, {len(summary['failed'])} skipped"
+        )
+        return summary
     
     def render_template(self, template_content: str, context: Dict[str, Any] = None) -> str:
         """
         Render template with high performance optimizations
         Outperforms Flask's default Jinja2 rendering
         """
-        start_time = time.time()
+        start_time = time.perf_counter()
         context = context or {}
         
+        try:
+            # Compiled templates are interned by source, so this is a dict lookup
+            compiled_template = self._compile_template(template_content)
+        except Exception as e:
+            logging.error(f"Template compilation failed: {e}")
+            return f"<!-- Template Error: {e} -->"
+        
         # Generate cache key
-        cache_key = self._generate_cache_key(template_content, context)
+        cache_key = self._generate_cache_key(compiled_template, context)
+        if cache_key is None:
+            # Nothing stable to key the output by: render it, uncached and uncoalesced
+            return self._render_uncached(compiled_template, None, context, start_time)
         
         # Try cache first
-        cached_result = self._load_from_cache(cache_key)
-        if cached_result:
+        cached_result = self._load_from_cache(cache_key, compiled_template, context, start_time)
+        if cached_result is not None:
             return cached_result
         
-        # Compile template for faster rendering
-        compiled_template = self._compile_template(template_content)
+        flight, leader = self._join_flight(cache_key)
+        if not leader:
+            # Another caller is rendering this key; share its result
+            self.metrics.record_coalesced()
+            result = flight.result()
+            if result is not None:
+                return result
+            return self._render_uncached(compiled_template, cache_key, context, start_time)
         
-        # Render template
+        return self._run_flight(flight, compiled_template, cache_key, context, start_time)
+    
+    def _join_flight(self, cache_key: str) -> Tuple[Future, bool]:
+        """Get the in-progress render of a key, and whether the caller must perform it"""
+        with self._inflight_lock:
+            flight = self._inflight.get(cache_key)
+            if flight is not None:
+                return flight, False
+            flight = Future()
+            self._inflight[cache_key] = flight
+            return flight, True
+    
+    def _finish_flight(self, cache_key: str, flight: Future, result: Optional[str]):
+        """Publish a render to its waiters; None tells them to render themselves"""
+        with self._inflight_lock:
+            if self._inflight.get(cache_key) is flight:
+                del self._inflight[cache_key]
+        flight.set_result(result)
+    
+    def _run_flight(self, flight: Future, compiled_template: CompiledTemplate, cache_key: str,
+                    context: Dict[str, Any], start_time: float) -> str:
+        """Render a key as the flight leader"""
+        result = None
         try:
-            result = compiled_template(context)
+            result = self._render_uncached(compiled_template, cache_key, context, start_time)
+            return result
+        finally:
+            self._finish_flight(cache_key, flight, result)
+    
+    def _refresh_in_background(self, compiled_template: CompiledTemplate, cache_key: str,
+                               context: Dict[str, Any]):
+        """Re-render a stale key once, off the request path"""
+        flight, leader = self._join_flight(cache_key)
+        if not leader:
+            return
+        # A dedicated thread, so a refresh never waits behind (or starves) the render pool
+        threading.Thread(
+            target=self._run_flight,
+            args=(flight, compiled_template, cache_key, context, time.perf_counter()),
+            name="tsk-render-refresh",
+            daemon=True
+        ).start()
+    
+    def _render_uncached(self, compiled_template: CompiledTemplate, cache_key: Optional[str],
+                         context: Dict[str, Any], start_time: float) -> str:
+        """Render a cache miss in a single pass, then cache it and record metrics"""
+        try:
+            render_start = time.perf_counter()
+            tags = self.template_globals.start_recording()
+            try:
+                result = compiled_template(context)
+            finally:
+                self.template_globals.stop_recording(tags)
+            self._record_render_cost(compiled_template.template_hash, time.perf_counter() - render_start)
             
-            # Save to cache
-            self._save_to_cache(cache_key, result)
+            # Save to cache, tagged with the config sections the render read
+            self._save_to_cache(cache_key, result, tags=tags)
             
             # Record metrics
-            render_time = time.time() - start_time
-            self.metrics.record_render(render_time, cached=False)
+            render_time = time.perf_counter() - start_time
+            self.metrics.record_render(render_time, cached=False, template_hash=compiled_template.template_hash)
             
             return result
         
@@ -285,41 +1234,382 @@ class TurboTemplateEngine:
             logging.error(f"Template rendering failed: {e}")
             return f"<!-- Template Error: {e} -->"
     
-    def render_template_async(self, template_content: str, context: Dict[str, Any] = None) -> asyncio.Future:
-        """Render template asynchronously"""
+    def _record_render_cost(self, template_hash: str, duration: float):
+        """Fold a measured render time into the template's running cost estimate"""
+        previous = self._render_costs.get(template_hash)
+        if previous is None:
+            self._render_costs[template_hash] = duration
+        else:
+            self._render_costs[template_hash] = previous * 0.8 + duration * 0.2
+    
+    def _should_offload(self, compiled_template: CompiledTemplate) -> bool:
+        """Whether an async render is expensive enough to leave the event loop"""
         if not self.enable_parallel_rendering:
-            # Fallback to synchronous rendering
-            result = self.render_template(template_content, context)
-            future = asyncio.Future()
-            future.set_result(result)
-            return future
-        
-        loop = asyncio.get_event_loop()
-        return loop.run_in_executor(
-            self.render_pool,
-            self.render_template,
-            template_content,
-            context
+            return False
+        cost = self._render_costs.get(compiled_template.template_hash)
+        # Templates that have never rendered are offloaded until measured
+        return cost is None or cost >= self.async_offload_threshold
+    
+    def _async_semaphore(self, loop: asyncio.AbstractEventLoop) -> asyncio.Semaphore:
+        """Semaphore bounding offloaded renders on the given event loop"""
+        semaphore = self._async_semaphores.get(loop)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_async_renders)
+            self._async_semaphores[loop] = semaphore
+        return semaphore
+    
+    def stream(self, template_content: str, context: Dict[str, Any] = None,
+               chunk_size: int = 8192) -> Iterator[str]:
+        """
+        Render template incrementally, yielding chunks of roughly chunk_size characters
+        Cached output is served from cache; a fresh render is cached once it completes,
+        unless it grew past stream_cache_limit characters, so memory stays bounded
+        """
+        start_time = time.perf_counter()
+        context = context or {}
+        
+        try:
+            compiled_template = self._compile_template(template_content)
+        except Exception as e:
+            logging.error(f"Template compilation failed: {e}")
+            yield f"<!-- Template Error: {e} -->"
+            return
+        
+        cache_key = self._generate_cache_key(compiled_template, context)
+        cached_result = self._load_from_cache(cache_key, compiled_template, context, start_time)
+        if cached_result is not None:
+            for offset in range(0, len(cached_result), chunk_size):
+                yield cached_result[offset:offset + chunk_size]
+            return
+        
+        buffer = []
+        buffered = 0
+        # Everything yielded so far, while the output is small enough to cache
+        rendered: Optional[List[str]] = [] if cache_key is not None else None
+        rendered_size = 0
+        tags: Set[str] = set()
+        parts = compiled_template.generate(context)
+        try:
+            while True:
+                # Config reads are recorded per step: other renders may run on this thread between chunks
+                frame = self.template_globals.start_recording()
+                try:
+                    part = next(parts)
+                except StopIteration:
+                    break
+                finally:
+                    self.template_globals.stop_recording(frame)
+                    tags |= frame
+                buffer.append(part)
+                buffered += len(part)
+                if rendered is not None:
+                    rendered.append(part)
+                    rendered_size += len(part)
+                    if rendered_size > self.stream_cache_limit:
+                        rendered = None
+                if buffered >= chunk_size:
+                    yield ''.join(buffer)
+                    buffer = []
+                    buffered = 0
+        except Exception as e:
+            logging.error(f"Template rendering failed: {e}")
+            buffer.append(f"<!-- Template Error: {e} -->")
+            rendered = None
+        
+        if buffer:
+            yield ''.join(buffer)
+        
+        if rendered is not None:
+            self._save_to_cache(cache_key, ''.join(rendered), tags=tags)
+        self.metrics.record_render(
+            time.perf_counter() - start_time, cached=False, template_hash=compiled_template.template_hash
         )
     
-    def batch_render(self, templates: List[Dict[str, Any]]) -> List[str]:
-        """Render multiple templates in parallel"""
-        if not self.enable_parallel_rendering:
-            return [self.render_template(t['content'], t.get('context', {})) for t in templates]
+    async def render_template_async(self, template_content: str, context: Dict[str, Any] = None) -> str:
+        """
+        Render template from a coroutine
+        Cache hits and cheap templates render on the event loop; expensive ones go to the render pool
+        """
+        start_time = time.perf_counter()
+        context = context or {}
+        
+        try:
+            compiled_template = self._compile_template(template_content)
+        except Exception as e:
+            logging.error(f"Template compilation failed: {e}")
+            return f"<!-- Template Error: {e} -->"
+        
+        cache_key = self._generate_cache_key(compiled_template, context)
+        if cache_key is None:
+            # Nothing stable to key the output by: render it, uncached and uncoalesced
+            if not self._should_offload(compiled_template):
+                self.metrics.record_async_render(offloaded=False)
+                return self._render_uncached(compiled_template, None, context, start_time)
+            loop = asyncio.get_running_loop()
+            async with self._async_semaphore(loop):
+                self.metrics.record_async_render(offloaded=True)
+                return await loop.run_in_executor(
+                    self.render_pool, self._render_uncached, compiled_template, None, context, start_time
+                )
         
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            futures = [
-                executor.submit(self.render_template, t['content'], t.get('context', {}))
-                for t in templates
-            ]
-            return [future.result() for future in futures]
+        cached_result = self._load_from_cache(cache_key, compiled_template, context, start_time)
+        if cached_result is not None:
+            self.metrics.record_async_render(offloaded=False)
+            return cached_result
+        
+        flight, leader = self._join_flight(cache_key)
+        if not leader:
+            self.metrics.record_coalesced()
+            # Shielded so a cancelled waiter does not cancel the shared render
+            result = await asyncio.shield(asyncio.wrap_future(flight))
+            if result is not None:
+                return result
+            return self._render_uncached(compiled_template, cache_key, context, start_time)
+        
+        if not self._should_offload(compiled_template):
+            self.metrics.record_async_render(offloaded=False)
+            return self._run_flight(flight, compiled_template, cache_key, context, start_time)
+        
+        loop = asyncio.get_running_loop()
+        queued_at = time.perf_counter()
+        submitted = False
+        try:
+            async with self._async_semaphore(loop):
+                render = loop.run_in_executor(
+                    self.render_pool,
+                    self._render_offloaded,
+                    flight,
+                    compiled_template,
+                    cache_key,
+                    context,
+                    queued_at
+                )
+                submitted = True
+                return await render
+        except BaseException:
+            # Cancelled before the render started: release the waiters
+            if not submitted:
+                self._finish_flight(cache_key, flight, None)
+            raise
+    
+    def _render_offloaded(self, flight: Future, compiled_template: CompiledTemplate, cache_key: str,
+                          context: Dict[str, Any], queued_at: float) -> str:
+        """Render pool task: render a miss, timing queue wait separately from render time"""
+        start_time = time.perf_counter()
+        self.metrics.record_async_render(offloaded=True, queue_wait=start_time - queued_at)
+        return self._run_flight(flight, compiled_template, cache_key, context, start_time)
+    
+    def _choose_batch_mode(self, batch_size: int) -> str:
+        """Pick how to execute a batch of renders based on its size"""
+        if not self.enable_parallel_rendering or self.max_workers <= 1:
+            return 'inline'
+        if batch_size >= self.batch_process_threshold and (os.cpu_count() or 1) > 1:
+            return 'process'
+        if batch_size >= self.batch_thread_threshold:
+            return 'thread'
+        return 'inline'
+    
+    def batch_render(self, templates: List[Dict[str, Any]], mode: str = 'auto') -> List[str]:
+        """
+        Render multiple templates
+        mode is 'inline', 'thread', 'process' or 'auto' to choose by batch size
+        """
+        if not templates:
+            return []
+        if mode == 'auto':
+            mode = self._choose_batch_mode(len(templates))
+        
+        if mode == 'process':
+            return self._batch_render_processes(templates)
+        if mode == 'thread':
+            return list(self.render_pool.map(
+                lambda t: self.render_template(t['content'], t.get('context', {})),
+                templates
+            ))
+        return [self.render_template(t['content'], t.get('context', {})) for t in templates]
+    
+    def _batch_render_processes(self, templates: List[Dict[str, Any]]) -> List[str]:
+        """Render cache misses on the process pool, one chunk of contexts per task"""
+        results: List[Optional[str]] = [None] * len(templates)
+        
+        # Group misses by template so each task carries its template source once
+        groups: Dict[str, List[int]] = {}
+        compiled_by_hash: Dict[str, CompiledTemplate] = {}
+        cache_keys: Dict[int, str] = {}
+        for index, item in enumerate(templates):
+            context = item.get('context') or {}
+            try:
+                compiled_template = self._compile_template(item['content'])
+            except Exception as e:
+                logging.error(f"Template compilation failed: {e}")
+                results[index] = f"<!-- Template Error: {e} -->"
+                continue
+            
+            cache_key = self._generate_cache_key(compiled_template, context)
+            cached_result = self._load_from_cache(cache_key, compiled_template, context)
+            if cached_result is not None:
+                results[index] = cached_result
+                continue
+            
+            cache_keys[index] = cache_key
+            compiled_by_hash[compiled_template.template_hash] = compiled_template
+            groups.setdefault(compiled_template.template_hash, []).append(index)
+        
+        tasks = []
+        for template_hash, indexes in groups.items():
+            compiled_template = compiled_by_hash[template_hash]
+            if not self._renders_in_workers(compiled_template):
+                # Rendered here, where the config sections it reads are recorded for its tags
+                tasks.append((None, indexes, compiled_template, time.perf_counter()))
+                continue
+            chunk_size = max(1, -(-len(indexes) // (self.max_workers * 4)))
+            for offset in range(0, len(indexes), chunk_size):
+                chunk = indexes[offset:offset + chunk_size]
+                contexts = [templates[index].get('context') or {} for index in chunk]
+                start_time = time.perf_counter()
+                try:
+                    future = self.process_pool.submit(
+                        _render_chunk, template_hash, compiled_template.source, contexts
+                    )
+                except Exception as e:
+                    logging.warning(f"Process batch chunk not submitted, rendering inline: {e}")
+                    future = None
+                tasks.append((future, chunk, compiled_template, start_time))
+        
+        warned = False
+        for future, chunk, compiled_template, start_time in tasks:
+            rendered = [None] * len(chunk)
+            if future is not None:
+                try:
+                    rendered = future.result()
+                except Exception as e:
+                    # Unpicklable contexts or a broken pool: render this chunk here
+                    if not warned:
+                        logging.warning(f"Process batch chunk failed, rendering inline: {e}")
+                        warned = True
+            
+            per_item = (time.perf_counter() - start_time) / len(chunk)
+            for index, result in zip(chunk, rendered):
+                context = templates[index].get('context') or {}
+                if result is None:
+                    # Failed worker renders are redone here so errors are reported, not cached
+                    results[index] = self._render_uncached(
+                        compiled_template, cache_keys[index], context, time.perf_counter()
+                    )
+                    continue
+                results[index] = result
+                self._save_to_cache(cache_keys[index], result)
+                self.metrics.record_render(per_item, cached=False, template_hash=compiled_template.template_hash)
+        
+        return results
+    
+    def _renders_in_workers(self, compiled_template: CompiledTemplate) -> bool:
+        """
+        Whether a process pool worker renders the template exactly as this engine would
+        Workers only have the compiler's defaults: not the bound TuskLang config, app filters,
+        globals, or a loader for the templates it extends or includes
+        """
+        if compiled_template.dependencies:
+            return False
+        compiler = self.compiler
+        if any(compiler.filters.get(name) is not DEFAULT_FILTERS.get(name)
+               for name in compiled_template.used_filters):
+            return False
+        if any(compiler.tests.get(name) is not DEFAULT_TESTS.get(name)
+               for name in compiled_template.used_tests):
+            return False
+        return not any(name in compiler.globals and compiler.globals[name] is not DEFAULT_GLOBALS.get(name)
+                       for name in compiled_template.referenced_names)
+    
+    def _delete_cached_prefix(self, prefix: str) -> int:
+        """Remove cached output whose key starts with prefix from both tiers"""
+        removed = self.memory_cache.delete_prefix(prefix)
+        try:
+            removed += self.cache_store.delete_prefix(prefix)
+        except Exception as e:
+            logging.warning(f"Cache invalidation failed: {e}")
+        return removed
+    
+    def invalidate_template(self, template_content: str) -> int:
+        """Forget the compiled code and cached output of a template whose source changed"""
+        removed = 0
+        for variant in {template_content, jinja_template_source(template_content)}:
+            base_hash = hashlib.sha256(variant.encode()).hexdigest()
+            with self._compiled_lock:
+                self._template_hashes.pop((hash(variant), len(variant)), None)
+            for template_hash in (base_hash, base_hash + '.e'):
+                with self._compiled_lock:
+                    self._compiled_templates.pop(template_hash, None)
+                self._render_costs.pop(template_hash, None)
+                removed += self._delete_cached_prefix(f"{template_hash}_")
+                removed += self._delete_cached_prefix(f"{template_hash}.")
+        return removed
+    
+    def invalidate_dependents(self, name: str) -> int:
+        """Forget every compiled template, and its output, that extends or includes the named template"""
+        removed = 0
+        for template_hash in self._dependents.pop(name, ()):
+            with self._compiled_lock:
+                compiled_template = self._compiled_templates.pop(template_hash, None)
+            self._render_costs.pop(template_hash, None)
+            if compiled_template is not None:
+                removed += self._delete_cached_prefix(f"{compiled_template.cache_namespace}_")
+        return removed
+    
+    def invalidate_config_sections(self, sections: Optional[List[str]] = None,
+                                   fingerprint: Optional[str] = None) -> int:
+        """
+        Drop cached output (pages, fragments and their encodings) that read the given
+        TuskLang config sections; None drops everything that read any config
+        With the changed config's fingerprint, output peers still render against the old
+        config is not read back from the shared store
+        """
+        if fingerprint is not None:
+            self.config_fingerprint = fingerprint
+        else:
+            self._config_generation += 1
+        tags = config_tags(sections)
+        self.template_globals.memo.invalidate(sections)
+        removed = self.memory_cache.delete_tags(tags)
+        try:
+            removed += self.cache_store.delete_tags(tags)
+        except Exception as e:
+            logging.warning(f"Cache invalidation failed: {e}")
+        described = 'All config sections' if sections is None else f"Config sections {sorted(sections)}"
+        logging.info(f"{described} changed, {removed} cache entries dropped")
+        return removed
+    
+    def set_tsk(self, tsk, fingerprint: Optional[str] = None):
+        """
+        Render templates against another TuskLang instance, dropping output built from other config
+        With a fingerprint of the config's contents, shared output rendered against the same
+        config is kept, so a worker that boots with its peers' config does not clear their cache
+        """
+        if tsk is self.tsk and fingerprint == self.config_fingerprint:
+            return
+        self.tsk = tsk
+        self.config_fingerprint = fingerprint
+        self.template_globals.tsk = tsk
+        if fingerprint is not None:
+            try:
+                if self.cache_store.get(CONFIG_FINGERPRINT_KEY) == fingerprint.encode():
+                    # Memoized function results belong to the old instance
+                    self.template_globals.memo.invalidate()
+                    return
+            except Exception as e:
+                logging.warning(f"Config fingerprint check failed: {e}")
+        self.invalidate_config_sections(fingerprint=fingerprint)
+        if fingerprint is not None:
+            try:
+                self.cache_store.set(CONFIG_FINGERPRINT_KEY, fingerprint.encode(), CONFIG_FINGERPRINT_TTL)
+            except Exception as e:
+                logging.warning(f"Config fingerprint save failed: {e}")
     
     def clear_cache(self):
         """Clear all cached templates"""
+        self.memory_cache.clear()
         try:
-            for file in os.listdir(self.cache_dir):
-                if file.endswith('.cache'):
-                    os.remove(os.path.join(self.cache_dir, file))
+            self.cache_store.clear()
             logging.info("Template cache cleared")
         except Exception as e:
             logging.error(f"Cache clear failed: {e}")
@@ -334,43 +1624,271 @@ class TurboTemplateEngine:
             "parallel_rendering": self.enable_parallel_rendering,
             "intelligent_caching": self.enable_intelligent_caching,
             "compiled_templates": len(self._compiled_templates),
+            "memory_cache": self.memory_cache.get_stats(),
+            "cache_store": self.cache_store.get_stats(),
+            "function_memo": self.template_globals.memo.get_stats(),
             "fast_json_available": FAST_JSON_AVAILABLE,
             "ujson_available": UJSON_AVAILABLE,
             "msgpack_available": MSGPACK_AVAILABLE
         })
         return stats
     
-    def optimize_for_flask(self, flask_app):
-        """Optimize Flask app for high-performance template rendering"""
-        # Monkey patch Flask's render_template for performance
-        original_render_template = flask_app.jinja_env.get_template
+    def optimize_for_flask(self, flask_app, turbo_templates: Optional[bool] = None,
+                           bytecode_cache: Optional[bool] = None):
+        """
+        Optimize Flask app for high-performance template rendering
+        Jinja gets a shared on-disk bytecode cache, and with turbo_templates the app's own
+        templates are served by this engine wherever the turbo compiler accepts them
+        """
+        if turbo_templates is None:
+            turbo_templates = flask_app.config.get('TSK_TURBO_TEMPLATES', False)
+        if bytecode_cache is None:
+            bytecode_cache = flask_app.config.get('TSK_JINJA_BYTECODE_CACHE', True)
         
-        def optimized_get_template(name):
-            # Use our high-performance engine for specific templates
-            if hasattr(flask_app, 'tsk_turbo_engine'):
-                # This would require more complex integration
-                # For now, we'll use the original
-                pass
-            return original_render_template(name)
+        jinja_env = flask_app.jinja_env
+        if bytecode_cache and jinja_env.bytecode_cache is None:
+            from jinja2 import FileSystemBytecodeCache
+            
+            # Keyed by template name and checked against the source, so workers can share it
+            bytecode_dir = os.path.join(self.cache_dir, 'jinja_bytecode')
+            os.makedirs(bytecode_dir, exist_ok=True)
+            jinja_env.bytecode_cache = FileSystemBytecodeCache(bytecode_dir)
+        
+        if turbo_templates and not isinstance(getattr(flask_app, 'tsk_turbo_templates', None), FlaskTurboTemplates):
+            flask_app.tsk_turbo_templates = FlaskTurboTemplates(self, flask_app)
+            jinja_env.get_template = flask_app.tsk_turbo_templates.get_template
+            if flask_app.config.get('TSK_TEMPLATE_WARMUP', True):
+                flask_app.tsk_turbo_templates.warmup()
         
-        flask_app.jinja_env.get_template = optimized_get_template
         flask_app.tsk_turbo_engine = self
         
         logging.info("Flask app optimized for TuskLang turbo rendering")
 
 
+class TurboFlaskTemplate:
+    """
+    Stand-in for a Jinja template that renders through the turbo engine
+    Flask only calls render() and generate() on the templates it gets back
+    """
+    
+    def __init__(self, name: str, filename: str, compiled_template: CompiledTemplate,
+                 templates: 'FlaskTurboTemplates'):
+        self.name = name
+        self.filename = filename
+        self.compiled_template = compiled_template
+        self.templates = templates
+        self.environment = templates.jinja_env
+    
+    def _context(self, args: tuple, kwargs: Dict[str, Any]) -> ChainMap:
+        """Render context layered over the Jinja environment globals"""
+        return ChainMap(dict(*args, **kwargs), self.environment.globals)
+    
+    def render(self, *args, **kwargs) -> str:
+        """Render the template like jinja2.Template.render"""
+        try:
+            return self.compiled_template.render(self._context(args, kwargs))
+        except Exception as e:
+            return self.templates.fallback(self.name, e).render(*args, **kwargs)
+    
+    def generate(self, *args, **kwargs) -> Iterator[str]:
+        """Yield rendered chunks like jinja2.Template.generate"""
+        parts = self.compiled_template.generate(self._context(args, kwargs))
+        try:
+            first = next(parts, None)
+        except Exception as e:
+            # Nothing has been sent yet, so Jinja can still take over
+            yield from self.templates.fallback(self.name, e).generate(*args, **kwargs)
+            return
+        if first is not None:
+            yield first
+            yield from parts
+
+
+class FlaskTurboTemplates:
+    """
+    Serves templates from a Flask app's template folder with the turbo engine
+    Templates the turbo compiler rejects, or that fail to render, fall back to Jinja one by one
+    """
+    
+    def __init__(self, engine: TurboTemplateEngine, flask_app):
+        from jinja2 import Undefined
+        
+        self.engine = engine
+        self.jinja_env = flask_app.jinja_env
+        self.jinja_get_template = self.jinja_env.get_template
+        if not any(globals_ is self.jinja_env.globals for globals_ in engine.shared_globals):
+            engine.shared_globals.append(self.jinja_env.globals)
+        self.template_folder = None
+        if flask_app.template_folder:
+            self.template_folder = os.path.realpath(os.path.join(flask_app.root_path, flask_app.template_folder))
+        # Turbo output only matches Jinja's default undefined handling and lexer settings
+        env = self.jinja_env
+        self.enabled = (
+            env.undefined is Undefined and env.finalize is None
+            and not env.trim_blocks and not env.lstrip_blocks and env.newline_sequence == '\n'
+            and (env.block_start_string, env.variable_start_string, env.comment_start_string) == ('{%', '{{', '{#')
+        )
+        # Template name -> (turbo template or None for Jinja, uptodate callable)
+        self._templates: Dict[str, Tuple[Optional[TurboFlaskTemplate], Optional[Callable]]] = {}
+    
+    def get_template(self, name, parent=None, globals=None):
+        """Replacement for jinja_env.get_template"""
+        # Lookups made by Jinja-rendered templates, and template-level globals, stay on Jinja
+        if not self.enabled or parent is not None or globals or not isinstance(name, str):
+            return self.jinja_get_template(name, parent, globals)
+        
+        entry = self._templates.get(name)
+        if entry is None or (self.jinja_env.auto_reload and entry[1] is not None and not entry[1]()):
+            entry = self._load(name)
+            if entry is None:
+                return self.jinja_get_template(name)
+            self._templates[name] = entry
+        
+        template = entry[0]
+        return template if template is not None else self.jinja_get_template(name)
+    
+    def warmup(self) -> int:
+        """Load every template at boot so no request pays for compiling one; returns the turbo count"""
+        if not self.enabled or self.jinja_env.loader is None:
+            return 0
+        turbo_count = 0
+        for name in self.jinja_env.list_templates():
+            try:
+                if isinstance(self.get_template(name), TurboFlaskTemplate):
+                    turbo_count += 1
+            except Exception as e:
+                logging.warning(f"Template warmup skipped {name}: {e}")
+        return turbo_count
+    
+    def _load(self, name: str) -> Optional[Tuple[Optional[TurboFlaskTemplate], Optional[Callable]]]:
+        """Compile a template for turbo rendering, or decide it stays on Jinja"""
+        from jinja2 import TemplateNotFound
+        
+        try:
+            source, filename, uptodate = self.jinja_env.loader.get_source(self.jinja_env, name)
+        except TemplateNotFound:
+            return None
+        
+        if not filename or not self.template_folder or \
+                not os.path.realpath(filename).startswith(self.template_folder + os.sep):
+            return None, uptodate
+        
+        source = jinja_template_source(source, self.jinja_env.keep_trailing_newline)
+        self._sync_filters()
+        autoescape = self.jinja_env.autoescape
+        if callable(autoescape):
+            autoescape = autoescape(name)
+        
+        # Extended and included templates resolve through Jinja's loader, exactly as Jinja would
+        checks = [uptodate] if uptodate is not None else []
+        
+        def load_dependency(dependency: str) -> Optional[str]:
+            try:
+                dependency_source, _, dependency_uptodate = self.jinja_env.loader.get_source(
+                    self.jinja_env, dependency
+                )
+            except TemplateNotFound:
+                return None
+            if dependency_uptodate is not None:
+                checks.append(dependency_uptodate)
+            return jinja_template_source(dependency_source, self.jinja_env.keep_trailing_newline)
+        
+        try:
+            compiled_template = self.engine._compile_template(
+                source, autoescape=bool(autoescape), loader=load_dependency
+            )
+        except Exception as e:
+            logging.info(f"Template {name} served by Jinja: {e}")
+            return None, uptodate
+        
+        if len(checks) > 1:
+            # Stale when the template or anything it was flattened from changes
+            uptodate = lambda: all(check() for check in checks)
+        return TurboFlaskTemplate(name, filename, compiled_template, self), uptodate
+    
+    def _sync_filters(self):
+        """
+        Make the app's Jinja filters available to turbo templates
+        Filters the app replaced or added win over the compiler's built-ins of the same name
+        """
+        from jinja2.defaults import DEFAULT_FILTERS as JINJA_FILTERS
+        from jinja2.filters import do_tojson
+        
+        compiler = self.engine.compiler
+        for filter_name, func in self.jinja_env.filters.items():
+            if func is do_tojson:
+                compiler.add_filter(filter_name, self._tojson_filter())
+            elif func is JINJA_FILTERS.get(filter_name) and filter_name in compiler.filters:
+                # The built-in renders the same as Jinja's own filter
+                continue
+            # Filters that need the Jinja context or environment cannot run outside Jinja
+            elif getattr(func, 'jinja_pass_arg', None) is None:
+                compiler.add_filter(filter_name, func)
+    
+    def _tojson_filter(self) -> Callable:
+        """Jinja's tojson with the app's json policies, which Flask points at app.json"""
+        from jinja2.utils import htmlsafe_json_dumps
+        
+        policies = self.jinja_env.policies
+        
+        def tojson(value, indent=None):
+            kwargs = dict(policies['json.dumps_kwargs'])
+            if indent is not None:
+                kwargs['indent'] = indent
+            return htmlsafe_json_dumps(value, dumps=policies['json.dumps_function'], **kwargs)
+        
+        return tojson
+    
+    def invalidate(self, name: str):
+        """Forget a template, and every template that extends or includes it, so they reload"""
+        self._templates.pop(name, None)
+        for other, (template, _) in list(self._templates.items()):
+            if template is not None and name in template.compiled_template.dependency_names:
+                self._templates.pop(other, None)
+    
+    def fallback(self, name: str, error: Exception):
+        """Switch a template to Jinja after a turbo render failure"""
+        logging.warning(f"Turbo render of {name} failed, using Jinja: {error}")
+        entry = self._templates.get(name)
+        self._templates[name] = (None, entry[1] if entry else None)
+        return self.jinja_get_template(name)
+
+
 class HotReloadOptimizer:
     """
     Optimizes Flask hot-reload performance
-    Reduces reload time from 10 minutes to seconds
+    Watches the app's directories and applies template and config edits in place,
+    so only Python changes need a process restart
+    Without an app_dir, the Flask app's root path and template folders are watched
     """
     
-    def __init__(self, app_dir: str, watch_patterns: List[str] = None):
-        self.app_dir = app_dir
+    IGNORED_DIRS = frozenset(('.git', '__pycache__', 'node_modules', 'venv', '.venv', '.tox', 'site-packages'))
+    
+    def __init__(self, app_dir: Optional[str] = None, watch_patterns: List[str] = None,
+                 engine: Optional[TurboTemplateEngine] = None,
+                 debounce: float = 0.1, poll_interval: float = 1.0):
+        self.app_dir = os.path.abspath(app_dir) if app_dir else None
+        self.watch_dirs: List[str] = [self.app_dir] if self.app_dir else []
         self.watch_patterns = watch_patterns or ['*.py', '*.html', '*.tsk']
-        self.file_hashes = {}
+        self.engine = engine
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.flask_app = None
+        # Content hash of every watched file, so saves without changes are ignored
+        self.file_hashes: Dict[str, str] = {}
+        self.template_sources: Dict[str, str] = {}
+        self.config_sections: Dict[str, Dict[str, str]] = {}
         self.last_reload = time.time()
         self.reload_count = 0
+        self.invalidation_count = 0
+        self.callbacks: List[Callable[[Dict[str, Any]], None]] = []
+        
+        self._pending: Dict[str, float] = {}
+        self._pending_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._observer = None
+        self._threads: List[threading.Thread] = []
         
     def should_reload(self, changed_files: List[str]) -> bool:
         """Determine if reload is necessary based on file changes"""
@@ -378,18 +1896,15 @@ class HotReloadOptimizer:
         if time.time() - self.last_reload < 1:  # Minimum 1 second between reloads
             return False
         
-        # Only reload for significant changes
-        significant_extensions = {'.py', '.tsk', '.html', '.js', '.css'}
-        significant_changes = [
-            f for f in changed_files 
-            if any(f.endswith(ext) for ext in significant_extensions)
-        ]
-        
-        return len(significant_changes) > 0
+        # Templates and config are applied in place; only changed code needs a restart
+        return any(
+            f.endswith('.py') and self._hash_file(os.path.abspath(f)) != self.file_hashes.get(os.path.abspath(f))
+            for f in changed_files
+        )
     
     def optimize_reload(self, flask_app):
         """Apply reload optimizations to Flask app"""
-        # Disable unnecessary reloads
+        # Template edits are picked up by the watcher instead of per-request mtime checks
         flask_app.config['TEMPLATES_AUTO_RELOAD'] = False
         flask_app.config['SEND_FILE_MAX_AGE_DEFAULT'] = 0
         
@@ -397,7 +1912,464 @@ class HotReloadOptimizer:
         if hasattr(flask_app.jinja_env, 'cache_size'):
             flask_app.jinja_env.cache_size = 1000
         
+        self.flask_app = flask_app
+        self.engine = self.engine or getattr(flask_app, 'tsk_turbo_engine', None)
+        if not self.watch_dirs:
+            self.app_dir = os.path.abspath(flask_app.root_path)
+            self.watch_dirs = self.app_watch_dirs(flask_app)
+        # Watching costs a thread and a scan of every watched file, so it is never implied by debug
+        if flask_app.config.get('TSK_HOT_RELOAD', False):
+            self.start()
+        
         logging.info("Flask app optimized for fast reloads")
+    
+    @staticmethod
+    def app_watch_dirs(flask_app) -> List[str]:
+        """The app's root path, its template folders and its config's folder, outermost only"""
+        dirs = [flask_app.root_path]
+        for owner in [flask_app] + list(flask_app.iter_blueprints()):
+            if owner.template_folder:
+                dirs.append(os.path.join(owner.root_path, owner.template_folder))
+        config_path = flask_app.config.get('TSK_CONFIG_PATH')
+        if config_path:
+            dirs.append(os.path.dirname(config_path))
+        
+        watched = []
+        for path in sorted({os.path.realpath(d) for d in dirs if os.path.isdir(d)}):
+            if not any(path.startswith(parent + os.sep) for parent in watched):
+                watched.append(path)
+        return watched
+    
+    # Watching
+    
+    def start(self):
+        """Index watched files and start watching for changes"""
+        if self._threads:
+            return
+        if not self.watch_dirs:
+            logging.warning("Hot reload has no directories to watch")
+            return
+        self._stopped.clear()
+        for path in self._scan():
+            self._index(path)
+        
+        if not self._start_observer():
+            self._spawn(self._poll_loop, 'tsk-reload-poll')
+        self._spawn(self._debounce_loop, 'tsk-reload-debounce')
+        logging.info(f"Watching {', '.join(self.watch_dirs)} ({len(self.file_hashes)} files)")
+    
+    def stop(self):
+        """Stop watching"""
+        self._stopped.set()
+        self._wakeup.set()
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join()
+            self._observer = None
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+    
+    def _spawn(self, target: Callable, name: str):
+        thread = threading.Thread(target=target, name=name, daemon=True)
+        thread.start()
+        self._threads.append(thread)
+    
+    def _start_observer(self) -> bool:
+        """Watch with watchdog (inotify on Linux); False when it is unavailable"""
+        try:
+            from watchdog.observers import Observer
+            from watchdog.events import FileSystemEventHandler
+        except ImportError:
+            logging.info("watchdog not available, polling for template changes")
+            return False
+        
+        optimizer = self
+        
+        class ChangeHandler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                if event.is_directory:
+                    return
+                optimizer._queue_change(event.src_path)
+                dest_path = getattr(event, 'dest_path', None)
+                if dest_path:
+                    optimizer._queue_change(dest_path)
+        
+        try:
+            observer = Observer()
+            for path in self.watch_dirs:
+                observer.schedule(ChangeHandler(), path, recursive=True)
+            observer.start()
+        except Exception as e:
+            logging.warning(f"File watcher failed, polling instead: {e}")
+            return False
+        self._observer = observer
+        return True
+    
+    def _poll_loop(self):
+        """Fallback watcher: compare file stats every poll_interval"""
+        stats = {path: self._stat(path) for path in self._scan()}
+        while not self._stopped.wait(self.poll_interval):
+            current = {path: self._stat(path) for path in self._scan()}
+            for path in current.keys() | stats.keys():
+                if current.get(path) != stats.get(path):
+                    self._queue_change(path)
+            stats = current
+    
+    @staticmethod
+    def _stat(path: str) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(path)
+            return stat.st_mtime_ns, stat.st_size
+        except OSError:
+            return None
+    
+    def _scan(self) -> Iterator[str]:
+        """Every watched file under the watched directories"""
+        for watch_dir in self.watch_dirs:
+            for root, dirs, files in os.walk(watch_dir):
+                dirs[:] = [d for d in dirs if d not in self.IGNORED_DIRS]
+                for name in files:
+                    path = os.path.join(root, name)
+                    if self._matches(path):
+                        yield path
+    
+    def _matches(self, path: str) -> bool:
+        name = os.path.basename(path)
+        return any(fnmatch.fnmatch(name, pattern) for pattern in self.watch_patterns)
+    
+    def _queue_change(self, path: str):
+        if not self._matches(path):
+            return
+        with self._pending_lock:
+            self._pending[os.path.abspath(path)] = time.monotonic()
+            self._wakeup.set()
+    
+    def _debounce_loop(self):
+        """Apply queued changes once a burst of events has been quiet for debounce seconds"""
+        while not self._stopped.is_set():
+            self._wakeup.wait()
+            if self._stopped.is_set():
+                break
+            while True:
+                with self._pending_lock:
+                    last_event = max(self._pending.values(), default=0)
+                remaining = last_event + self.debounce - time.monotonic()
+                if remaining <= 0 or self._stopped.wait(remaining):
+                    break
+            with self._pending_lock:
+                paths = list(self._pending)
+                self._pending.clear()
+                self._wakeup.clear()
+            try:
+                self.process_changes(paths)
+            except Exception as e:
+                logging.error(f"Hot reload failed: {e}")
+    
+    # Invalidation
+    
+    @staticmethod
+    def _hash_file(path: str) -> Optional[str]:
+        try:
+            with open(path, 'rb') as f:
+                return hashlib.sha256(f.read()).hexdigest()
+        except OSError:
+            return None
+    
+    def _index(self, path: str):
+        """Record the current state of a watched file"""
+        try:
+            with open(path, 'rb') as f:
+                content = f.read()
+        except OSError:
+            return
+        self.file_hashes[path] = hashlib.sha256(content).hexdigest()
+        text = content.decode('utf-8', errors='replace')
+        if path.endswith(TEMPLATE_EXTENSIONS):
+            self.template_sources[path] = text
+        elif path.endswith('.tsk'):
+            self.config_sections[path] = config_section_digests(text)
+    
+    def process_changes(self, paths: List[str]) -> Dict[str, Any]:
+        """Invalidate exactly what the changed files affect"""
+        start_time = time.perf_counter()
+        summary = {'templates': [], 'config_sections': [], 'code': [], 'invalidated': 0}
+        
+        for path in sorted({os.path.abspath(p) for p in paths}):
+            previous_hash = self.file_hashes.get(path)
+            if self._hash_file(path) == previous_hash:
+                continue  # Touched or saved without changes
+            
+            if path.endswith(TEMPLATE_EXTENSIONS):
+                summary['invalidated'] += self._template_changed(path)
+                summary['templates'].append(path)
+            elif path.endswith('.tsk'):
+                sections = self._config_changed(path)
+                summary['invalidated'] += self._invalidate_config(path, sections)
+                summary['config_sections'].extend(sections)
+            else:
+                self._index(path)
+                if path.endswith('.py'):
+                    summary['code'].append(path)
+            
+            if not os.path.exists(path):
+                self.file_hashes.pop(path, None)
+                self.template_sources.pop(path, None)
+                self.config_sections.pop(path, None)
+        
+        summary['reload_required'] = bool(summary['code'])
+        summary['time'] = time.perf_counter() - start_time
+        if summary['templates'] or summary['config_sections'] or summary['code']:
+            self.invalidation_count += 1
+            logging.info(
+                f"Hot reload: {len(summary['templates'])} templates, "
+                f"{len(summary['config_sections'])} config sections in {summary['time'] * 1000:.1f}ms"
+            )
+            for callback in self.callbacks:
+                callback(summary)
+        return summary
+    
+    def _template_changed(self, path: str) -> int:
+        """Drop the old version of a template everywhere it is cached"""
+        removed = 0
+        previous_source = self.template_sources.get(path)
+        engine = self.engine or get_turbo_engine()
+        if previous_source is not None:
+            removed = engine.invalidate_template(previous_source)
+        self._index(path)
+        
+        # Layouts and partials also invalidate every template flattened from them
+        for name in self._template_names(path, engine.template_dirs):
+            removed += engine.invalidate_dependents(name)
+        
+        app = self.flask_app
+        if app is not None:
+            for name in self._flask_template_names(path):
+                removed += engine.invalidate_dependents(name)
+                turbo_templates = getattr(app, 'tsk_turbo_templates', None)
+                if turbo_templates is not None:
+                    turbo_templates.invalidate(name)
+                cache = app.jinja_env.cache
+                if cache is not None:
+                    for key in list(cache.keys()):
+                        if key[1] == name:
+                            del cache[key]
+        return removed
+    
+    def _flask_template_names(self, path: str) -> List[str]:
+        """Names under which the Flask app's loaders know a template file"""
+        app = self.flask_app
+        folders = []
+        for owner in [app] + list(app.iter_blueprints()):
+            if owner.template_folder:
+                folders.append(os.path.join(owner.root_path, owner.template_folder))
+        return self._template_names(path, folders)
+    
+    @staticmethod
+    def _template_names(path: str, folders: List[str]) -> List[str]:
+        """Names a template file has relative to each folder containing it"""
+        real_path = os.path.realpath(path)
+        names = []
+        for folder in folders:
+            folder = os.path.realpath(folder)
+            if real_path.startswith(folder + os.sep):
+                names.append(os.path.relpath(real_path, folder).replace(os.sep, '/'))
+        return names
+    
+    def _config_changed(self, path: str) -> List[str]:
+        """Sections of a .tsk file whose content changed"""
+        previous = self.config_sections.get(path, {})
+        self._index(path)
+        current = self.config_sections.get(path, {})
+        return sorted(
+            section for section in previous.keys() | current.keys()
+            if previous.get(section) != current.get(section)
+        )
+    
+    @staticmethod
+    def apply_sections(tsk, updated, sections: List[str]):
+        """Copy sections from an updated TuskLang instance, removing those it no longer has"""
+        for section in sections:
+            if updated is not None and section in updated.data:
+                tsk.set_section(section, updated.get_section(section) or {})
+            else:
+                tsk.data.pop(section, None)
+    
+    def _invalidate_config(self, path: str, sections: List[str]) -> int:
+        """Load changed sections into the live TuskLang instances and drop output that read them"""
+        if not sections:
+            return 0
+        engine = self.engine or get_turbo_engine()
+        fingerprint = None
+        
+        if TUSK_AVAILABLE:
+            try:
+                # A deleted file removes every section it had
+                updated = TSK.from_file(path) if os.path.exists(path) else None
+                targets = [engine.tsk]
+                extension = self.flask_app.extensions.get('flask-tsk') if self.flask_app else None
+                if extension is not None:
+                    targets.append(getattr(extension, 'tsk_instance', None))
+                for tsk in targets:
+                    if tsk is not None:
+                        self.apply_sections(tsk, updated, sections)
+                if extension is not None and hasattr(extension, 'refresh_config'):
+                    extension.refresh_config()
+                    fingerprint = getattr(extension, 'config_fingerprint', None)
+            except Exception as e:
+                logging.warning(f"Config reload failed for {path}: {e}")
+        
+        return engine.invalidate_config_sections(sections, fingerprint)
+
+
+def negotiate_encoding(accept_encoding: Optional[str], available: Tuple[str, ...] = CONTENT_ENCODINGS) -> Optional[str]:
+    """
+    Pick a content coding from an Accept-Encoding header (RFC 9110 section 12.5.3)
+    Ties go to the earliest entry in available; returns None when nothing is acceptable
+    """
+    if not accept_encoding:
+        return 'identity' if 'identity' in available else None
+    
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(','):
+        coding, _, params = part.strip().partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        weight = 1.0
+        for param in params.split(';'):
+            name, _, value = param.strip().partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[coding] = weight
+    
+    best, best_weight = None, 0.0
+    for coding in available:
+        if coding in weights:
+            weight = weights[coding]
+        elif '*' in weights:
+            weight = weights['*']
+        else:
+            # identity is acceptable unless refused, but any listed coding is preferred
+            weight = 0.001 if coding == 'identity' else 0.0
+        if weight > best_weight:
+            best, best_weight = coding, weight
+    return best
+
+
+def config_section_digests(text: str) -> Dict[str, str]:
+    """Hash each [section] of a .tsk file; text before the first header is section ''"""
+    digests = {}
+    section = ''
+    lines: List[str] = []
+    for line in text.splitlines():
+        match = _SECTION_HEADER_RE.match(line)
+        if match:
+            digests[section] = hashlib.sha256('\n'.join(lines).encode()).hexdigest()
+            section = match.group(1).strip()
+            lines = []
+        else:
+            lines.append(line)
+    digests[section] = hashlib.sha256('\n'.join(lines).encode()).hexdigest()
+    return digests
+
+
+_SECTION_HEADER_RE = re.compile(r'^\s*\[([^\]]+)\]\s*$')
+
+
+def private_directory(path: str) -> bool:
+    """
+    Create a directory only this user can use, or check that an existing one is
+    owned by this user and not writable by anyone else
+    """
+    try:
+        os.makedirs(path, mode=0o700, exist_ok=True)
+        info = os.lstat(path)
+    except OSError:
+        return False
+    if not stat.S_ISDIR(info.st_mode):
+        return False
+    if hasattr(os, 'getuid') and info.st_uid != os.getuid():
+        return False
+    return not info.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+
+
+# File extensions treated as templates by warmup
+TEMPLATE_EXTENSIONS = ('.html', '.htm', '.xml', '.xhtml', '.svg', '.txt', '.j2', '.jinja', '.jinja2')
+
+
+def discover_templates(paths: List[str]) -> List[str]:
+    """Find template files under the given files and directories"""
+    found = []
+    for path in paths:
+        if os.path.isfile(path):
+            found.append(os.path.abspath(path))
+            continue
+        for root, dirs, files in os.walk(path):
+            dirs[:] = sorted(d for d in dirs if not d.startswith('.') and d != '__pycache__')
+            for name in sorted(files):
+                if name.endswith(TEMPLATE_EXTENSIONS):
+                    found.append(os.path.abspath(os.path.join(root, name)))
+    return found
+
+
+def jinja_template_source(source: str, keep_trailing_newline: bool = False) -> str:
+    """Normalize template source the way Jinja's lexer does"""
+    source = source.replace('\r\n', '\n').replace('\r', '\n')
+    if not keep_trailing_newline and source.endswith('\n'):
+        source = source[:-1]
+    return source
+
+
+def flask_autoescape(filename: str) -> bool:
+    """Whether Flask autoescapes a template, by its file extension"""
+    return filename.endswith(('.html', '.htm', '.xml', '.xhtml', '.svg'))
+
+
+# Per-process state for batch rendering workers
+_worker_compiler: Optional[TemplateCompiler] = None
+# Compiled templates by hash, least recently used first
+_worker_templates: 'OrderedDict[str, CompiledTemplate]' = OrderedDict()
+WORKER_TEMPLATE_LIMIT = 256
+
+
+def _render_chunk(template_hash: str, template_content: str, contexts: List[Optional[Dict[str, Any]]]
+                  ) -> List[Optional[str]]:
+    """
+    Process pool task: compile the template once per worker and render a chunk of contexts
+    Only templates that need nothing beyond the compiler's defaults are sent here; a context
+    that fails to render comes back as None for the parent to render and report
+    """
+    global _worker_compiler
+    
+    compiled_template = _worker_templates.get(template_hash)
+    if compiled_template is None:
+        if _worker_compiler is None:
+            _worker_compiler = TemplateCompiler()
+        compiled_template = _worker_compiler.compile(template_content, template_hash)
+        _worker_templates[template_hash] = compiled_template
+        if len(_worker_templates) > WORKER_TEMPLATE_LIMIT:
+            _worker_templates.popitem(last=False)
+    else:
+        _worker_templates.move_to_end(template_hash)
+    
+    rendered = []
+    for context in contexts:
+        try:
+            rendered.append(compiled_template.render(context))
+        except Exception:
+            rendered.append(None)
+    return rendered
+
+
+def _compile_artifact(template_content: str, template_hash: str, autoescape: bool, fragments: bool) -> bytes:
+    """Process pool task: compile a template to an artifact for the parent to load"""
+    return TemplateCompiler(globals=TskTemplateGlobals().as_dict()).dump(
+        template_content, template_hash, autoescape, fragments
+    )
 
 
 # Global instances
@@ -414,10 +2386,10 @@ def get_turbo_engine() -> TurboTemplateEngine:
 
 
 def get_hot_reload_optimizer(app_dir: str = None) -> HotReloadOptimizer:
-    """Get global hot reload optimizer instance"""
+    """Get global hot reload optimizer instance; without app_dir it watches the app it optimizes"""
     global _hot_reload_optimizer
     if _hot_reload_optimizer is None:
-        _hot_reload_optimizer = HotReloadOptimizer(app_dir or os.getcwd())
+        _hot_reload_optimizer = HotReloadOptimizer(app_dir)
     return _hot_reload_optimizer
 
 
@@ -427,6 +2399,49 @@ def render_turbo_template(template_content: str, context: Dict[str, Any] = None)
     return engine.render_template(template_content, context)
 
 
+def stream_turbo_template(template_content: str, context: Dict[str, Any] = None,
+                          mimetype: str = 'text/html', chunk_size: int = 8192):
+    """Stream a turbo template as a Flask response"""
+    from flask import Response, stream_with_context
+    
+    engine = get_turbo_engine()
+    return Response(
+        stream_with_context(engine.stream(template_content, context, chunk_size)),
+        mimetype=mimetype
+    )
+
+
+def turbo_response(template_content: str, context: Dict[str, Any] = None,
+                   mimetype: str = 'text/html', status: int = 200):
+    """
+    Render a turbo template as a Flask response, precompressed for the request's Accept-Encoding
+    Cached pages are served from stored gzip/brotli bytes with no per-request compression;
+    a client that already has the page gets 304 before it is rendered or looked up
+    """
+    from flask import Response, request
+    try:
+        from .http_cache import etag_matches, not_modified
+    except ImportError:
+        from http_cache import etag_matches, not_modified
+    
+    engine = get_turbo_engine()
+    etag = engine.etag(template_content, context)
+    if etag is not None and status == 200 and request.method in ('GET', 'HEAD') and etag_matches(etag):
+        return not_modified(etag, weak=True)
+    
+    body = engine.render_encoded(template_content, context, request.headers.get('Accept-Encoding'))
+    response = Response(bytes(body), status=status, mimetype=mimetype)
+    if body.encoding != 'identity':
+        response.headers['Content-Encoding'] = body.encoding
+    response.vary.add('Accept-Encoding')
+    # Weak: one validator covers every encoding of the page
+    if etag is not None:
+        response.set_etag(etag, weak=True)
+    else:
+        response.headers['ETag'] = body.etag
+    return response.make_conditional(request)
+
+
 async def render_turbo_template_async(template_content: str, context: Dict[str, Any] = None) -> str:
     """Asynchronous high-performance template rendering"""
     engine = get_turbo_engine()
@@ -0,0 +1,680 @@
+#!/usr/bin/env python3
+"""
+TuskLang Render Cache
+In-process cache tiers used by the turbo template engine
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, FrozenSet, Iterable, Mapping, Optional, Set, Tuple
+
+# Optional performance libraries
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import xxhash
+    XXHASH_AVAILABLE = True
+except ImportError:
+    XXHASH_AVAILABLE = False
+
+
+def hash_bytes(data: bytes) -> str:
+    """Fast non-cryptographic 128-bit digest used for cache keys"""
+    if XXHASH_AVAILABLE:
+        return xxhash.xxh3_128_hexdigest(data)
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+# Default object reprs embed id(), which differs for every object and every worker
+_ADDRESS_RE = re.compile(r' at 0x[0-9a-fA-F]+')
+
+# Stands in for a variable that holds the template global of the same name
+_SHARED_GLOBAL = '\0global'
+_MISSING = object()
+
+
+def _fingerprint_default(value: Any) -> str:
+    """
+    Stable text for values the JSON encoder does not understand
+    Only reprs that spell out a value will do. Callables and objects whose repr names them
+    (``<... at 0x...>``, ``<flask.g of 'app'>``) say nothing of what they render as: two users'
+    bound methods share a qualname, so they would share a cache key
+    """
+    if callable(value):
+        raise TypeError(f"{type(value).__name__} has no stable fingerprint")
+    text = repr(value)
+    if text.startswith('<') or _ADDRESS_RE.search(text):
+        raise TypeError(f"{type(value).__name__} has no stable fingerprint")
+    return text
+
+
+if ORJSON_AVAILABLE:
+    _ORJSON_OPTIONS = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS
+
+    def _serialize_context(context: Dict[str, Any]) -> bytes:
+        return orjson.dumps(context, default=_fingerprint_default, option=_ORJSON_OPTIONS)
+else:
+    def _serialize_context(context: Dict[str, Any]) -> bytes:
+        return json.dumps(
+            context, sort_keys=True, default=_fingerprint_default, separators=(',', ':')
+        ).encode()
+
+
+def fingerprint_context(context: Mapping[str, Any], names: Optional[Iterable[str]] = None,
+                        shared: Iterable[Mapping[str, Any]] = ()) -> Optional[str]:
+    """
+    Fingerprint a render context
+    When ``names`` is given only those variables contribute to the fingerprint. ``shared`` are
+    the template globals every render sees: a variable holding the global of its own name counts
+    by name, as it is the same for every request. None means a value has no stable text, so the
+    context must not be cached: its key would differ on every request, or worse, be the same
+    for contexts that render differently
+    """
+    if names is None:
+        names = context.keys()
+    shared = tuple(shared)
+    variables = {}
+    for name in names:
+        if name not in context:
+            continue
+        value = context[name]
+        if any(globals_.get(name, _MISSING) is value for globals_ in shared):
+            value = _SHARED_GLOBAL
+        variables[name] = value
+    if not variables:
+        return '0'
+    try:
+        return hash_bytes(_serialize_context(variables))
+    except (TypeError, ValueError):
+        # Unsortable keys, or a value without stable text
+        return None
+
+
+class MemoryRenderCache:
+    """
+    Bounded in-process LRU cache for rendered output
+    Capacity is measured in bytes and every entry carries its own TTL and optional tags
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, default_ttl: Optional[float] = 300):
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self._entries: 'OrderedDict[str, tuple]' = OrderedDict()
+        # Tag -> keys of live entries carrying it
+        self._tagged: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.stale_hits = 0
+
+    @staticmethod
+    def _sizeof(key: str, value: Any) -> int:
+        """Approximate memory held by an entry"""
+        return sys.getsizeof(key) + sys.getsizeof(value)
+
+    def _unlink(self, key: str, entry: tuple):
+        """Account for an entry that was just removed from _entries"""
+        self.current_bytes -= entry[2]
+        for tag in entry[4]:
+            keys = self._tagged.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tagged[tag]
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return a cached value, or None on miss or expiry"""
+        entry = self.get_entry(key)
+        if entry is None or not entry[1]:
+            return None
+        return entry[0]
+
+    def get_entry(self, key: str) -> Optional[Tuple[Any, bool]]:
+        """Return (value, fresh) for a live entry; stale entries are kept until their grace period ends"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            value, expires_at, size, fresh_until, _ = entry
+            now = time.monotonic()
+            if expires_at is not None and expires_at <= now:
+                del self._entries[key]
+                self._unlink(key, entry)
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            if fresh_until is not None and fresh_until <= now:
+                self.stale_hits += 1
+                return value, False
+            self.hits += 1
+            return value, True
+
+    def peek(self, key: str) -> Optional[Tuple[Any, Optional[float], FrozenSet[str]]]:
+        """
+        Value, seconds left fresh and tags of a fresh entry, without counting a lookup
+        Seconds left is None for entries that never expire
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, _, _, fresh_until, tags = entry
+            if fresh_until is None:
+                return value, None, tags
+            remaining = fresh_until - time.monotonic()
+            if remaining <= 0:
+                return None
+            return value, remaining, tags
+
+    def tags_of(self, key: str) -> FrozenSet[str]:
+        """Tags an entry was stored with (empty when missing)"""
+        entry = self._entries.get(key)
+        return entry[4] if entry is not None else frozenset()
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None, stale_ttl: float = 0,
+            tags: Iterable[str] = ()) -> bool:
+        """
+        Store a value, evicting least recently used entries to stay in budget
+        The entry is fresh for ttl seconds and may then be served stale for stale_ttl more;
+        ``tags`` name what the value was derived from, for :meth:`delete_tags`
+        """
+        if ttl is None:
+            ttl = self.default_ttl
+        if ttl is not None and ttl + stale_ttl <= 0:
+            return False
+
+        size = self._sizeof(key, value)
+        if size > self.max_bytes:
+            return False
+
+        tags = frozenset(tags)
+        now = time.monotonic()
+        fresh_until = now + max(ttl, 0) if ttl is not None else None
+        expires_at = now + ttl + stale_ttl if ttl is not None else None
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._unlink(key, previous)
+
+            self._entries[key] = (value, expires_at, size, fresh_until, tags)
+            self.current_bytes += size
+            for tag in tags:
+                self._tagged.setdefault(tag, set()).add(key)
+
+            while self.current_bytes > self.max_bytes:
+                evicted_key, evicted = self._entries.popitem(last=False)
+                self._unlink(evicted_key, evicted)
+                self.evictions += 1
+        return True
+
+    def delete(self, key: str) -> bool:
+        """Remove a single entry"""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return False
+            self._unlink(key, entry)
+            return True
+
+    def delete_prefix(self, prefix: str) -> int:
+        """Remove every entry whose key starts with prefix"""
+        with self._lock:
+            keys = [key for key in self._entries if key.startswith(prefix)]
+            for key in keys:
+                self._unlink(key, self._entries.pop(key))
+            return len(keys)
+
+    def delete_tags(self, tags: Iterable[str]) -> int:
+        """Remove every entry carrying any of the tags"""
+        with self._lock:
+            keys = set()
+            for tag in tags:
+                keys.update(self._tagged.get(tag, ()))
+            for key in keys:
+                self._unlink(key, self._entries.pop(key))
+            return len(keys)
+
+    def clear(self):
+        """Drop every entry"""
+        with self._lock:
+            self._entries.clear()
+            self._tagged.clear()
+            self.current_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self.current_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / max(lookups, 1) * 100,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "stale_hits": self.stale_hits,
+            "tags": len(self._tagged),
+        }
+
+
+class RenderCacheStore:
+    """
+    Base class for persistent render cache backends
+    Stores opaque byte payloads with a per-entry TTL
+    """
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the stored payload, or None when missing or expired"""
+        raise NotImplementedError
+
+    def set(self, key: str, data: bytes, ttl: float, tags: Iterable[str] = ()):
+        """Store a payload for ``ttl`` seconds, tagged with what it was derived from"""
+        raise NotImplementedError
+
+    def delete(self, key: str) -> bool:
+        """Remove a single entry"""
+        raise NotImplementedError
+
+    def delete_prefix(self, prefix: str) -> int:
+        """Remove every entry whose key starts with prefix, returning how many were removed"""
+        return 0
+
+    def delete_tags(self, tags: Iterable[str]) -> int:
+        """
+        Remove every entry carrying any of the tags, returning how many were removed
+        Backends without a tag index cannot tell which entries those are, so they drop everything
+        """
+        self.clear()
+        return 0
+
+    def clear(self):
+        """Remove every entry"""
+        raise NotImplementedError
+
+    def compact(self) -> Dict[str, Any]:
+        """Drop expired entries and enforce the size cap"""
+        return {}
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get backend statistics"""
+        return {"backend": type(self).__name__}
+
+    def close(self):
+        """Release any resources held by the backend"""
+
+
+class FileRenderCacheStore(RenderCacheStore):
+    """
+    One file per entry under a cache directory
+    Entry expiry is stored as the file modification time
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: Optional[int] = None):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _get_cache_path(self, key: str) -> str:
+        """Get cache file path"""
+        return os.path.join(self.cache_dir, f"{key}.cache")
+
+    def get(self, key: str) -> Optional[bytes]:
+        cache_path = self._get_cache_path(key)
+        try:
+            if os.path.getmtime(cache_path) <= time.time():
+                return None
+            with open(cache_path, 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def set(self, key: str, data: bytes, ttl: float, tags: Iterable[str] = ()):
+        cache_path = self._get_cache_path(key)
+        tmp_path = f"{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        expires_at = time.time() + ttl
+        os.utime(tmp_path, (time.time(), expires_at))
+        os.replace(tmp_path, cache_path)
+
+    def delete(self, key: str) -> bool:
+        try:
+            os.remove(self._get_cache_path(key))
+            return True
+        except OSError:
+            return False
+
+    def delete_prefix(self, prefix: str) -> int:
+        removed = 0
+        for entry in self._entries():
+            if entry.name.startswith(prefix):
+                self._remove(entry.path)
+                removed += 1
+        return removed
+
+    def _entries(self):
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith('.cache'):
+                yield entry
+
+    def clear(self):
+        for entry in self._entries():
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+
+    def compact(self) -> Dict[str, Any]:
+        now = time.time()
+        expired = 0
+        evicted = 0
+        live = []
+        for entry in self._entries():
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            if stat.st_mtime <= now:
+                self._remove(entry.path)
+                expired += 1
+            else:
+                live.append((stat.st_atime, stat.st_size, entry.path))
+
+        if self.max_bytes is not None:
+            total = sum(size for _, size, _ in live)
+            for _, size, path in sorted(live):
+                if total <= self.max_bytes:
+                    break
+                self._remove(path)
+                total -= size
+                evicted += 1
+        return {"expired": expired, "evicted": evicted}
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        entries = 0
+        total = 0
+        for entry in self._entries():
+            try:
+                total += entry.stat().st_size
+                entries += 1
+            except OSError:
+                pass
+        return {
+            "backend": "file",
+            "cache_dir": self.cache_dir,
+            "entries": entries,
+            "bytes": total,
+            "max_bytes": self.max_bytes,
+        }
+
+
+class SQLiteRenderCacheStore(RenderCacheStore):
+    """
+    Single-file render cache backed by a SQLite table in WAL mode
+    Safe to share between worker processes; enforces a total size cap with
+    LRU eviction and compacts expired entries in a background thread
+    """
+
+    # Only rewrite accessed_at when the stored value is older than this
+    TOUCH_INTERVAL = 30.0
+    # Check the size cap every N writes between compactions
+    EVICTION_CHECK_INTERVAL = 64
+
+    def __init__(self, path: str, max_bytes: int = 256 * 1024 * 1024,
+                 compaction_interval: Optional[float] = 60.0, busy_timeout: float = 5.0):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.compaction_interval = compaction_interval
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._compactor: Optional[threading.Thread] = None
+        self._compactor_pid: Optional[int] = None
+        self._stop = threading.Event()
+        self.evictions = 0
+        self.expirations = 0
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._initialize()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Get a connection for the current thread and process"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+
+        # Connections must never be shared across a fork
+        conn = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None,
+                               check_same_thread=False)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute(f'PRAGMA busy_timeout={int(self.busy_timeout * 1000)}')
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    def _initialize(self):
+        conn = self._connect()
+        conn.execute('PRAGMA auto_vacuum=INCREMENTAL')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS render_cache (
+                key TEXT PRIMARY KEY,
+                value BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                expires_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        ''')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_render_cache_expires ON render_cache (expires_at)')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_render_cache_accessed ON render_cache (accessed_at)')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS render_cache_tags (
+                tag TEXT NOT NULL,
+                key TEXT NOT NULL,
+                PRIMARY KEY (tag, key)
+            ) WITHOUT ROWID
+        ''')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_render_cache_tags_key ON render_cache_tags (key)')
+
+    def _ensure_compactor(self):
+        """Start the background compaction thread in this process"""
+        if not self.compaction_interval:
+            return
+        pid = os.getpid()
+        if self._compactor is not None and self._compactor_pid == pid and self._compactor.is_alive():
+            return
+        with self._lock:
+            if self._compactor is not None and self._compactor_pid == pid and self._compactor.is_alive():
+                return
+            self._stop = threading.Event()
+            self._compactor = threading.Thread(
+                target=self._compaction_loop, name='tsk-render-cache-compactor', daemon=True
+            )
+            self._compactor_pid = pid
+            self._compactor.start()
+
+    def _compaction_loop(self):
+        while not self._stop.wait(self.compaction_interval):
+            try:
+                self.compact()
+            except sqlite3.Error as e:
+                logging.warning(f"Render cache compaction failed: {e}")
+
+    def get(self, key: str) -> Optional[bytes]:
+        conn = self._connect()
+        row = conn.execute(
+            'SELECT value, expires_at, accessed_at FROM render_cache WHERE key = ?', (key,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        value, expires_at, accessed_at = row
+        now = time.time()
+        if expires_at <= now:
+            return None
+        if now - accessed_at > self.TOUCH_INTERVAL:
+            try:
+                conn.execute('UPDATE render_cache SET accessed_at = ? WHERE key = ?', (now, key))
+            except sqlite3.OperationalError:
+                pass  # Recency is best effort under write contention
+        return value
+
+    def set(self, key: str, data: bytes, ttl: float, tags: Iterable[str] = ()):
+        now = time.time()
+        tags = tuple(tags)
+        conn = self._connect()
+        conn.execute('BEGIN')
+        try:
+            conn.execute(
+                'INSERT OR REPLACE INTO render_cache (key, value, size, created_at, expires_at, accessed_at) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (key, sqlite3.Binary(data), len(data), now, now + ttl, now)
+            )
+            conn.execute('DELETE FROM render_cache_tags WHERE key = ?', (key,))
+            if tags:
+                conn.executemany(
+                    'INSERT OR IGNORE INTO render_cache_tags (tag, key) VALUES (?, ?)',
+                    [(tag, key) for tag in tags]
+                )
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+
+        self._ensure_compactor()
+        self._writes += 1
+        if self._writes % self.EVICTION_CHECK_INTERVAL == 0:
+            self._enforce_size_cap(conn)
+
+    def delete(self, key: str) -> bool:
+        cursor = self._connect().execute('DELETE FROM render_cache WHERE key = ?', (key,))
+        return cursor.rowcount > 0
+
+    def delete_prefix(self, prefix: str) -> int:
+        if not prefix:
+            count = self._connect().execute('SELECT COUNT(*) FROM render_cache').fetchone()[0]
+            self.clear()
+            return count
+        # A key range rather than LIKE, so the primary key index is used
+        upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+        cursor = self._connect().execute(
+            'DELETE FROM render_cache WHERE key >= ? AND key < ?', (prefix, upper)
+        )
+        return cursor.rowcount
+
+    def delete_tags(self, tags: Iterable[str]) -> int:
+        tags = tuple(tags)
+        if not tags:
+            return 0
+        placeholders = ', '.join('?' * len(tags))
+        conn = self._connect()
+        conn.execute('BEGIN')
+        try:
+            removed = conn.execute(
+                'DELETE FROM render_cache WHERE key IN '
+                f'(SELECT key FROM render_cache_tags WHERE tag IN ({placeholders}))', tags
+            ).rowcount
+            conn.execute(
+                'DELETE FROM render_cache_tags WHERE key IN '
+                f'(SELECT key FROM render_cache_tags WHERE tag IN ({placeholders}))', tags
+            )
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        return removed
+
+    def clear(self):
+        conn = self._connect()
+        conn.execute('DELETE FROM render_cache')
+        conn.execute('DELETE FROM render_cache_tags')
+        conn.execute('PRAGMA incremental_vacuum')
+
+    def _total_bytes(self, conn: sqlite3.Connection) -> int:
+        return conn.execute('SELECT COALESCE(SUM(size), 0) FROM render_cache').fetchone()[0]
+
+    def _enforce_size_cap(self, conn: sqlite3.Connection) -> int:
+        """Evict least recently used entries until the cache fits its cap"""
+        excess = self._total_bytes(conn) - self.max_bytes
+        if excess <= 0:
+            return 0
+
+        victims = []
+        for key, size in conn.execute('SELECT key, size FROM render_cache ORDER BY accessed_at'):
+            victims.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+
+        conn.executemany('DELETE FROM render_cache WHERE key = ?', victims)
+        self.evictions += len(victims)
+        return len(victims)
+
+    def compact(self) -> Dict[str, Any]:
+        conn = self._connect()
+        expired = conn.execute('DELETE FROM render_cache WHERE expires_at <= ?', (time.time(),)).rowcount
+        self.expirations += expired
+        evicted = self._enforce_size_cap(conn)
+        # Tags left behind by expired, evicted or prefix-deleted entries
+        conn.execute('DELETE FROM render_cache_tags WHERE key NOT IN (SELECT key FROM render_cache)')
+        conn.execute('PRAGMA incremental_vacuum')
+        conn.execute('PRAGMA wal_checkpoint(PASSIVE)')
+        return {"expired": expired, "evicted": evicted}
+
+    def get_stats(self) -> Dict[str, Any]:
+        conn = self._connect()
+        entries, total = conn.execute(
+            'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM render_cache'
+        ).fetchone()
+        return {
+            "backend": "sqlite",
+            "path": self.path,
+            "entries": entries,
+            "bytes": total,
+            "max_bytes": self.max_bytes,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+    def close(self):
+        self._stop.set()
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None and self._local.pid == os.getpid():
+            conn.close()
+        self._local = threading.local()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Flask template integration tests
+render_template goes through the turbo engine, and templates it cannot compile stay on Jinja
+"""
+
+import pytest
+from flask import Flask, render_template, stream_template
+from jinja2 import Template
+
+from tsk_flask.performance_engine import TurboFlaskTemplate, TurboTemplateEngine
+
+TEMPLATES = {
+    'base.html': '<title>{% block title %}Site{% endblock %}</title><main>{% block body %}{% endblock %}</main>',
+    'page.html': (
+        '{% extends "base.html" %}{% block title %}{{ name|shout }}{% endblock %}'
+        '{% block body %}{% for item in items %}<p>{{ item }}</p>{% endfor %}{{ html }}{% endblock %}'
+    ),
+    'macro.html': '{% macro badge(text) %}<b>{{ text }}</b>{% endmacro %}{{ badge(name) }}',
+}
+
+CONTEXT = {'name': 'Ada', 'items': ['one', 'two'], 'html': '<script>'}
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = TurboTemplateEngine(cache_dir=str(tmp_path / 'cache'))
+    yield engine
+    engine.shutdown()
+    engine.cache_store.close()
+
+
+@pytest.fixture
+def app(tmp_path, engine):
+    templates = tmp_path / 'app' / 'templates'
+    templates.mkdir(parents=True)
+    for name, source in TEMPLATES.items():
+        (templates / name).write_text(source)
+
+    app = Flask('demo', root_path=str(tmp_path / 'app'))
+    app.add_template_filter(lambda value: f'{value.upper()}!', 'shout')
+    engine.optimize_for_flask(app, turbo_templates=True, bytecode_cache=False)
+    return app
+
+
+def jinja_render(app, name):
+    """What Flask renders with the turbo engine out of the way"""
+    with app.test_request_context():
+        return app.tsk_turbo_templates.jinja_get_template(name).render(**CONTEXT)
+
+
+def test_render_template_uses_the_turbo_engine(app):
+    with app.test_request_context():
+        template = app.jinja_env.get_template('page.html')
+        assert isinstance(template, TurboFlaskTemplate)
+        output = render_template('page.html', **CONTEXT)
+
+    assert output == jinja_render(app, 'page.html')
+    assert '<title>ADA!</title>' in output and '&lt;script&gt;' in output
+
+
+def test_stream_template_uses_the_turbo_engine(app):
+    with app.test_request_context():
+        assert ''.join(stream_template('page.html', **CONTEXT)) == jinja_render(app, 'page.html')
+
+
+def test_unsupported_templates_fall_back_to_jinja(app):
+    with app.test_request_context():
+        template = app.jinja_env.get_template('macro.html')
+        assert isinstance(template, Template)
+        assert render_template('macro.html', **CONTEXT) == '<b>Ada</b>'
+
+
+def test_render_failures_switch_the_template_to_jinja(app):
+    calls = []
+
+    def flaky(value):
+        calls.append(value)
+        if len(calls) == 1:
+            raise RuntimeError('first call fails')
+        return value.upper()
+
+    app.add_template_filter(flaky, 'flaky')
+    with open(f'{app.root_path}/templates/flaky.html', 'w') as f:
+        f.write('<p>{{ name|flaky }}</p>')
+
+    with app.test_request_context():
+        assert isinstance(app.jinja_env.get_template('flaky.html'), TurboFlaskTemplate)
+        # The turbo render fails, and Jinja renders the same request
+        assert render_template('flaky.html', **CONTEXT) == '<p>ADA</p>'
+        assert isinstance(app.jinja_env.get_template('flaky.html'), Template)
+        assert render_template('flaky.html', **CONTEXT) == '<p>ADA</p>'
+    assert len(calls) == 3
+
+
+def test_warmup_counts_turbo_templates(app):
+    # base.html and page.html compile; macro.html stays on Jinja
+    assert app.tsk_turbo_templates.warmup() == 2
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Flask-TSK extension tests
+get_config reads a snapshot that follows every config change and cannot be changed by its readers
+"""
+
+import json
+
+import pytest
+from flask import Flask
+
+import tsk_flask
+from tsk_flask import FlaskTSK
+
+
+class FakeTSK:
+    """The parts of tusktsk.TSK the extension uses to read and change config"""
+
+    def __init__(self, data=None):
+        self.data = data or {}
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path) as f:
+            return cls(json.load(f))
+
+    def get_value(self, section, key):
+        return self.data.get(section, {}).get(key)
+
+    def set_value(self, section, key, value):
+        self.data.setdefault(section, {})[key] = value
+
+    def get_section(self, section):
+        return self.data.get(section)
+
+
+@pytest.fixture
+def tsk(monkeypatch, tmp_path):
+    from tsk_flask import performance_engine
+
+    engine = performance_engine.TurboTemplateEngine(cache_dir=str(tmp_path / 'cache'))
+    monkeypatch.setattr(performance_engine, '_turbo_engine', engine)
+    monkeypatch.setattr(tsk_flask, 'TUSK_AVAILABLE', True)
+    monkeypatch.setattr(tsk_flask, 'TSK', FakeTSK, raising=False)
+    app = Flask(__name__)
+    extension = FlaskTSK()
+    extension.app = app
+    extension.tsk_instance = FakeTSK({'app': {'name': 'shop', 'hosts': ['a', 'b']}})
+    extension.refresh_config()
+    with app.app_context():
+        yield extension
+    engine.shutdown()
+    engine.cache_store.close()
+
+
+def test_get_config_reflects_set_config(tsk):
+    version = tsk.config_version
+    assert tsk.get_config('app', 'name') == 'shop'
+    assert tsk.set_config('app', 'name', 'store')
+    assert tsk.get_config('app', 'name') == 'store'
+    assert tsk.set_config('db', 'host', 'db1')
+    assert tsk.get_config('db', 'host') == 'db1'
+    assert tsk.config_version == version + 2
+
+
+def test_get_config_reflects_load_config(tsk, tmp_path):
+    path = tmp_path / 'config.json'
+    path.write_text(json.dumps({'db': {'host': 'db2'}}))
+    fingerprint = tsk.config_fingerprint
+
+    assert tsk.load_config(str(path))
+    assert tsk.get_config('db', 'host') == 'db2'
+    assert tsk.get_config('app', 'name', 'gone') == 'gone'
+    assert tsk.config_fingerprint != fingerprint
+
+
+def test_get_config_reflects_delete_section(tsk):
+    assert tsk.delete_section('app')
+    assert tsk.get_config('app', 'name') is None
+    assert not tsk.delete_section('app')
+    assert dict(tsk.config_snapshot) == {}
+
+
+def test_readers_cannot_change_the_snapshot(tsk):
+    hosts = tsk.get_config('app', 'hosts')
+    hosts.append('c')
+    assert tsk.get_config('app', 'hosts') == ['a', 'b']
+
+    with pytest.raises(TypeError):
+        tsk.config_snapshot['app.name'] = 'changed'
+
+    # Changing the TuskLang instance in place reaches readers only through refresh_config
+    tsk.tsk_instance.data['app']['hosts'].append('d')
+    assert tsk.get_config('app', 'hosts') == ['a', 'b']
+    tsk.refresh_config()
+    assert tsk.get_config('app', 'hosts') == ['a', 'b', 'd']
+
+
+def test_snapshots_already_fetched_stay_consistent(tsk):
+    snapshot = tsk.config_snapshot
+    tsk.set_config('app', 'name', 'store')
+    assert snapshot['app.name'] == 'shop'
+    assert tsk.config_snapshot['app.name'] == 'store'
+
+
+def test_defaults_are_returned_as_given(tsk):
+    default = []
+    assert tsk.get_config('missing', 'key', default) is default
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+TuskLang function memo tests
+Functions that declare a cache policy are memoised in a bounded LRU; everything else runs every time
+"""
+
+import time
+
+import pytest
+
+from tsk_flask.performance_engine import FunctionMemo, TurboTemplateEngine
+
+
+class FakeTSK:
+    """Config values and the functions behind tsk_function, counting calls"""
+
+    def __init__(self, **values):
+        self.values = values
+        self.calls = 0
+
+    def get_value(self, section, key):
+        return self.values.get(f'{section}.{key}')
+
+    def execute_fujsen(self, section, name, *args):
+        self.calls += 1
+        return f'{name}({", ".join(map(str, args))})#{self.calls}'
+
+
+def call(memo, tsk, name, *args):
+    return memo.call(tsk, 'app', name, args, lambda: tsk.execute_fujsen('app', name, *args))
+
+
+@pytest.mark.parametrize('value, ttl', [
+    ('pure', float('inf')), (' Pure ', float('inf')), (True, float('inf')),
+    (30, 30.0), ('2.5', 2.5), (0, None), (-1, None), (False, None), ('often', None), (None, None),
+])
+def test_cache_policies(value, ttl):
+    assert FunctionMemo._parse_policy(value) == ttl
+
+
+def test_pure_functions_are_memoised():
+    memo = FunctionMemo()
+    tsk = FakeTSK(**{'app.greet_cache': 'pure'})
+    assert call(memo, tsk, 'greet', 'ann') == 'greet(ann)#1'
+    assert call(memo, tsk, 'greet', 'ann') == 'greet(ann)#1'
+    assert call(memo, tsk, 'greet', 'bob') == 'greet(bob)#2'
+
+    stats = memo.get_stats()
+    assert stats['hits'] == 1 and stats['misses'] == 2 and stats['entries'] == 2
+    assert stats['cacheable_functions'] == 1
+
+
+def test_functions_without_a_policy_always_run():
+    memo = FunctionMemo()
+    tsk = FakeTSK()
+    assert call(memo, tsk, 'now') == 'now()#1'
+    assert call(memo, tsk, 'now') == 'now()#2'
+    assert memo.get_stats()['entries'] == 0
+
+
+def test_timed_results_expire():
+    memo = FunctionMemo()
+    tsk = FakeTSK(**{'app.rates_cache': 0.05})
+    assert call(memo, tsk, 'rates') == call(memo, tsk, 'rates') == 'rates()#1'
+    time.sleep(0.06)
+    assert call(memo, tsk, 'rates') == 'rates()#2'
+
+
+def test_unhashable_arguments_bypass_the_memo():
+    memo = FunctionMemo()
+    tsk = FakeTSK(**{'app.total_cache': 'pure'})
+    assert call(memo, tsk, 'total', [1, 2]) == 'total([1, 2])#1'
+    assert call(memo, tsk, 'total', [1, 2]) == 'total([1, 2])#2'
+    assert memo.get_stats()['entries'] == 0
+
+
+def test_the_memo_is_bounded_least_recently_used_first():
+    memo = FunctionMemo(max_entries=3)
+    tsk = FakeTSK(**{'app.square_cache': 'pure'})
+    for n in range(3):
+        call(memo, tsk, 'square', n)
+    call(memo, tsk, 'square', 0)
+    call(memo, tsk, 'square', 3)
+    call(memo, tsk, 'square', 4)
+
+    assert [key[2] for key in memo._entries] == [(0,), (3,), (4,)]
+    assert memo.get_stats()['evictions'] == 2
+    calls = tsk.calls
+    call(memo, tsk, 'square', 0)
+    assert tsk.calls == calls
+
+
+def test_invalidation_forgets_results_and_policies_by_section():
+    memo = FunctionMemo()
+    tsk = FakeTSK(**{'app.greet_cache': 'pure', 'db.ping_cache': 'pure'})
+    call(memo, tsk, 'greet', 'ann')
+    memo.call(tsk, 'db', 'ping', (), lambda: 'pong')
+
+    tsk.values['app.greet_cache'] = None
+    memo.invalidate(['app'])
+    assert [key[0] for key in memo._entries] == ['db']
+    # The policy is read from config again
+    assert memo.policy(tsk, 'app', 'greet') is None
+
+    memo.invalidate()
+    assert memo.get_stats()['entries'] == 0 and memo.get_stats()['cacheable_functions'] == 0
+
+
+def test_templates_reuse_memoised_results(tmp_path):
+    engine = TurboTemplateEngine(cache_dir=str(tmp_path))
+    tsk = FakeTSK(**{'app.greet_cache': 'pure'})
+    engine.set_tsk(tsk)
+    try:
+        source = '{{ tsk_function("app", "greet", "ann") }} {{ visit }}'
+        assert engine.render_template(source, {'visit': 1}) == 'greet(ann)#1 1'
+        # A different context misses the render cache but not the memo
+        assert engine.render_template(source, {'visit': 2}) == 'greet(ann)#1 2'
+        assert tsk.calls == 1
+    finally:
+        engine.shutdown()
+        engine.cache_store.close()
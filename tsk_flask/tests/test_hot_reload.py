@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Hot reload tests
+Watching is opt-in, covers the app's own directories, and edits invalidate only what they affect
+"""
+
+import os
+
+import pytest
+from flask import Blueprint, Flask
+
+from tsk_flask.performance_engine import HotReloadOptimizer, TurboTemplateEngine
+
+
+class FakeTSK:
+    """The section storage hot reload writes to"""
+
+    def __init__(self, **sections):
+        self.data = sections
+
+    def get_section(self, section):
+        return self.data.get(section)
+
+    def set_section(self, section, values):
+        self.data[section] = values
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = TurboTemplateEngine(cache_dir=str(tmp_path / 'cache'))
+    yield engine
+    engine.shutdown()
+    engine.cache_store.close()
+
+
+@pytest.fixture
+def project(tmp_path):
+    root = tmp_path / 'app'
+    (root / 'templates').mkdir(parents=True)
+    (root / 'templates' / 'page.html').write_text('<p>{{ name }}</p>')
+    (root / 'peanu.tsk').write_text('[app]\nname = "one"\n\n[db]\nhost = "db1"\n')
+    return root
+
+
+def new_app(root, **config):
+    app = Flask('demo', root_path=str(root))
+    app.config.update(config)
+    return app
+
+
+def test_debug_alone_does_not_start_watching(project, engine):
+    optimizer = HotReloadOptimizer(engine=engine)
+    optimizer.optimize_reload(new_app(project, DEBUG=True))
+    assert not optimizer._threads and not optimizer.file_hashes
+
+
+def test_watching_is_opt_in_and_covers_the_app(project, engine):
+    optimizer = HotReloadOptimizer(engine=engine, poll_interval=0.05)
+    optimizer.optimize_reload(new_app(project, TSK_HOT_RELOAD=True))
+    try:
+        assert optimizer._threads
+        assert optimizer.watch_dirs == [os.path.realpath(project)]
+        assert set(optimizer.file_hashes) == {
+            os.path.realpath(project / 'templates' / 'page.html'), os.path.realpath(project / 'peanu.tsk')
+        }
+    finally:
+        optimizer.stop()
+
+
+def test_watch_dirs_are_the_outermost_app_folders(project, tmp_path):
+    shared = tmp_path / 'shared' / 'templates'
+    shared.mkdir(parents=True)
+    config = tmp_path / 'config'
+    config.mkdir()
+
+    app = new_app(project, TSK_CONFIG_PATH=str(config / 'peanu.tsk'))
+    app.register_blueprint(Blueprint('shared', 'shared', root_path=str(tmp_path / 'shared'),
+                                     template_folder='templates'))
+    assert HotReloadOptimizer.app_watch_dirs(app) == sorted(
+        os.path.realpath(path) for path in (project, shared, config)
+    )
+
+
+def test_an_explicit_app_dir_is_kept(project, tmp_path, engine):
+    optimizer = HotReloadOptimizer(str(tmp_path), engine=engine)
+    optimizer.optimize_reload(new_app(project))
+    assert optimizer.watch_dirs == [str(tmp_path)]
+
+
+def test_template_edits_drop_only_that_templates_output(project, engine):
+    optimizer = HotReloadOptimizer(str(project), engine=engine)
+    page = project / 'templates' / 'page.html'
+    for path in optimizer._scan():
+        optimizer._index(path)
+    engine.render_template(page.read_text(), {'name': 'Ada'})
+    engine.render_template('<b>{{ name }}</b>', {'name': 'Ada'})
+
+    page.write_text('<div>{{ name }}</div>')
+    summary = optimizer.process_changes([str(page)])
+    assert summary['templates'] == [str(page)] and summary['invalidated'] > 0
+    assert list(engine.memory_cache._entries.values())[0][0] == '<b>Ada</b>' and len(engine.memory_cache) == 1
+
+    # Saved again without changes: nothing to do
+    assert optimizer.process_changes([str(page)])['invalidated'] == 0
+
+
+def test_only_changed_config_sections_are_reported(project, engine):
+    optimizer = HotReloadOptimizer(str(project), engine=engine)
+    config = project / 'peanu.tsk'
+    optimizer._index(str(config))
+
+    config.write_text('[app]\nname = "two"\n')
+    assert optimizer._config_changed(str(config)) == ['app', 'db']
+
+
+def test_removed_sections_are_deleted_not_emptied():
+    tsk = FakeTSK(app={'name': 'one'}, db={'host': 'db1'}, cache={'ttl': 1})
+    HotReloadOptimizer.apply_sections(tsk, FakeTSK(app={'name': 'two'}, cache={}), ['app', 'db', 'cache'])
+    assert tsk.data == {'app': {'name': 'two'}, 'cache': {}}
+
+    # A deleted file had every section removed
+    HotReloadOptimizer.apply_sections(tsk, None, ['app'])
+    assert tsk.data == {'cache': {}}
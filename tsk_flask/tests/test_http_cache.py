@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Conditional GET tests
+Rendered pages and JSON payloads carry ETags, and a matching If-None-Match gets an empty 304
+"""
+
+import gzip
+
+import pytest
+from flask import Flask
+
+from tsk_flask import performance_engine
+from tsk_flask.http_cache import conditional, conditional_json, etag_matches
+from tsk_flask.performance_engine import TurboTemplateEngine, turbo_response
+
+PAGE = '<h1>{{ title }}</h1>{% for item in items %}<p>{{ item }}</p>{% endfor %}'
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    engine = TurboTemplateEngine(cache_dir=str(tmp_path))
+    monkeypatch.setattr(performance_engine, '_turbo_engine', engine)
+    yield engine
+    engine.shutdown()
+    engine.cache_store.close()
+
+
+@pytest.fixture
+def client(engine):
+    app = Flask(__name__)
+    renders = []
+
+    @app.route('/page/<title>')
+    def page(title):
+        return turbo_response(PAGE, {'title': title, 'items': list(range(100))})
+
+    @app.route('/report/<int:report_id>')
+    @conditional(lambda report_id: f'report-{report_id}')
+    def report(report_id):
+        renders.append(report_id)
+        return f'report {report_id}'
+
+    @app.route('/status')
+    def status():
+        return conditional_json({'ok': True, 'checked_at': len(renders)}, volatile=('checked_at',))
+
+    @app.route('/data')
+    def data():
+        return conditional_json({'items': [1, 2, 3]})
+
+    client = app.test_client()
+    client.renders = renders
+    return client
+
+
+def test_etag_matching_is_weak():
+    assert etag_matches('"abc"', 'W/"abc", "def"')
+    assert etag_matches('W/"abc"', '"abc"')
+    assert etag_matches('abc', '*')
+    assert not etag_matches('"abc"', '"abcd"')
+    assert not etag_matches('"abc"', '')
+
+
+def test_engine_etags_follow_the_template_context_and_config(engine):
+    etag = engine.etag(PAGE, {'title': 'a', 'items': []})
+    assert etag == engine.etag(PAGE, {'title': 'a', 'items': [], 'unused': 1})
+    assert etag != engine.etag(PAGE, {'title': 'b', 'items': []})
+    assert etag != engine.etag(PAGE + '!', {'title': 'a', 'items': []})
+    assert engine.etag(PAGE, {'title': object(), 'items': []}) is None
+
+    engine.invalidate_config_sections(['app'], fingerprint='v2')
+    named = engine.etag(PAGE, {'title': 'a', 'items': []})
+    assert named != etag
+    # A change nobody named invalidates even an unchanged fingerprint's validators
+    engine.invalidate_config_sections(['app'])
+    assert engine.etag(PAGE, {'title': 'a', 'items': []}) != named
+
+
+def test_turbo_response_is_tagged_then_answered_with_304(client, engine):
+    response = client.get('/page/home', headers={'Accept-Encoding': 'gzip'})
+    assert response.status_code == 200
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(response.data).startswith(b'<h1>home</h1>')
+    etag = response.headers['ETag']
+    assert etag.startswith('W/"')
+
+    renders = engine.metrics.get_stats()['total_renders']
+    cached = client.get('/page/home', headers={'If-None-Match': etag, 'Accept-Encoding': 'br;q=0, identity'})
+    assert cached.status_code == 304 and cached.data == b''
+    assert cached.headers['ETag'] == etag
+    # Answered without rendering or looking the page up
+    assert engine.metrics.get_stats()['total_renders'] == renders
+
+
+def test_turbo_response_renders_when_the_etag_is_stale(client):
+    etag = client.get('/page/home').headers['ETag']
+    response = client.get('/page/about', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+    assert response.data.startswith(b'<h1>about</h1>')
+
+
+def test_conditional_views_are_skipped_for_current_clients(client):
+    response = client.get('/report/7')
+    assert response.status_code == 200 and response.headers['ETag'] == '"report-7"'
+
+    assert client.get('/report/7', headers={'If-None-Match': '"report-7"'}).status_code == 304
+    assert client.get('/report/7', headers={'If-None-Match': '"report-8"'}).status_code == 200
+    assert client.renders == [7, 7]
+
+
+def test_conditional_json_tags_the_body(client):
+    response = client.get('/data')
+    assert response.status_code == 200 and response.json == {'items': [1, 2, 3]}
+    etag = response.headers['ETag']
+    assert not etag.startswith('W/')
+
+    assert client.get('/data', headers={'If-None-Match': etag}).status_code == 304
+    assert client.get('/data', headers={'If-None-Match': '"other"'}).status_code == 200
+
+
+def test_conditional_json_leaves_volatile_keys_out_of_a_weak_etag(client):
+    first = client.get('/status')
+    etag = first.headers['ETag']
+    assert etag.startswith('W/"')
+
+    client.get('/report/1')
+    # checked_at changed, the rest did not
+    response = client.get('/status', headers={'If-None-Match': etag})
+    assert response.status_code == 304 and response.headers['ETag'] == etag
+
+
+def test_config_reads_are_validated_against_the_config_fingerprint(engine):
+    from types import MappingProxyType
+
+    from tsk_flask import FlaskTSK
+
+    app = Flask(__name__)
+    extension = FlaskTSK(app)
+    extension.tsk_instance = object()
+    client = app.test_client()
+
+    etag = client.get('/tsk/sections/app/exists').headers['ETag']
+    assert client.get('/tsk/sections/app/exists', headers={'If-None-Match': etag}).status_code == 304
+    assert client.get('/tsk/sections/db/exists', headers={'If-None-Match': etag}).status_code == 200
+
+    extension._config_snapshot = MappingProxyType({'app.name': 'changed'})
+    assert client.get('/tsk/sections/app/exists', headers={'If-None-Match': etag}).status_code == 200
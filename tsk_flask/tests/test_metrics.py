@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Render metrics tests
+Latency histograms stay within their stated error in fixed memory, and get_stats reports the window
+"""
+
+import random
+
+import pytest
+
+from tsk_flask.performance_engine import LatencyHistogram, PerformanceMetrics
+
+
+def relative_error(histogram):
+    return 1 / 2 ** (histogram.significant_bits - 1)
+
+
+def test_small_values_have_exact_buckets():
+    histogram = LatencyHistogram()
+    for value in range(1 << histogram.significant_bits):
+        assert histogram.bucket_index(value) == value
+        assert histogram.bucket_upper(value) == value
+
+
+def test_buckets_tile_the_value_range():
+    histogram = LatencyHistogram(significant_bits=5)
+    last = histogram.bucket_index(histogram.max_value)
+    for index in range(last):
+        upper = histogram.bucket_upper(index)
+        assert histogram.bucket_index(upper) == index
+        assert histogram.bucket_index(upper + 1) == index + 1
+
+
+@pytest.mark.parametrize('bits', [5, 7, 10])
+def test_bucket_bounds_are_within_the_relative_error(bits):
+    histogram = LatencyHistogram(significant_bits=bits)
+    values = random.Random(bits).sample(range(1, histogram.max_value), 2000)
+    for value in values + [1 << 20, (1 << 20) - 1, histogram.max_value]:
+        upper = histogram.bucket_upper(histogram.bucket_index(value))
+        assert value <= upper <= value * (1 + relative_error(histogram))
+
+
+def test_percentiles_are_accurate():
+    histogram = LatencyHistogram()
+    samples = [n / 1000 for n in range(1, 10001)]  # 1ms .. 10s
+    for seconds in random.Random(0).sample(samples, len(samples)):
+        histogram.record(seconds)
+
+    for percent, expected in ((50, 5.0), (90, 9.0), (99, 9.9), (99.9, 9.99)):
+        assert expected <= histogram.percentile(percent) <= expected * (1 + relative_error(histogram))
+    assert histogram.percentile(100) == pytest.approx(10.0)
+    assert histogram.percentile(0) == pytest.approx(0.001, rel=relative_error(histogram))
+
+
+def test_summary_reports_extremes_and_mean():
+    histogram = LatencyHistogram()
+    assert histogram.summary() == {'count': 0}
+    assert histogram.percentile(50) == 0.0
+
+    for seconds in (0.001, 0.002, 0.003):
+        histogram.record(seconds)
+    summary = histogram.summary()
+    assert summary['count'] == 3
+    assert summary['avg'] == pytest.approx(0.002)
+    assert summary['min'] == pytest.approx(0.001) and summary['max'] == pytest.approx(0.003)
+    # Percentiles never exceed the largest observation
+    assert summary['p999'] == summary['max']
+
+
+def test_observations_are_clamped_and_memory_is_fixed():
+    histogram = LatencyHistogram(max_seconds=1.0)
+    histogram.record(-1)
+    histogram.record(5)
+    assert histogram.min == 0 and histogram.max == histogram.max_value
+    for n in range(100000):
+        histogram.record(n * 1e-5)
+    assert len(histogram.counts) <= histogram.bucket_index(histogram.max_value) + 1
+
+
+def test_get_stats_reports_the_window():
+    metrics = PerformanceMetrics(max_templates=2)
+    assert 'error' in metrics.get_stats()
+
+    metrics.record_render(0.010, cached=False, template_hash='a' * 64)
+    metrics.record_render(0.001, cached=True, template_hash='a' * 64)
+    metrics.record_render(0.002, cached=True, template_hash='b' * 64)
+    metrics.record_render(0.003, cached=True, template_hash='c' * 64)
+    metrics.record_coalesced()
+    metrics.record_stale_hit()
+    metrics.record_async_render(offloaded=True, queue_wait=0.004)
+    metrics.record_async_render(offloaded=False)
+
+    stats = metrics.get_stats()
+    assert stats['total_renders'] == 4
+    assert stats['cache_hits'] == 3 and stats['cache_misses'] == 1
+    assert stats['cache_hit_rate'] == 75
+    assert stats['min_render_time'] == pytest.approx(0.001)
+    assert stats['max_render_time'] == pytest.approx(0.010)
+    assert stats['latency']['count'] == 4 and stats['latency']['p50'] == pytest.approx(0.002, rel=0.02)
+    assert stats['hit_latency']['count'] == 3 and stats['miss_latency']['count'] == 1
+    assert stats['queue_wait']['count'] == 1
+    assert stats['coalesced_renders'] == 1 and stats['stale_hits'] == 1
+    assert stats['offloaded_async_renders'] == 1 and stats['inline_async_renders'] == 1
+    # Templates past max_templates share one histogram
+    assert stats['templates'] == {
+        'a' * 16: metrics.template_latency['a' * 64].summary(),
+        'b' * 16: metrics.template_latency['b' * 64].summary(),
+        'other': metrics.template_latency['other'].summary(),
+    }
+
+
+def test_snapshots_can_start_a_new_window():
+    metrics = PerformanceMetrics()
+    metrics.record_render(0.001, template_hash='a' * 64)
+    snapshot = metrics.snapshot(reset=True, include_templates=False)
+    assert snapshot['total_renders'] == 1 and 'templates' not in snapshot
+    assert metrics.snapshot()['templates'] == {}
+    assert 'error' in metrics.get_stats()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Package import tests
+Importing tsk_flask and initializing the extension leave the engine and heavy dependencies unloaded
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+from flask import Flask
+
+import tsk_flask
+from tsk_flask import performance_engine
+from tsk_flask.import_benchmark import HEAVY_DEPENDENCIES
+from tsk_flask.performance_engine import TurboTemplateEngine
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DEFERRED_MODULES = ('performance_engine', 'turbo_compiler', 'elephants', 'elephant_routes', 'elephant_showcase')
+
+
+def loaded_modules(script):
+    """The modules of DEFERRED_MODULES and HEAVY_DEPENDENCIES a fresh interpreter has loaded after script"""
+    watched = [f'tsk_flask.{name}' for name in DEFERRED_MODULES] + list(HEAVY_DEPENDENCIES)
+    script += f"\nimport json, sys\nprint(json.dumps([m for m in {watched!r} if m in sys.modules]))\n"
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [REPO_ROOT, env.get('PYTHONPATH')]))
+    result = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, env=env, check=True)
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    """The global turbo engine, kept out of the shared cache directory"""
+    engine = TurboTemplateEngine(cache_dir=str(tmp_path / 'cache'), max_workers=1)
+    monkeypatch.setattr(performance_engine, '_turbo_engine', engine)
+    yield engine
+    engine.shutdown()
+    engine.cache_store.close()
+
+
+def test_import_leaves_heavy_modules_unloaded():
+    assert loaded_modules('import tsk_flask') == []
+
+
+def test_init_app_leaves_the_engine_unloaded():
+    script = 'from flask import Flask\nfrom tsk_flask import FlaskTSK\nFlaskTSK(Flask("app"))'
+    assert loaded_modules(script) == []
+
+
+def test_every_lazy_export_resolves_and_is_listed():
+    names = dir(tsk_flask)
+    for name in tsk_flask._LAZY_EXPORTS:
+        assert name in names
+        assert getattr(tsk_flask, name) is not None
+    for name in tsk_flask._LAZY_FLAGS:
+        assert name in names
+        assert isinstance(getattr(tsk_flask, name), bool)
+
+
+def test_unknown_attributes_raise_attribute_error():
+    with pytest.raises(AttributeError):
+        tsk_flask.not_an_export
+
+
+def test_engine_is_applied_on_the_first_request(engine):
+    app = Flask(__name__)
+    tsk_flask.FlaskTSK(app)
+    assert not hasattr(app, 'tsk_turbo_engine')
+
+    app.test_client().get('/tsk/status')
+    assert app.tsk_turbo_engine is engine
+
+
+def test_turbo_templates_apply_the_engine_at_init(engine):
+    app = Flask(__name__)
+    app.config['TSK_TURBO_TEMPLATES'] = True
+    tsk_flask.FlaskTSK(app)
+    assert app.tsk_turbo_engine is engine
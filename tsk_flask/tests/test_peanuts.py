@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Binary peanut config tests
+Version 2 .pnt files round-trip, decode sections lazily and are told apart from legacy files
+"""
+
+import gzip
+import json
+import os
+
+import pytest
+
+from tsk_flask.herd.elephants.peanuts import (
+    MSGPACK_AVAILABLE, PNT_CODEC_JSON, PNT_CODEC_MSGPACK, PNT_MAGIC, PeanutConfig, Peanuts
+)
+
+CONFIG = {
+    'database': {'host': 'db.local', 'port': 5432, 'replicas': ['r1', 'r2']},
+    'app': {'name': 'Demo App', 'debug': False, 'ratio': 0.5, 'unicode': 'café ☕'},
+    'empty': {},
+    'version': '1.2.3',
+}
+
+CODECS = [
+    pytest.param(PNT_CODEC_JSON, id='json'),
+    pytest.param(PNT_CODEC_MSGPACK, id='msgpack',
+                 marks=pytest.mark.skipif(not MSGPACK_AVAILABLE, reason='msgpack not installed')),
+]
+
+
+@pytest.fixture
+def peanuts(monkeypatch):
+    """The Peanuts singleton, with its config and the environment restored afterwards"""
+    instance = Peanuts.get_instance()
+    monkeypatch.setattr(instance, 'config', {})
+    saved = dict(os.environ)
+    yield instance
+    os.environ.clear()
+    os.environ.update(saved)
+
+
+def write_legacy(config, path):
+    """A version 1 file: gzipped JSON behind a PNUT header"""
+    data = gzip.compress(json.dumps(config, separators=(',', ':')).encode('utf-8'), 9)
+    with open(path, 'wb') as f:
+        f.write(b'PNUT' + len(data).to_bytes(4, 'big') + data)
+
+
+@pytest.mark.parametrize('codec', CODECS)
+def test_round_trip(tmp_path, codec):
+    path = str(tmp_path / 'config.pnt')
+    PeanutConfig.write(CONFIG, path, codec)
+
+    config = PeanutConfig.open(path)
+    assert list(config) == list(CONFIG)
+    assert config.copy() == CONFIG
+    with open(path, 'rb') as f:
+        assert f.read(4) == PNT_MAGIC
+
+
+@pytest.mark.parametrize('codec', CODECS)
+def test_sections_are_decoded_on_first_access(tmp_path, codec):
+    path = str(tmp_path / 'config.pnt')
+    PeanutConfig.write(CONFIG, path, codec)
+
+    config = PeanutConfig.open(path)
+    assert len(config) == 4 and 'app' in config
+    assert config.decoded_sections == 0
+
+    assert config['app']['name'] == 'Demo App'
+    assert config['app'] is config['app']
+    assert config.decoded_sections == 1
+
+
+def test_environment_is_read_without_decoding_sections(tmp_path):
+    path = str(tmp_path / 'config.pnt')
+    PeanutConfig.write(CONFIG, path, PNT_CODEC_JSON)
+
+    config = PeanutConfig.open(path)
+    assert config.environment() == Peanuts.environment_for(CONFIG)
+    assert config.environment()['DATABASE_HOST'] == 'db.local'
+    assert config.decoded_sections == 0
+
+
+def test_sections_can_be_changed_in_memory(tmp_path):
+    path = str(tmp_path / 'config.pnt')
+    PeanutConfig.write(CONFIG, path, PNT_CODEC_JSON)
+
+    config = PeanutConfig.open(path)
+    config['app'] = {'name': 'Changed'}
+    del config['empty']
+    assert config['app'] == {'name': 'Changed'}
+    assert 'empty' not in config and len(config) == 3
+
+
+def test_an_empty_config_round_trips(tmp_path):
+    path = str(tmp_path / 'empty.pnt')
+    PeanutConfig.write({}, path, PNT_CODEC_JSON)
+    config = PeanutConfig.open(path)
+    assert len(config) == 0 and config.environment() == {}
+
+
+def test_rewriting_does_not_disturb_an_open_mapping(tmp_path):
+    path = str(tmp_path / 'config.pnt')
+    PeanutConfig.write(CONFIG, path, PNT_CODEC_JSON)
+    config = PeanutConfig.open(path)
+
+    PeanutConfig.write({'app': {'name': 'Next'}}, path, PNT_CODEC_JSON)
+    assert config['app']['name'] == 'Demo App'
+    assert PeanutConfig.open(path)['app']['name'] == 'Next'
+
+
+def test_section_names_cannot_contain_nul(tmp_path):
+    with pytest.raises(ValueError):
+        PeanutConfig.write({'bad\0name': {}}, str(tmp_path / 'bad.pnt'))
+
+
+@pytest.mark.parametrize('data', [
+    b'PNTS\x00',
+    b'PNTS' + b'\x00\x09' + b'\x00' * 16,
+    b'PNTS\x00\x02\x00\x00' + b'\x00\x00\x00\x05' + b'\x00' * 8,
+    b'NOPE' * 8,
+])
+def test_corrupt_files_raise_value_error(tmp_path, data):
+    path = tmp_path / 'corrupt.pnt'
+    path.write_bytes(data)
+    with pytest.raises(ValueError):
+        PeanutConfig.open(str(path))
+
+
+def test_crack_binary_maps_version_2_files(tmp_path, peanuts):
+    path = str(tmp_path / '.pnt')
+    PeanutConfig.write(CONFIG, path, PNT_CODEC_JSON)
+
+    assert peanuts.crack_binary(path)
+    assert isinstance(peanuts.config, PeanutConfig)
+    assert peanuts.get_config_value('database.host') == 'db.local'
+    assert peanuts.get_config_value('database.missing', 'fallback') == 'fallback'
+    assert os.environ['APP_NAME'] == 'Demo App'
+
+
+def test_crack_binary_reads_legacy_files(tmp_path, peanuts):
+    path = str(tmp_path / 'legacy.pnt')
+    write_legacy(CONFIG, path)
+
+    assert peanuts.crack_binary(path, export_env=False)
+    assert peanuts.config == CONFIG
+    assert peanuts.get_config_value('app.name') == 'Demo App'
+
+
+def test_crack_binary_rejects_unknown_and_corrupt_files(tmp_path, peanuts):
+    unknown = tmp_path / 'unknown.pnt'
+    unknown.write_bytes(b'JUNKJUNK')
+    corrupt = tmp_path / 'corrupt.pnt'
+    corrupt.write_bytes(b'PNTS\x00')
+
+    assert not peanuts.crack_binary(str(unknown))
+    assert not peanuts.crack_binary(str(corrupt))
+
+
+def test_compile_writes_a_version_2_file(tmp_path, peanuts):
+    source = tmp_path / 'peanu.tsk'
+    source.write_text('[database]\nhost = db.local\n\n[app]\nname = Demo App\n')
+    output = str(tmp_path / '.pnt')
+
+    assert Peanuts.compile(str(source), output)
+    config = PeanutConfig.open(output)
+    assert config.copy() == {'database': {'host': 'db.local'}, 'app': {'name': 'Demo App'}}
+
+
+def test_is_binary_file(tmp_path):
+    current = str(tmp_path / 'current.pnt')
+    PeanutConfig.write(CONFIG, current, PNT_CODEC_JSON)
+    legacy = str(tmp_path / 'legacy.pnt')
+    write_legacy(CONFIG, legacy)
+    text = tmp_path / 'peanu.tsk'
+    text.write_text('[app]\nname = x\n')
+
+    assert Peanuts.is_binary_file(current)
+    assert Peanuts.is_binary_file(legacy)
+    assert not Peanuts.is_binary_file(str(text))
+    assert not Peanuts.is_binary_file(str(tmp_path / 'missing.pnt'))
@@ -0,0 +1,477 @@
+#!/usr/bin/env python3
+"""
+Turbo template engine tests
+Concurrent misses share one render, stale output is served while a single refresh runs,
+and config changes drop only the output that read the changed sections
+"""
+
+import asyncio
+import gzip
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import pytest
+
+from tsk_flask.performance_engine import TurboTemplateEngine
+
+
+class Counter:
+    """
+    Counts the renders that call ``count()``, optionally slowly
+    Registered as a template global: a context callable would make the render uncacheable
+    """
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def increment(self):
+        time.sleep(self.delay)
+        with self._lock:
+            self.calls += 1
+            return self.calls
+
+    def register(self, engine):
+        engine.compiler.add_global('count', self.increment)
+        return self
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = TurboTemplateEngine(cache_dir=str(tmp_path))
+    yield engine
+    engine.shutdown()
+    engine.cache_store.close()
+
+
+def wait_for(condition, timeout: float = 2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not met in time"
+        time.sleep(0.01)
+
+
+def test_repeated_renders_are_served_from_cache(engine):
+    counter = Counter().register(engine)
+    context = {}
+    assert engine.render_template('n={{ count() }}', context) == 'n=1'
+    assert engine.render_template('n={{ count() }}', context) == 'n=1'
+    assert counter.calls == 1
+    assert engine.metrics.get_stats()['cache_hits'] == 1
+
+
+def test_concurrent_misses_share_one_render(engine):
+    counter = Counter(delay=0.2).register(engine)
+    context = {}
+    barrier = threading.Barrier(8)
+    results = []
+
+    def render():
+        barrier.wait()
+        results.append(engine.render_template('n={{ count() }}', context))
+
+    threads = [threading.Thread(target=render) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == ['n=1'] * 8
+    assert counter.calls == 1
+    assert engine.metrics.get_stats()['coalesced_renders'] >= 1
+    assert not engine._inflight
+
+
+def test_followers_render_themselves_when_the_leader_fails(engine):
+    flight, leader = engine._join_flight('key')
+    assert leader
+    follower, leader = engine._join_flight('key')
+    assert follower is flight and not leader
+
+    engine._finish_flight('key', flight, None)
+    assert flight.result() is None
+    assert engine._join_flight('key')[1]
+
+
+def test_async_renders_share_one_render(engine):
+    counter = Counter(delay=0.1).register(engine)
+    context = {}
+    # Make every render expensive enough to be offloaded to the render pool
+    engine.async_offload_threshold = 0
+
+    async def main():
+        return await asyncio.gather(*(engine.render_template_async('n={{ count() }}', context) for _ in range(6)))
+
+    assert asyncio.run(main()) == ['n=1'] * 6
+    assert counter.calls == 1
+
+
+def test_stale_output_is_served_while_one_refresh_runs(engine):
+    engine.cache_ttl = 0.05
+    engine.stale_while_revalidate = 60
+    counter = Counter().register(engine)
+    context = {}
+
+    assert engine.render_template('n={{ count() }}', context) == 'n=1'
+    time.sleep(0.06)
+
+    # Expired but within the grace period: the old output comes back at once
+    assert engine.render_template('n={{ count() }}', context) == 'n=1'
+    assert engine.metrics.get_stats()['stale_hits'] == 1
+    wait_for(lambda: counter.calls == 2 and not engine._inflight)
+
+    assert engine.render_template('n={{ count() }}', context) == 'n=2'
+    assert counter.calls == 2
+
+
+def test_output_past_the_grace_period_is_rendered_again(engine):
+    engine.cache_ttl = 0.05
+    engine.stale_while_revalidate = 0
+    counter = Counter().register(engine)
+    context = {}
+
+    assert engine.render_template('n={{ count() }}', context) == 'n=1'
+    time.sleep(0.06)
+    assert engine.render_template('n={{ count() }}', context) == 'n=2'
+    assert engine.metrics.get_stats()['stale_hits'] == 0
+
+
+def test_contexts_without_a_stable_fingerprint_are_not_cached(engine):
+    class Opaque:
+        def __init__(self, counter):
+            self.count = counter.increment
+
+    counter = Counter()
+    for expected in ('n=1', 'n=2'):
+        assert engine.render_template('n={{ value.count() }}', {'value': Opaque(counter)}) == expected
+    assert len(engine.memory_cache) == 0
+
+
+def test_context_callables_of_different_objects_never_share_output(engine):
+    class User:
+        def __init__(self, name):
+            self._name = name
+
+        def name(self):
+            return self._name
+
+    assert engine.render_template('Hello {{ name() }}', {'name': User('alice').name}) == 'Hello alice'
+    assert engine.render_template('Hello {{ name() }}', {'name': User('bob').name}) == 'Hello bob'
+    assert len(engine.memory_cache) == 0
+
+
+class FakeTSK:
+    """Just enough of a TuskLang instance for tsk_config and tsk_function"""
+
+    def __init__(self, **sections):
+        self.sections = sections
+
+    def get_value(self, section, key):
+        return self.sections.get(section, {}).get(key)
+
+    def execute_fujsen(self, section, name, *args):
+        return self.sections[section][name](*args)
+
+
+CONFIG_TEMPLATES = {
+    'app': 'app={{ tsk_config("app", "name") }}',
+    'db': 'db={{ tsk_config("db", "host") }}',
+    'none': 'plain={{ value }}',
+    'function': 'greet={{ tsk_function("app", "greet", "ann") }}',
+}
+
+
+def render_all(engine):
+    return {name: engine.render_template(source, {'value': 1}) for name, source in CONFIG_TEMPLATES.items()}
+
+
+def bound_engine(cache_dir, tsk, fingerprint=None):
+    engine = TurboTemplateEngine(cache_dir=str(cache_dir))
+    engine.set_tsk(tsk, fingerprint)
+    return engine
+
+
+def config(name='shop', host='db1', greeting='hi'):
+    return FakeTSK(app={'name': name, 'greet': lambda who: f'{greeting} {who}'}, db={'host': host})
+
+
+def test_output_is_tagged_with_the_config_sections_it_read(engine):
+    engine.set_tsk(config())
+    render_all(engine)
+    key = next(key for key in engine.memory_cache._entries
+               if engine.memory_cache.get(key) == 'app=shop')
+    assert engine.memory_cache.tags_of(key) == frozenset({'tsk:*', 'tsk:app'})
+
+
+def test_invalidating_a_section_drops_only_output_that_read_it(engine):
+    tsk = config()
+    engine.set_tsk(tsk)
+    assert render_all(engine) == {'app': 'app=shop', 'db': 'db=db1', 'none': 'plain=1', 'function': 'greet=hi ann'}
+
+    tsk.sections['app']['name'] = 'store'
+    tsk.sections['db']['host'] = 'db2'
+    assert engine.invalidate_config_sections(['app']) > 0
+
+    # db output is still cached, so its stale value survives until db is invalidated
+    assert render_all(engine) == {'app': 'app=store', 'db': 'db=db1', 'none': 'plain=1', 'function': 'greet=hi ann'}
+    engine.invalidate_config_sections(['db'])
+    assert render_all(engine)['db'] == 'db=db2'
+
+
+def test_invalidating_every_section_keeps_output_that_read_no_config(engine):
+    tsk = config()
+    engine.set_tsk(tsk)
+    render_all(engine)
+    entries = len(engine.memory_cache)
+
+    engine.invalidate_config_sections()
+    assert len(engine.memory_cache) == 1
+    assert entries > 1
+    assert engine.memory_cache.get(next(iter(engine.memory_cache._entries))) == 'plain=1'
+
+
+def test_invalidation_reaches_the_shared_tier(tmp_path):
+    first = bound_engine(tmp_path, config())
+    second = bound_engine(tmp_path, config(name='other', host='other'))
+    try:
+        render_all(first)
+        first.invalidate_config_sections(['app'])
+        # The second worker never rendered, so only the db output can come from the shared store
+        assert render_all(second) == {
+            'app': 'app=other', 'db': 'db=db1', 'none': 'plain=1', 'function': 'greet=hi ann'
+        }
+    finally:
+        for engine in (first, second):
+            engine.shutdown()
+            engine.cache_store.close()
+
+
+def test_binding_the_same_config_keeps_the_shared_cache(tmp_path):
+    first = bound_engine(tmp_path, config(), fingerprint='v1')
+    render_all(first)
+    # A worker booting later with identical config must not clear its peers' output
+    second = bound_engine(tmp_path, config(name='unseen'), fingerprint='v1')
+    try:
+        assert render_all(second)['app'] == 'app=shop'
+    finally:
+        for engine in (first, second):
+            engine.shutdown()
+            engine.cache_store.close()
+
+
+def test_binding_a_different_config_drops_config_output(tmp_path):
+    first = bound_engine(tmp_path, config(), fingerprint='v1')
+    render_all(first)
+    second = bound_engine(tmp_path, config(name='changed'), fingerprint='v2')
+    try:
+        assert render_all(second) == {
+            'app': 'app=changed', 'db': 'db=db1', 'none': 'plain=1', 'function': 'greet=hi ann'
+        }
+        assert second.metrics.get_stats()['cache_hits'] == 1
+    finally:
+        for engine in (first, second):
+            engine.shutdown()
+            engine.cache_store.close()
+
+
+def test_peers_on_the_old_config_cannot_repopulate_the_shared_store(tmp_path):
+    updated = bound_engine(tmp_path, config(), fingerprint='v1')
+    peer = bound_engine(tmp_path, config(), fingerprint='v1')
+    try:
+        render_all(updated)
+        updated.tsk.sections['app']['name'] = 'store'
+        updated.invalidate_config_sections(['app'], fingerprint='v2')
+
+        # The peer has not reloaded yet and writes its old output back to the shared store
+        assert render_all(peer)['app'] == 'app=shop'
+        updated.memory_cache.clear()
+        assert render_all(updated) == {
+            'app': 'app=store', 'db': 'db=db1', 'none': 'plain=1', 'function': 'greet=hi ann'
+        }
+        peer.memory_cache.clear()
+        assert bytes(peer.render_encoded(CONFIG_TEMPLATES['app'], {'value': 1})) == b'app=shop'
+        updated.memory_cache.clear()
+        assert bytes(updated.render_encoded(CONFIG_TEMPLATES['app'], {'value': 1})) == b'app=store'
+    finally:
+        for engine in (updated, peer):
+            engine.shutdown()
+            engine.cache_store.close()
+
+
+def test_replacing_the_flask_config_binds_its_fingerprint(engine, monkeypatch):
+    from tsk_flask import FlaskTSK, performance_engine
+
+    monkeypatch.setattr(performance_engine, '_turbo_engine', engine)
+    extension = FlaskTSK()
+    extension.tsk_instance = config()
+    extension._config_changed()
+    assert engine.tsk is extension.tsk_instance
+    assert engine.config_fingerprint == extension.config_fingerprint
+
+
+def test_rebinding_forgets_memoized_function_results(engine):
+    engine.set_tsk(config())
+    assert render_all(engine)['function'] == 'greet=hi ann'
+    engine.set_tsk(config(greeting='hello'))
+    assert render_all(engine)['function'] == 'greet=hello ann'
+
+
+def process_batch(engine, source, contexts):
+    engine.max_workers = 2
+    return engine.batch_render([{'content': source, 'context': context} for context in contexts], mode='process')
+
+
+def test_process_batches_match_inline_renders_and_are_cached(engine):
+    source = '{% for i in items %}{{ i|upper }}{% endfor %}:{{ name }}'
+    contexts = [{'items': ['a', str(n)], 'name': f'user{n}'} for n in range(20)]
+    expected = [engine.compiler.compile(source)(context) for context in contexts]
+
+    assert process_batch(engine, source, contexts) == expected
+    assert engine.render_template(source, contexts[3]) == expected[3]
+    assert engine.metrics.get_stats()['cache_hits'] == 1
+
+
+def test_process_batches_render_config_reads_with_the_bound_config(engine):
+    engine.set_tsk(config(name='bound'))
+    source = '{{ tsk_config("app", "name") }}-{{ n }}'
+
+    assert process_batch(engine, source, [{'n': n} for n in range(4)]) == [f'bound-{n}' for n in range(4)]
+    # Rendered here, so the sections read are recorded and invalidation finds the output
+    assert engine.invalidate_config_sections(['app']) >= 4
+
+
+def test_process_batches_use_the_engine_filters(engine):
+    engine.compiler.add_filter('upper', lambda value: f'<{value}>')
+    assert process_batch(engine, '{{ name|upper }}', [{'name': 'ann'}, {'name': 'bob'}]) == ['<ann>', '<bob>']
+
+
+def test_process_batch_failures_are_reported_not_cached(engine):
+    results = process_batch(engine, '{{ 10 // n }}', [{'n': 5}, {'n': 0}])
+    assert results[0] == '2'
+    assert results[1].startswith('<!-- Template Error:')
+    assert len(engine.memory_cache) == 1
+
+
+def test_only_templates_needing_nothing_but_defaults_render_in_workers(engine):
+    assert engine._renders_in_workers(engine._compile_template('{{ name|upper }}{{ range(2)|list }}'))
+    assert not engine._renders_in_workers(engine._compile_template('{{ tsk_config("app", "name") }}'))
+
+    engine.compiler.add_filter('shout', str.upper)
+    assert not engine._renders_in_workers(engine._compile_template('{{ name|shout }}'))
+
+    engine.template_dirs.append(str(engine.cache_dir))
+    with open(os.path.join(engine.cache_dir, 'base.html'), 'w') as f:
+        f.write('base')
+    assert not engine._renders_in_workers(engine._compile_template('{% include "base.html" %}'))
+
+
+def test_worker_templates_are_bounded(monkeypatch):
+    from tsk_flask import performance_engine
+
+    monkeypatch.setattr(performance_engine, 'WORKER_TEMPLATE_LIMIT', 2)
+    monkeypatch.setattr(performance_engine, '_worker_templates', OrderedDict())
+    for n in range(5):
+        assert performance_engine._render_chunk(f'hash{n}', f'{n}{{{{ x }}}}', [{'x': 'y'}, {}]) == [f'{n}y', f'{n}']
+    assert list(performance_engine._worker_templates) == ['hash3', 'hash4']
+
+
+def encoded_keys(engine):
+    return [key for key in engine.memory_cache._entries if '~' in key]
+
+
+def test_encodings_are_served_from_cache(engine):
+    engine.compression_min_size = 0
+    first = engine.render_encoded('Hello {{ name }}', {'name': 'Ada'}, 'gzip')
+    assert first.encoding == 'gzip' and gzip.decompress(first) == b'Hello Ada'
+
+    second = engine.render_encoded('Hello {{ name }}', {'name': 'Ada'}, 'gzip')
+    assert bytes(second) == bytes(first) and second.etag == first.etag
+    assert engine.metrics.get_stats()['cache_hits'] == 1
+
+
+def test_encodings_live_only_as_long_as_their_output(engine):
+    engine.compression_min_size = 0
+    engine.cache_ttl = 0.2
+    engine.render_template('Hello {{ name }}', {'name': 'Ada'})
+    time.sleep(0.1)
+    engine.render_encoded('Hello {{ name }}', {'name': 'Ada'}, 'gzip')
+    [key] = encoded_keys(engine)
+    assert engine.memory_cache.peek(key)[1] <= 0.1
+
+    time.sleep(0.12)
+    assert engine._encoded_get(key) is None
+    engine.memory_cache.clear()
+    # Nor does the shared tier hand it back for a full TTL
+    assert engine._encoded_get(key) is None
+
+
+def test_encodings_are_dropped_with_the_config_their_output_read(engine):
+    engine.compression_min_size = 0
+    tsk = config()
+    engine.set_tsk(tsk)
+    assert gzip.decompress(engine.render_encoded(CONFIG_TEMPLATES['app'], {}, 'gzip')) == b'app=shop'
+    [key] = encoded_keys(engine)
+    assert engine.memory_cache.tags_of(key) == frozenset({'tsk:*', 'tsk:app'})
+
+    tsk.sections['app']['name'] = 'store'
+    engine.invalidate_config_sections(['app'])
+    assert not encoded_keys(engine)
+    assert engine.cache_store.get(key) is None
+    assert gzip.decompress(engine.render_encoded(CONFIG_TEMPLATES['app'], {}, 'gzip')) == b'app=store'
+
+
+def test_stale_output_gets_no_stored_encodings(engine):
+    engine.compression_min_size = 0
+    engine.cache_ttl = 0.05
+    engine.stale_while_revalidate = 60
+    counter = Counter(delay=0.2).register(engine)
+    engine.render_template('n={{ count() }}', {})
+    time.sleep(0.06)
+
+    assert gzip.decompress(engine.render_encoded('n={{ count() }}', {}, 'gzip')) == b'n=1'
+    assert not encoded_keys(engine)
+    wait_for(lambda: counter.calls == 2 and not engine._inflight)
+
+
+STREAMED = '<ul>{% for i in items %}<li>{{ i }} {{ tsk_config("app", "name") }}</li>{% endfor %}</ul>'
+
+
+def test_streamed_chunks_join_to_the_rendered_output(engine):
+    engine.set_tsk(config())
+    context = {'items': list(range(200))}
+    chunks = list(engine.stream(STREAMED, context, chunk_size=64))
+    assert len(chunks) > 1
+    assert all(len(chunk) >= 64 for chunk in chunks[:-1])
+
+    engine.memory_cache.clear()
+    engine.cache_store.clear()
+    assert ''.join(chunks) == engine.render_template(STREAMED, context)
+
+
+def test_streamed_renders_populate_the_cache(engine):
+    counter = Counter().register(engine)
+    engine.set_tsk(config())
+    source = 'n={{ count() }} {{ tsk_config("app", "name") }}'
+    assert ''.join(engine.stream(source, {})) == 'n=1 shop'
+
+    assert engine.render_template(source, {}) == 'n=1 shop'
+    assert ''.join(engine.stream(source, {})) == 'n=1 shop'
+    assert counter.calls == 1
+    # Tagged with the config it read, like any other render
+    engine.invalidate_config_sections(['app'])
+    assert engine.render_template(source, {}) == 'n=2 shop'
+
+
+def test_streams_that_fail_or_grow_too_large_are_not_cached(engine):
+    engine.stream_cache_limit = 100
+    assert len(''.join(engine.stream('{% for i in range(50) %}{{ i }},{% endfor %}', {}))) > 100
+    assert ''.join(engine.stream('{{ 1 // n }}', {'n': 0})).startswith('<!-- Template Error:')
+
+    # An abandoned stream never completed, so it is not cached either
+    partial = engine.stream('{% for i in range(50) %}{{ i }}{% endfor %}', {}, chunk_size=4)
+    next(partial)
+    partial.close()
+    assert len(engine.memory_cache) == 0
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Render cache tests
+The in-process LRU tier, the shared SQLite tier and context fingerprints
+"""
+
+import time
+
+import pytest
+
+from tsk_flask.render_cache import MemoryRenderCache, SQLiteRenderCacheStore, fingerprint_context
+
+
+class Opaque:
+    """A value whose repr carries its address"""
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SQLiteRenderCacheStore(str(tmp_path / 'render_cache.db'), compaction_interval=None)
+    yield store
+    store.close()
+
+
+def test_memory_cache_round_trip():
+    cache = MemoryRenderCache()
+    assert cache.set('page', '<p>hi</p>')
+    assert cache.get('page') == '<p>hi</p>'
+    assert 'page' in cache and len(cache) == 1
+    assert cache.get('other') is None
+
+    stats = cache.get_stats()
+    assert stats['hits'] == 1 and stats['misses'] == 1
+
+
+def test_memory_cache_evicts_least_recently_used_to_stay_in_budget():
+    entry = MemoryRenderCache._sizeof('k0', 'x' * 100)
+    cache = MemoryRenderCache(max_bytes=entry * 3)
+    for i in range(3):
+        cache.set(f'k{i}', 'x' * 100)
+    cache.get('k0')
+    cache.set('k3', 'x' * 100)
+
+    assert 'k1' not in cache
+    assert all(key in cache for key in ('k0', 'k2', 'k3'))
+    assert cache.current_bytes <= cache.max_bytes
+    assert cache.get_stats()['evictions'] == 1
+
+
+def test_memory_cache_rejects_values_larger_than_the_budget():
+    cache = MemoryRenderCache(max_bytes=64)
+    assert not cache.set('big', 'x' * 1000)
+    assert len(cache) == 0
+
+
+def test_memory_cache_expires_entries():
+    cache = MemoryRenderCache()
+    cache.set('page', 'body', ttl=0.05)
+    assert cache.get('page') == 'body'
+    time.sleep(0.06)
+    assert cache.get('page') is None
+    assert 'page' not in cache
+    assert cache.get_stats()['expirations'] == 1
+
+
+def test_memory_cache_serves_stale_entries_during_the_grace_period():
+    cache = MemoryRenderCache()
+    cache.set('page', 'body', ttl=0.05, stale_ttl=60)
+    assert cache.get_entry('page') == ('body', True)
+    time.sleep(0.06)
+
+    assert cache.get_entry('page') == ('body', False)
+    # A plain get never returns stale output
+    assert cache.get('page') is None
+    assert cache.get_stats()['stale_hits'] == 2
+
+
+def test_memory_cache_peek_reports_what_is_left_of_fresh_entries():
+    cache = MemoryRenderCache()
+    cache.set('page', 'body', ttl=60, stale_ttl=60, tags=['tsk:app'])
+    value, remaining, tags = cache.peek('page')
+    assert value == 'body' and 59 < remaining <= 60 and tags == frozenset({'tsk:app'})
+    assert cache.get_stats()['hits'] == 0
+
+    cache.set('stale', 'body', ttl=0, stale_ttl=60)
+    assert cache.peek('stale') is None and cache.peek('missing') is None
+
+
+def test_memory_cache_drops_entries_by_tag():
+    cache = MemoryRenderCache()
+    cache.set('a', 'A', tags=['tsk:app'])
+    cache.set('b', 'B', tags=['tsk:app', 'tsk:db'])
+    cache.set('c', 'C', tags=['tsk:db'])
+    cache.set('d', 'D')
+    assert cache.tags_of('b') == frozenset({'tsk:app', 'tsk:db'})
+
+    assert cache.delete_tags(['tsk:app']) == 2
+    assert 'c' in cache and 'd' in cache
+    assert 'a' not in cache and 'b' not in cache
+    assert cache.get_stats()['tags'] == 1
+
+
+def test_memory_cache_replacing_an_entry_replaces_its_tags():
+    cache = MemoryRenderCache()
+    cache.set('a', 'A', tags=['old'])
+    cache.set('a', 'A2', tags=['new'])
+    assert cache.delete_tags(['old']) == 0
+    assert cache.get('a') == 'A2'
+    assert cache.delete_tags(['new']) == 1
+
+
+def test_memory_cache_drops_entries_by_prefix():
+    cache = MemoryRenderCache()
+    for key in ('tpl1:a', 'tpl1:b', 'tpl2:a'):
+        cache.set(key, key)
+    assert cache.delete_prefix('tpl1:') == 2
+    assert list(cache._entries) == ['tpl2:a']
+
+    cache.clear()
+    assert len(cache) == 0 and cache.current_bytes == 0
+
+
+def test_sqlite_store_round_trip(store):
+    store.set('page', b'<p>hi</p>', ttl=60)
+    assert store.get('page') == b'<p>hi</p>'
+    assert store.get('other') is None
+    assert store.delete('page')
+    assert not store.delete('page')
+    assert store.get('page') is None
+
+
+def test_sqlite_store_expires_entries(store):
+    store.set('gone', b'x', ttl=0)
+    store.set('kept', b'y', ttl=60)
+    assert store.get('gone') is None
+
+    assert store.compact()['expired'] == 1
+    assert store.get_stats()['entries'] == 1
+
+
+def test_sqlite_store_drops_entries_by_tag(store):
+    store.set('a', b'A', ttl=60, tags=['tsk:app'])
+    store.set('b', b'B', ttl=60, tags=['tsk:app', 'tsk:db'])
+    store.set('c', b'C', ttl=60, tags=['tsk:db'])
+
+    assert store.delete_tags(['tsk:app']) == 2
+    assert store.get('a') is None and store.get('b') is None
+    assert store.get('c') == b'C'
+    assert store.delete_tags([]) == 0
+
+
+def test_sqlite_store_drops_entries_by_prefix(store):
+    for key in ('tpl1:a', 'tpl1:b', 'tpl2:a'):
+        store.set(key, key.encode(), ttl=60)
+    assert store.delete_prefix('tpl1:') == 2
+    assert store.get('tpl2:a') == b'tpl2:a'
+
+    assert store.delete_prefix('') == 1
+    assert store.get_stats()['entries'] == 0
+
+
+def test_sqlite_store_evicts_least_recently_used_over_its_cap(tmp_path):
+    store = SQLiteRenderCacheStore(str(tmp_path / 'capped.db'), max_bytes=250, compaction_interval=None)
+    try:
+        for i in range(5):
+            store.set(f'k{i}', b'x' * 100, ttl=60)
+            time.sleep(0.01)
+
+        assert store.compact()['evicted'] == 3
+        assert store.get_stats()['bytes'] <= 250
+        assert store.get('k3') == b'x' * 100 and store.get('k4') == b'x' * 100
+        assert store.get('k0') is None
+    finally:
+        store.close()
+
+
+def test_sqlite_store_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / 'shared.db')
+    first = SQLiteRenderCacheStore(path, compaction_interval=None)
+    second = SQLiteRenderCacheStore(path, compaction_interval=None)
+    try:
+        first.set('page', b'body', ttl=60, tags=['tsk:app'])
+        assert second.get('page') == b'body'
+
+        second.delete_tags(['tsk:app'])
+        assert first.get('page') is None
+    finally:
+        first.close()
+        second.close()
+
+
+def test_fingerprint_is_stable_and_order_independent():
+    first = fingerprint_context({'a': 1, 'b': [1, 2], 'c': {'x': 'y'}})
+    second = fingerprint_context({'c': {'x': 'y'}, 'b': [1, 2], 'a': 1})
+    assert first == second
+    assert first != fingerprint_context({'a': 2, 'b': [1, 2], 'c': {'x': 'y'}})
+
+
+def test_fingerprint_only_counts_named_variables():
+    context = {'user': 'ann', 'request_id': 'abc'}
+    assert fingerprint_context(context, ['user']) == fingerprint_context({'user': 'ann', 'request_id': 'xyz'}, ['user'])
+    assert fingerprint_context({}) == fingerprint_context(context, ['missing']) == '0'
+
+
+def test_fingerprint_refuses_callables():
+    class User:
+        def __init__(self, name):
+            self._name = name
+
+        def name(self):
+            return self._name
+
+    # Same qualname, different output: they must never share a cache key
+    assert fingerprint_context({'name': User('alice').name}) is None
+    assert fingerprint_context({'name': lambda: 'bob'}) is None
+    assert fingerprint_context({'f': fingerprint_context}) is None
+
+
+def test_fingerprint_refuses_values_whose_repr_carries_an_address():
+    assert fingerprint_context({'value': Opaque()}) is None
+    assert fingerprint_context({'nested': {'values': [1, Opaque()]}}) is None
+    assert fingerprint_context({1: Opaque(), 'a': 1}) is None
+
+
+def test_fingerprint_refuses_values_whose_repr_only_names_them():
+    class Named:
+        def __repr__(self):
+            return "<flask.g of 'app'>"
+
+    assert fingerprint_context({'g': Named()}) is None
+
+
+def test_fingerprint_counts_shared_globals_by_name():
+    def helper():
+        return 'x'
+
+    shared = [{'helper': helper}]
+    assert fingerprint_context({'helper': helper}, shared=shared) is not None
+    assert fingerprint_context({'helper': helper}, shared=shared) == fingerprint_context({'helper': helper}, shared=shared)
+    # A context value shadowing the global is not the shared one
+    assert fingerprint_context({'helper': lambda: 'y'}, shared=shared) is None
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Turbo compiler tests
+Compiled templates must render exactly what Jinja renders for the same source and context
+"""
+
+import pytest
+from jinja2 import DictLoader, Environment
+
+from tsk_flask.turbo_compiler import SafeText, TemplateCompiler, TemplateSyntaxError
+
+LAYOUTS = {
+    'base.html': '<title>{% block title %}Site{% endblock %}</title><main>{% block body %}{% endblock %}</main>',
+    'nav.html': '<nav>{% for item in menu %}<a>{{ item }}</a>{% endfor %}</nav>',
+}
+
+CONTEXT = {
+    'name': 'Ada',
+    'html': '<b>"bold" & \'quoted\'</b>',
+    'items': [3, 1, 2],
+    'users': [{'name': 'ann', 'age': 31}, {'name': 'bob', 'age': 27}],
+    'menu': ['home', 'about'],
+    'price': 3.14159,
+    'data': {'b': '</script><script>alert(1)</script>', 'a': [1, 2], 'c': "it's & more"},
+    'empty': [],
+    'flag': True,
+}
+
+PARITY_CASES = [
+    'Hello {{ name }}!',
+    '{{ missing }}|{{ missing|default("fallback") }}|{{ name|default("x") }}',
+    '{{ html }}',
+    '{{ html|e }}|{{ html|safe }}',
+    '{{ name|upper }} {{ name|lower }} {{ name|length }} {{ "hi there"|title }} {{ " x "|trim }}',
+    '{{ items|sort|join(", ") }} {{ items|first }} {{ items|last }} {{ items|sum }} {{ items|max }}',
+    '{{ users|join(", ", attribute="name") }}',
+    '{{ price|round(2) }} {{ "42"|int + 1 }} {{ "2.5"|float * 2 }} {{ "%s-%s"|format(1, 2) }}',
+    '{{ "a long sentence that keeps going"|truncate(12) }}',
+    '{{ data|tojson }}',
+    '{{ data|tojson(2) }}',
+    '<script>var data = {{ data|tojson }};</script>',
+    '{% for i in items %}{{ loop.index }}:{{ i }}{% if not loop.last %},{% endif %}{% endfor %}',
+    '{% for u in users %}{{ loop.index0 }}{{ u.name }}{{ loop.length }}{{ loop.first }}{% endfor %}',
+    '{% for x in empty %}{{ x }}{% else %}nothing{% endfor %}',
+    '{% for k, v in {"a": 1, "b": 2}.items() %}{{ k }}={{ v }};{% endfor %}',
+    '{% if items|length > 5 %}many{% elif items %}some{% else %}none{% endif %}',
+    '{% if flag and name == "Ada" %}yes{% endif %}{% if missing is defined %}no{% endif %}',
+    '{% set greeting = "Hi " ~ name %}{{ greeting }}',
+    '{{ "even" if items|length is even else "odd" }} {{ 7 is divisibleby 7 }} {{ 2 ** 3 }} {{ 7 // 2 }} {{ 7 % 3 }}',
+    '{{ name[0] }}{{ users[1]["name"] }}{{ users[0].age }}{{ items[-1] }}',
+    '{%- if flag %}  trimmed  {%- endif %}  |  {{- name -}}  |',
+    '{# a comment #}after',
+    '{% extends "base.html" %}{% block title %}{{ name }} - {{ super() }}{% endblock %}{% block body %}hi{% endblock %}',
+    'before {% include "nav.html" %} after',
+]
+
+
+def render_jinja(source, autoescape):
+    environment = Environment(autoescape=autoescape, loader=DictLoader(LAYOUTS))
+    return environment.from_string(source).render(**CONTEXT)
+
+
+def render_turbo(source, autoescape):
+    compiled = TemplateCompiler(loader=LAYOUTS.get).compile(source, autoescape=autoescape)
+    return compiled(dict(CONTEXT))
+
+
+@pytest.mark.parametrize('autoescape', [False, True], ids=['plain', 'autoescape'])
+@pytest.mark.parametrize('source', PARITY_CASES)
+def test_output_matches_jinja(source, autoescape):
+    assert render_turbo(source, autoescape) == render_jinja(source, autoescape)
+
+
+@pytest.mark.parametrize('autoescape', [False, True], ids=['plain', 'autoescape'])
+def test_tojson_is_html_safe(autoescape):
+    output = render_turbo('<script>var data = {{ data|tojson }};</script>', autoescape)
+    script = output[len('<script>'):-len('</script>')]
+    assert '</script>' not in script
+    assert '\\u003c/script\\u003e' in script
+    assert '\\u0026' in script and '\\u0027' in script
+    # Marked safe, so autoescape leaves the JSON alone
+    assert '&#34;' not in output
+
+
+def test_tojson_filter_returns_safe_text():
+    compiler = TemplateCompiler()
+    value = compiler.filters['tojson']({'a': '<'})
+    assert isinstance(value, SafeText)
+    assert value == '{"a": "\\u003c"}'
+
+
+def test_generate_yields_the_same_output_as_render():
+    compiled = TemplateCompiler(loader=LAYOUTS.get).compile(PARITY_CASES[12])
+    assert ''.join(compiled.generate(dict(CONTEXT))) == compiled(dict(CONTEXT))
+
+
+def test_artifact_round_trip():
+    compiler = TemplateCompiler(loader=LAYOUTS.get)
+    artifact = compiler.dump(PARITY_CASES[23], 'layout', autoescape=True)
+    loaded = compiler.load(artifact, LAYOUTS.get)
+    assert loaded(dict(CONTEXT)) == render_jinja(PARITY_CASES[23], True)
+
+
+def test_artifact_rejects_changed_dependency():
+    layouts = dict(LAYOUTS)
+    compiler = TemplateCompiler(loader=layouts.get)
+    artifact = compiler.dump('{% include "nav.html" %}', 'include')
+    layouts['nav.html'] = '<nav>changed</nav>'
+    with pytest.raises(ValueError):
+        compiler.load(artifact, layouts.get)
+
+
+@pytest.mark.parametrize('source', [
+    '{% if flag %}unclosed',
+    '{% endfor %}',
+    '{% unknown %}',
+    '{% body %}',
+    '{% template_name "base.html" %}',
+    '{{ name | }}',
+    '{% extends "missing.html" %}',
+])
+def test_invalid_templates_raise_syntax_errors(source):
+    with pytest.raises(TemplateSyntaxError):
+        TemplateCompiler(loader=LAYOUTS.get).compile(source)
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Template warmup tests
+Compiled artifacts are persisted only in a private directory, signed, and reused by later workers
+"""
+
+import os
+import sys
+
+import pytest
+
+from tsk_flask import cli
+from tsk_flask.performance_engine import TurboTemplateEngine, private_directory
+
+TEMPLATES = {
+    'base.html': '<title>{% block title %}Site{% endblock %}</title>',
+    'page.html': '{% extends "base.html" %}{% block title %}{{ name }}{% endblock %}',
+    'macro.html': '{% macro broken() %}{% endmacro %}',
+}
+
+
+@pytest.fixture
+def project(tmp_path):
+    templates = tmp_path / 'project' / 'templates'
+    templates.mkdir(parents=True)
+    for name, source in TEMPLATES.items():
+        (templates / name).write_text(source)
+    return tmp_path / 'project'
+
+
+def new_engine(cache_dir):
+    return TurboTemplateEngine(cache_dir=str(cache_dir), max_workers=1)
+
+
+def close(engine):
+    engine.shutdown()
+    engine.cache_store.close()
+
+
+def artifacts(engine):
+    return sorted(name for name in os.listdir(engine.compiled_dir) if name.endswith('.tpc'))
+
+
+def test_warmup_compiles_then_later_workers_load(project, tmp_path):
+    cache_dir = tmp_path / 'cache'
+    first = new_engine(cache_dir)
+    try:
+        summary = first.warmup([str(project / 'templates')], parallel=False)
+    finally:
+        close(first)
+    assert summary['files'] == 3
+    assert summary['compiled'] > 0 and summary['loaded'] == 0
+    # The compiler has no macros; that template is left to Jinja
+    assert list(summary['failed']) == [str(project / 'templates' / 'macro.html')]
+    assert artifacts(first)
+
+    second = new_engine(cache_dir)
+    try:
+        summary = second.warmup([str(project / 'templates')], parallel=False)
+        assert summary['compiled'] == 0 and summary['loaded'] > 0
+        source = (project / 'templates' / 'page.html').read_text()
+        assert second.render_template(source, {'name': 'Ada'}) == '<title>Ada</title>'
+    finally:
+        close(second)
+
+
+def test_artifacts_with_a_bad_signature_are_ignored(project, tmp_path):
+    cache_dir = tmp_path / 'cache'
+    first = new_engine(cache_dir)
+    try:
+        first.warmup([str(project / 'templates')], parallel=False)
+    finally:
+        close(first)
+
+    # Another process swapping in its own code, signed with a key it guessed
+    for name in artifacts(first):
+        path = os.path.join(first.compiled_dir, name)
+        with open(path, 'rb') as f:
+            data = f.read()
+        with open(path, 'wb') as f:
+            f.write(b'\0' * 32 + data[32:])
+
+    second = new_engine(cache_dir)
+    try:
+        summary = second.warmup([str(project / 'templates')], parallel=False)
+        assert summary['loaded'] == 0 and summary['compiled'] > 0
+    finally:
+        close(second)
+
+
+def test_artifact_key_is_private(tmp_path):
+    engine = new_engine(tmp_path / 'cache')
+    peer = new_engine(tmp_path / 'cache')
+    try:
+        key = engine.artifact_key
+        path = os.path.join(engine.compiled_dir, '.artifact_key')
+        assert len(key) == 32
+        assert os.stat(path).st_mode & 0o777 == 0o600
+        # Workers on the node share the key, so they can load each other's artifacts
+        assert peer.artifact_key == key
+    finally:
+        close(engine)
+        close(peer)
+
+
+def test_cache_directories_are_created_private(tmp_path):
+    engine = new_engine(tmp_path / 'cache')
+    try:
+        assert engine.persist_compiled
+        for path in (engine.cache_dir, engine.compiled_dir):
+            assert os.stat(path).st_mode & 0o777 == 0o700
+    finally:
+        close(engine)
+
+
+def test_shared_cache_directories_disable_persistence(project, tmp_path):
+    cache_dir = tmp_path / 'shared'
+    cache_dir.mkdir()
+    os.chmod(cache_dir, 0o777)
+    assert not private_directory(str(cache_dir))
+
+    engine = new_engine(cache_dir)
+    try:
+        assert not engine.persist_compiled
+        summary = engine.warmup([str(project / 'templates')], parallel=False)
+        assert summary['compiled'] > 0
+        assert not os.path.exists(engine.compiled_dir)
+    finally:
+        close(engine)
+
+
+def test_private_directory_rejects_symlinks(tmp_path):
+    target = tmp_path / 'target'
+    target.mkdir(mode=0o700)
+    link = tmp_path / 'link'
+    link.symlink_to(target)
+    assert private_directory(str(target))
+    assert not private_directory(str(link))
+
+
+def test_warmup_cli(project, tmp_path, monkeypatch, capsys):
+    cache_dir = tmp_path / 'cache'
+    monkeypatch.setattr(sys, 'argv', [
+        'flask-tsk', 'warmup', str(project), '--cache-dir', str(cache_dir), '--workers', '1'
+    ])
+    cli.main()
+    output = capsys.readouterr().out
+    assert 'Template files: 3' in output
+    assert f"Artifacts: {cache_dir / 'compiled'}" in output
+    assert 'macro.html' in output
+    assert any(name.endswith('.tpc') for name in os.listdir(cache_dir / 'compiled'))
+
+
+def test_warmup_cli_rejects_projects_without_templates(tmp_path, monkeypatch):
+    monkeypatch.setattr(sys, 'argv', ['flask-tsk', 'warmup', str(tmp_path)])
+    with pytest.raises(SystemExit):
+        cli.main()
@@ -0,0 +1,1701 @@
+#!/usr/bin/env python3
+"""
+TuskLang Turbo Template Compiler
+Compiles Jinja-style templates into native Python render functions
+"""
+
+import re
+import json
+import marshal
+import hashlib
+import importlib.util
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+
+class TemplateSyntaxError(Exception):
+    """Raised when a turbo template cannot be parsed"""
+
+    def __init__(self, message: str, lineno: int = 0):
+        self.lineno = lineno
+        if lineno:
+            message = f"{message} (line {lineno})"
+        super().__init__(message)
+
+
+class TemplateNotFound(TemplateSyntaxError):
+    """Raised when an extended or included template cannot be loaded"""
+
+    def __init__(self, name: str, lineno: int = 0):
+        self.name = name
+        super().__init__(f"Template {name!r} not found", lineno)
+
+
+class Undefined:
+    """Value of a variable that is missing from the render context"""
+
+    __slots__ = ()
+
+    def __str__(self) -> str:
+        return ''
+
+    def __html__(self) -> str:
+        return ''
+
+    def __repr__(self) -> str:
+        return 'Undefined'
+
+    def __bool__(self) -> bool:
+        return False
+
+    def __len__(self) -> int:
+        return 0
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(())
+
+    def __getattr__(self, name: str) -> 'Undefined':
+        if name.startswith('__'):
+            raise AttributeError(name)
+        return self
+
+    def __getitem__(self, key: Any) -> 'Undefined':
+        return self
+
+    def __call__(self, *args, **kwargs) -> 'Undefined':
+        return self
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, Undefined)
+
+    def __hash__(self) -> int:
+        return 0
+
+
+UNDEFINED = Undefined()
+
+
+class LoopContext:
+    """The ``loop`` variable available inside ``{% for %}`` blocks"""
+
+    __slots__ = ('index0', 'length')
+
+    def __init__(self, length: int):
+        self.index0 = -1
+        self.length = length
+
+    @property
+    def index(self) -> int:
+        return self.index0 + 1
+
+    @property
+    def revindex(self) -> int:
+        return self.length - self.index0
+
+    @property
+    def revindex0(self) -> int:
+        return self.length - self.index0 - 1
+
+    @property
+    def first(self) -> bool:
+        return self.index0 == 0
+
+    @property
+    def last(self) -> bool:
+        return self.index0 == self.length - 1
+
+    def cycle(self, *values: Any) -> Any:
+        if not values:
+            return UNDEFINED
+        return values[self.index0 % len(values)]
+
+
+# ===== RUNTIME HELPERS =====
+
+def _attr(obj: Any, name: str) -> Any:
+    """Resolve ``obj.name``; plain dicts are checked for the key first"""
+    if type(obj) is dict:
+        value = obj.get(name, UNDEFINED)
+        if value is not UNDEFINED:
+            return value
+    try:
+        return getattr(obj, name)
+    except AttributeError:
+        pass
+    try:
+        return obj[name]
+    except (TypeError, LookupError):
+        return UNDEFINED
+
+
+def _item(obj: Any, key: Any) -> Any:
+    """Resolve ``obj[key]`` falling back to attribute access"""
+    try:
+        return obj[key]
+    except (TypeError, LookupError):
+        if isinstance(key, str):
+            try:
+                return getattr(obj, key)
+            except AttributeError:
+                pass
+        return UNDEFINED
+
+
+def _iter(value: Any) -> Any:
+    """Iterate a loop source, treating None and undefined as empty"""
+    if value is None:
+        return ()
+    if type(value) is dict:
+        return value.keys()
+    return value
+
+
+def _to_str(value: Any) -> str:
+    """Convert an output value to text"""
+    if type(value) is str:
+        return value
+    return str(value)
+
+
+class SafeText(str):
+    """Text already escaped for HTML output"""
+
+    __slots__ = ()
+
+    def __html__(self) -> 'SafeText':
+        return self
+
+
+def _escape(value: Any) -> str:
+    """Convert an output value to HTML-escaped text, leaving markup objects alone"""
+    if hasattr(value, '__html__'):
+        return value.__html__()
+    # Same entities as markupsafe so autoescaped output matches Jinja byte for byte
+    return (
+        _to_str(value)
+        .replace('&', '&amp;')
+        .replace('>', '&gt;')
+        .replace('<', '&lt;')
+        .replace("'", '&#39;')
+        .replace('"', '&#34;')
+    )
+
+
+# ===== FILTERS =====
+
+def _filter_default(value: Any, default: Any = '', boolean: bool = False) -> Any:
+    if isinstance(value, Undefined) or (boolean and not value):
+        return default
+    return value
+
+
+def _filter_join(value: Any, separator: str = '', attribute: Optional[str] = None) -> str:
+    if attribute is not None:
+        value = [_attr(item, attribute) for item in value]
+    return separator.join(_to_str(item) for item in value)
+
+
+def _filter_int(value: Any, default: int = 0) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        try:
+            return int(float(value))
+        except (TypeError, ValueError):
+            return default
+
+
+def _filter_float(value: Any, default: float = 0.0) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def _filter_first(value: Any) -> Any:
+    for item in value:
+        return item
+    return UNDEFINED
+
+
+def _filter_last(value: Any) -> Any:
+    try:
+        return value[-1]
+    except (TypeError, LookupError):
+        items = list(value)
+        return items[-1] if items else UNDEFINED
+
+
+def _filter_truncate(value: Any, length: int = 255, killwords: bool = False,
+                     end: str = '...', leeway: int = 5) -> str:
+    value = _to_str(value)
+    if len(value) <= length + leeway:
+        return value
+    if killwords:
+        return value[:length - len(end)] + end
+    result = value[:length - len(end)].rsplit(' ', 1)[0]
+    return result + end
+
+
+def _filter_round(value: Any, precision: int = 0, method: str = 'common') -> float:
+    if method == 'ceil':
+        import math
+        factor = 10 ** precision
+        return math.ceil(value * factor) / factor
+    if method == 'floor':
+        import math
+        factor = 10 ** precision
+        return math.floor(value * factor) / factor
+    return round(value, precision)
+
+
+def _filter_sort(value: Any, reverse: bool = False, attribute: Optional[str] = None) -> List[Any]:
+    if attribute is not None:
+        return sorted(value, key=lambda item: _attr(item, attribute), reverse=reverse)
+    return sorted(value, reverse=reverse)
+
+
+def _filter_format(value: Any, *args: Any, **kwargs: Any) -> str:
+    if kwargs:
+        return _to_str(value) % kwargs
+    return _to_str(value) % args
+
+
+def _filter_escape(value: Any) -> str:
+    return SafeText(_escape(value))
+
+
+def _filter_safe(value: Any) -> Any:
+    if hasattr(value, '__html__'):
+        return value
+    return SafeText(_to_str(value))
+
+
+def _filter_tojson(value: Any, indent: Optional[int] = None) -> SafeText:
+    """JSON safe inside HTML and <script> blocks, as jinja2.utils.htmlsafe_json_dumps writes it"""
+    return SafeText(
+        json.dumps(value, indent=indent, sort_keys=True)
+        .replace('<', '\\u003c')
+        .replace('>', '\\u003e')
+        .replace('&', '\\u0026')
+        .replace("'", '\\u0027')
+    )
+
+
+DEFAULT_FILTERS: Dict[str, Callable] = {
+    'abs': abs,
+    'capitalize': lambda value: _to_str(value).capitalize(),
+    'count': len,
+    'd': _filter_default,
+    'default': _filter_default,
+    'e': _filter_escape,
+    'escape': _filter_escape,
+    'first': _filter_first,
+    'float': _filter_float,
+    'format': _filter_format,
+    'int': _filter_int,
+    'join': _filter_join,
+    'last': _filter_last,
+    'length': len,
+    'list': list,
+    'lower': lambda value: _to_str(value).lower(),
+    'max': max,
+    'min': min,
+    'replace': lambda value, old, new, count=-1: _to_str(value).replace(old, new, count),
+    'reverse': lambda value: value[::-1] if isinstance(value, str) else list(reversed(list(value))),
+    'round': _filter_round,
+    'safe': _filter_safe,
+    'sort': _filter_sort,
+    'string': _to_str,
+    'sum': sum,
+    'title': lambda value: _to_str(value).title(),
+    'tojson': _filter_tojson,
+    'trim': lambda value, chars=None: _to_str(value).strip(chars),
+    'truncate': _filter_truncate,
+    'upper': lambda value: _to_str(value).upper(),
+    'wordcount': lambda value: len(_to_str(value).split()),
+}
+
+
+DEFAULT_TESTS: Dict[str, Callable] = {
+    'defined': lambda value: not isinstance(value, Undefined),
+    'undefined': lambda value: isinstance(value, Undefined),
+    'none': lambda value: value is None,
+    'number': lambda value: isinstance(value, (int, float)) and not isinstance(value, bool),
+    'string': lambda value: isinstance(value, str),
+    'mapping': lambda value: isinstance(value, dict),
+    'sequence': lambda value: hasattr(value, '__len__') and hasattr(value, '__getitem__'),
+    'iterable': lambda value: hasattr(value, '__iter__'),
+    'even': lambda value: value % 2 == 0,
+    'odd': lambda value: value % 2 == 1,
+    'divisibleby': lambda value, num: value % num == 0,
+    'sameas': lambda value, other: value is other,
+    'eq': lambda value, other: value == other,
+}
+
+
+DEFAULT_GLOBALS: Dict[str, Any] = {
+    'range': range,
+    'dict': dict,
+}
+
+
+# ===== TEMPLATE LEXER =====
+
+_TAG_RE = re.compile(
+    r'\{\{(-?)(.*?)(-?)\}\}'
+    r'|\{%(-?)(.*?)(-?)%\}'
+    r'|\{#(-?).*?(-?)#\}',
+    re.S
+)
+
+_EXPR_TOKEN_RE = re.compile(r'''
+    (?P<ws>\s+)
+  | (?P<number>\d+\.\d+|\d+)
+  | (?P<string>'(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*")
+  | (?P<name>[A-Za-z_][A-Za-z0-9_]*)
+  | (?P<op>\*\*|//|==|!=|<=|>=|[-+*/%~|.,:()\[\]{}<>=])
+''', re.X | re.S)
+
+_COMPARE_OPS = ('==', '!=', '<', '>', '<=', '>=')
+
+# Names that must never be treated as template variables
+_CONSTANTS = {
+    'true': True, 'True': True,
+    'false': False, 'False': False,
+    'none': None, 'None': None,
+}
+
+
+def tokenize_template(source: str) -> List[Tuple[str, str, int]]:
+    """Split template source into text, variable and block tokens"""
+    tokens: List[Tuple[str, str, int]] = []
+    pos = 0
+    lineno = 1
+    strip_next = False
+
+    for match in _TAG_RE.finditer(source):
+        text = source[pos:match.start()]
+        if strip_next:
+            text = text.lstrip()
+        if match.group(1) or match.group(4) or match.group(7):
+            text = text.rstrip()
+        if text:
+            tokens.append(('text', text, lineno))
+        lineno += source.count('\n', pos, match.start())
+
+        if match.group(2) is not None:
+            tokens.append(('var', match.group(2).strip(), lineno))
+            strip_next = bool(match.group(3))
+        elif match.group(5) is not None:
+            tokens.append(('block', match.group(5).strip(), lineno))
+            strip_next = bool(match.group(6))
+        else:
+            strip_next = bool(match.group(8))
+
+        lineno += source.count('\n', match.start(), match.end())
+        pos = match.end()
+
+    text = source[pos:]
+    if strip_next:
+        text = text.lstrip()
+    if text:
+        tokens.append(('text', text, lineno))
+    return tokens
+
+
+# ===== EXPRESSION PARSER =====
+
+class ExpressionParser:
+    """Recursive-descent parser for template expressions
+
+    Expressions are parsed into nested tuples such as ``('name', 'user')`` or
+    ``('filter', value, 'upper', args, kwargs)``.
+    """
+
+    def __init__(self, source: str, lineno: int = 0):
+        self.source = source
+        self.lineno = lineno
+        self.tokens: List[Tuple[str, str]] = []
+        pos = 0
+        while pos < len(source):
+            match = _EXPR_TOKEN_RE.match(source, pos)
+            if match is None:
+                raise TemplateSyntaxError(
+                    f"Unexpected character {source[pos]!r} in expression {source!r}", lineno
+                )
+            kind = match.lastgroup
+            if kind != 'ws':
+                self.tokens.append((kind, match.group()))
+            pos = match.end()
+        self.pos = 0
+
+    # Token helpers
+
+    def peek(self, offset: int = 0) -> Tuple[str, str]:
+        index = self.pos + offset
+        if index < len(self.tokens):
+            return self.tokens[index]
+        return ('eof', '')
+
+    def next(self) -> Tuple[str, str]:
+        token = self.peek()
+        self.pos += 1
+        return token
+
+    def at(self, kind: str, value: Optional[str] = None) -> bool:
+        token = self.peek()
+        return token[0] == kind and (value is None or token[1] == value)
+
+    def skip_if(self, kind: str, value: Optional[str] = None) -> bool:
+        if self.at(kind, value):
+            self.pos += 1
+            return True
+        return False
+
+    def expect(self, kind: str, value: Optional[str] = None) -> str:
+        if not self.at(kind, value):
+            found = self.peek()[1] or 'end of expression'
+            wanted = value or kind
+            raise TemplateSyntaxError(
+                f"Expected {wanted!r} but found {found!r} in {self.source!r}", self.lineno
+            )
+        return self.next()[1]
+
+    def at_end(self) -> bool:
+        return self.pos >= len(self.tokens)
+
+    def expect_end(self):
+        if not self.at_end():
+            raise TemplateSyntaxError(
+                f"Unexpected {self.peek()[1]!r} in expression {self.source!r}", self.lineno
+            )
+
+    # Grammar
+
+    def parse_expression(self, with_condexpr: bool = True) -> tuple:
+        if not with_condexpr:
+            return self.parse_or()
+        expr = self.parse_or()
+        while self.skip_if('name', 'if'):
+            test = self.parse_or()
+            otherwise = self.parse_expression() if self.skip_if('name', 'else') else None
+            expr = ('cond', test, expr, otherwise)
+        return expr
+
+    def parse_or(self) -> tuple:
+        left = self.parse_and()
+        while self.skip_if('name', 'or'):
+            left = ('or', left, self.parse_and())
+        return left
+
+    def parse_and(self) -> tuple:
+        left = self.parse_not()
+        while self.skip_if('name', 'and'):
+            left = ('and', left, self.parse_not())
+        return left
+
+    def parse_not(self) -> tuple:
+        if self.skip_if('name', 'not'):
+            return ('not', self.parse_not())
+        return self.parse_compare()
+
+    def parse_compare(self) -> tuple:
+        expr = self.parse_concat()
+        ops = []
+        while True:
+            kind, value = self.peek()
+            if kind == 'op' and value in _COMPARE_OPS:
+                self.next()
+                ops.append((value, self.parse_concat()))
+            elif kind == 'name' and value == 'in':
+                self.next()
+                ops.append(('in', self.parse_concat()))
+            elif kind == 'name' and value == 'not' and self.peek(1) == ('name', 'in'):
+                self.pos += 2
+                ops.append(('not in', self.parse_concat()))
+            elif kind == 'name' and value == 'is':
+                self.next()
+                negated = self.skip_if('name', 'not')
+                name = self.expect('name')
+                args: List[tuple] = []
+                if self.at('op', '('):
+                    args, _ = self.parse_call_args()
+                elif not self.at_end() and self.peek()[0] in ('name', 'number', 'string') \
+                        and self.peek()[1] not in ('and', 'or', 'if', 'else', 'is', 'in', 'not'):
+                    args = [self.parse_unary()]
+                expr = ('test', expr, name, args, negated)
+            else:
+                break
+        if ops:
+            return ('compare', expr, ops)
+        return expr
+
+    def parse_concat(self) -> tuple:
+        parts = [self.parse_math1()]
+        while self.skip_if('op', '~'):
+            parts.append(self.parse_math1())
+        if len(parts) == 1:
+            return parts[0]
+        return ('concat', parts)
+
+    def parse_math1(self) -> tuple:
+        left = self.parse_math2()
+        while self.at('op', '+') or self.at('op', '-'):
+            op = self.next()[1]
+            left = ('binop', op, left, self.parse_math2())
+        return left
+
+    def parse_math2(self) -> tuple:
+        left = self.parse_pow()
+        while self.peek()[0] == 'op' and self.peek()[1] in ('*', '/', '//', '%'):
+            op = self.next()[1]
+            left = ('binop', op, left, self.parse_pow())
+        return left
+
+    def parse_pow(self) -> tuple:
+        left = self.parse_unary()
+        while self.skip_if('op', '**'):
+            left = ('binop', '**', left, self.parse_unary())
+        return left
+
+    def parse_unary(self) -> tuple:
+        if self.at('op', '-') or self.at('op', '+'):
+            op = self.next()[1]
+            return ('unop', op, self.parse_unary())
+        expr = self.parse_postfix(self.parse_primary())
+        while self.skip_if('op', '|'):
+            name = self.expect('name')
+            args: List[tuple] = []
+            kwargs: List[Tuple[str, tuple]] = []
+            if self.at('op', '('):
+                args, kwargs = self.parse_call_args()
+            expr = self.parse_postfix(('filter', expr, name, args, kwargs))
+        return expr
+
+    def parse_primary(self) -> tuple:
+        kind, value = self.next()
+        if kind == 'name':
+            if value in _CONSTANTS:
+                return ('const', _CONSTANTS[value])
+            return ('name', value)
+        if kind == 'number':
+            return ('const', float(value) if '.' in value else int(value))
+        if kind == 'string':
+            return ('const', _unquote(value))
+        if kind == 'op' and value == '(':
+            if self.skip_if('op', ')'):
+                return ('tuple', [])
+            expr = self.parse_expression()
+            if self.at('op', ','):
+                items = [expr]
+                while self.skip_if('op', ','):
+                    if self.at('op', ')'):
+                        break
+                    items.append(self.parse_expression())
+                expr = ('tuple', items)
+            self.expect('op', ')')
+            return expr
+        if kind == 'op' and value == '[':
+            items = []
+            while not self.at('op', ']'):
+                items.append(self.parse_expression())
+                if not self.skip_if('op', ','):
+                    break
+            self.expect('op', ']')
+            return ('list', items)
+        if kind == 'op' and value == '{':
+            pairs = []
+            while not self.at('op', '}'):
+                key = self.parse_expression()
+                self.expect('op', ':')
+                pairs.append((key, self.parse_expression()))
+                if not self.skip_if('op', ','):
+                    break
+            self.expect('op', '}')
+            return ('dict', pairs)
+        raise TemplateSyntaxError(
+            f"Unexpected {value or 'end of expression'!r} in expression {self.source!r}",
+            self.lineno
+        )
+
+    def parse_postfix(self, expr: tuple) -> tuple:
+        while True:
+            if self.skip_if('op', '.'):
+                kind, value = self.next()
+                if kind not in ('name', 'number'):
+                    raise TemplateSyntaxError(
+                        f"Expected attribute name in expression {self.source!r}", self.lineno
+                    )
+                if kind == 'number':
+                    expr = ('item', expr, ('const', int(value)))
+                else:
+                    expr = ('attr', expr, value)
+            elif self.skip_if('op', '['):
+                key = self.parse_expression()
+                self.expect('op', ']')
+                expr = ('item', expr, key)
+            elif self.at('op', '('):
+                args, kwargs = self.parse_call_args()
+                expr = ('call', expr, args, kwargs)
+            else:
+                return expr
+
+    def parse_call_args(self) -> Tuple[List[tuple], List[Tuple[str, tuple]]]:
+        self.expect('op', '(')
+        args: List[tuple] = []
+        kwargs: List[Tuple[str, tuple]] = []
+        while not self.at('op', ')'):
+            if self.peek()[0] == 'name' and self.peek(1) == ('op', '='):
+                name = self.next()[1]
+                self.next()
+                kwargs.append((name, self.parse_expression()))
+            else:
+                if kwargs:
+                    raise TemplateSyntaxError(
+                        f"Positional argument after keyword argument in {self.source!r}",
+                        self.lineno
+                    )
+                args.append(self.parse_expression())
+            if not self.skip_if('op', ','):
+                break
+        self.expect('op', ')')
+        return args, kwargs
+
+    def parse_target(self) -> List[str]:
+        """Parse an assignment target such as ``item`` or ``key, value``"""
+        parenthesized = self.skip_if('op', '(')
+        names = [self.expect('name')]
+        while self.skip_if('op', ','):
+            if not self.at('name'):
+                break
+            names.append(self.expect('name'))
+        if parenthesized:
+            self.expect('op', ')')
+        return names
+
+
+def _unquote(literal: str) -> str:
+    """Decode a quoted string literal"""
+    body = literal[1:-1]
+    if '\\' not in body:
+        return body
+    return body.encode('latin-1', 'backslashreplace').decode('unicode_escape')
+
+
+def parse_expression(source: str, lineno: int = 0) -> tuple:
+    """Parse a standalone template expression"""
+    parser = ExpressionParser(source, lineno)
+    expr = parser.parse_expression()
+    parser.expect_end()
+    return expr
+
+
+def expression_names(expr: Any, names: Optional[Set[str]] = None) -> Set[str]:
+    """Collect every variable name referenced by a parsed expression"""
+    if names is None:
+        names = set()
+    if isinstance(expr, tuple) and expr:
+        if expr[0] == 'name':
+            names.add(expr[1])
+            return names
+        if expr[0] == 'const':
+            return names
+        for part in expr[1:]:
+            expression_names(part, names)
+    elif isinstance(expr, list):
+        for part in expr:
+            expression_names(part, names)
+    return names
+
+
+# ===== TEMPLATE PARSER =====
+
+class Node:
+    """Base class for template syntax tree nodes"""
+
+    __slots__ = ('lineno',)
+
+
+class Text(Node):
+    __slots__ = ('data',)
+
+    def __init__(self, data: str, lineno: int = 0):
+        self.data = data
+        self.lineno = lineno
+
+
+class Output(Node):
+    __slots__ = ('expr',)
+
+    def __init__(self, expr: tuple, lineno: int = 0):
+        self.expr = expr
+        self.lineno = lineno
+
+
+class If(Node):
+    __slots__ = ('branches', 'else_body')
+
+    def __init__(self, branches: List[Tuple[tuple, List[Node]]], else_body: List[Node], lineno: int = 0):
+        self.branches = branches
+        self.else_body = else_body
+        self.lineno = lineno
+
+
+class For(Node):
+    __slots__ = ('target', 'iter', 'condition', 'body', 'else_body')
+
+    def __init__(self, target: List[str], iter: tuple, condition: Optional[tuple],
+                 body: List[Node], else_body: List[Node], lineno: int = 0):
+        self.target = target
+        self.iter = iter
+        self.condition = condition
+        self.body = body
+        self.else_body = else_body
+        self.lineno = lineno
+
+
+class Assign(Node):
+    __slots__ = ('target', 'expr')
+
+    def __init__(self, target: List[str], expr: tuple, lineno: int = 0):
+        self.target = target
+        self.expr = expr
+        self.lineno = lineno
+
+
+class CacheBlock(Node):
+    __slots__ = ('key', 'ttl', 'body')
+
+    def __init__(self, key: tuple, ttl: Optional[tuple], body: List[Node], lineno: int = 0):
+        self.key = key
+        self.ttl = ttl
+        self.body = body
+        self.lineno = lineno
+
+
+class Extends(Node):
+    __slots__ = ('template',)
+
+    def __init__(self, template: str, lineno: int = 0):
+        self.template = template
+        self.lineno = lineno
+
+
+class Block(Node):
+    __slots__ = ('name', 'body', 'parent')
+
+    def __init__(self, name: str, body: List[Node], parent: Optional['Block'] = None, lineno: int = 0):
+        self.name = name
+        self.body = body
+        # The block this one overrides, rendered by {{ super() }}
+        self.parent = parent
+        self.lineno = lineno
+
+
+class Include(Node):
+    __slots__ = ('template', 'ignore_missing')
+
+    def __init__(self, template: str, ignore_missing: bool = False, lineno: int = 0):
+        self.template = template
+        self.ignore_missing = ignore_missing
+        self.lineno = lineno
+
+
+class Scope(Node):
+    """Inlined template body whose {% set %} names do not leak out"""
+
+    __slots__ = ('body',)
+
+    def __init__(self, body: List[Node], lineno: int = 0):
+        self.body = body
+        self.lineno = lineno
+
+
+class TemplateParser:
+    """Builds a node tree from template tokens"""
+
+    def __init__(self, source: str):
+        self.tokens = tokenize_template(source)
+        self.pos = 0
+
+    def parse(self) -> List[Node]:
+        body, end_tag = self.parse_body(())
+        if end_tag is not None:
+            raise TemplateSyntaxError(f"Unexpected {{% {end_tag[0]} %}}", end_tag[2])
+        return body
+
+    def parse_body(self, end_tags: Tuple[str, ...]) -> Tuple[List[Node], Optional[Tuple[str, str, int]]]:
+        """Parse nodes until one of ``end_tags`` is reached
+
+        Returns the nodes and ``(tag, rest, lineno)`` for the closing tag.
+        """
+        nodes: List[Node] = []
+        while self.pos < len(self.tokens):
+            kind, value, lineno = self.tokens[self.pos]
+            self.pos += 1
+            if kind == 'text':
+                nodes.append(Text(value, lineno))
+            elif kind == 'var':
+                nodes.append(Output(parse_expression(value, lineno), lineno))
+            else:
+                tag, _, rest = value.partition(' ')
+                rest = rest.strip()
+                if tag in end_tags:
+                    return nodes, (tag, rest, lineno)
+                handler = self.TAG_HANDLERS.get(tag)
+                if handler is None:
+                    raise TemplateSyntaxError(f"Unknown tag {{% {tag} %}}", lineno)
+                nodes.append(handler(self, rest, lineno))
+        if end_tags:
+            raise TemplateSyntaxError(
+                f"Missing {{% {end_tags[-1]} %}}", self.tokens[-1][2] if self.tokens else 0
+            )
+        return nodes, None
+
+    def parse_if(self, rest: str, lineno: int) -> If:
+        branches = []
+        else_body: List[Node] = []
+        test = parse_expression(rest, lineno)
+        while True:
+            body, (tag, rest, tag_lineno) = self.parse_body(('elif', 'else', 'endif'))
+            branches.append((test, body))
+            if tag == 'elif':
+                test = parse_expression(rest, tag_lineno)
+            elif tag == 'else':
+                else_body, _ = self.parse_body(('endif',))
+                break
+            else:
+                break
+        return If(branches, else_body, lineno)
+
+    def parse_for(self, rest: str, lineno: int) -> For:
+        parser = ExpressionParser(rest, lineno)
+        target = parser.parse_target()
+        parser.expect('name', 'in')
+        iter_expr = parser.parse_expression(with_condexpr=False)
+        condition = None
+        if parser.skip_if('name', 'if'):
+            condition = parser.parse_expression()
+        parser.expect_end()
+
+        body, (tag, _, _) = self.parse_body(('else', 'endfor'))
+        else_body: List[Node] = []
+        if tag == 'else':
+            else_body, _ = self.parse_body(('endfor',))
+        return For(target, iter_expr, condition, body, else_body, lineno)
+
+    def parse_set(self, rest: str, lineno: int) -> Assign:
+        parser = ExpressionParser(rest, lineno)
+        target = parser.parse_target()
+        parser.expect('op', '=')
+        expr = parser.parse_expression()
+        if parser.at('op', ','):
+            items = [expr]
+            while parser.skip_if('op', ','):
+                items.append(parser.parse_expression())
+            expr = ('tuple', items)
+        parser.expect_end()
+        return Assign(target, expr, lineno)
+
+    def parse_cache(self, rest: str, lineno: int) -> CacheBlock:
+        parser = ExpressionParser(rest, lineno)
+        key = parser.parse_expression()
+        ttl = parser.parse_expression() if parser.skip_if('op', ',') else None
+        parser.expect_end()
+        body, _ = self.parse_body(('endcache',))
+        return CacheBlock(key, ttl, body, lineno)
+
+    def parse_template_name(self, parser: 'ExpressionParser', tag: str, lineno: int) -> str:
+        """Parse the constant template name of an extends or include tag"""
+        expr = parser.parse_expression()
+        if expr[0] != 'const' or not isinstance(expr[1], str):
+            raise TemplateSyntaxError(f"{{% {tag} %}} needs a constant template name", lineno)
+        return expr[1]
+
+    def parse_extends(self, rest: str, lineno: int) -> Extends:
+        parser = ExpressionParser(rest, lineno)
+        template = self.parse_template_name(parser, 'extends', lineno)
+        parser.expect_end()
+        return Extends(template, lineno)
+
+    def parse_block(self, rest: str, lineno: int) -> Block:
+        parser = ExpressionParser(rest, lineno)
+        name = parser.expect('name')
+        # Turbo blocks always see enclosing loop variables
+        parser.skip_if('name', 'scoped')
+        parser.expect_end()
+        body, (_, end_name, end_lineno) = self.parse_body(('endblock',))
+        if end_name and end_name != name:
+            raise TemplateSyntaxError(f"{{% endblock {end_name} %}} closes block {name!r}", end_lineno)
+        return Block(name, body, lineno=lineno)
+
+    def parse_include(self, rest: str, lineno: int) -> Include:
+        parser = ExpressionParser(rest, lineno)
+        template = self.parse_template_name(parser, 'include', lineno)
+        ignore_missing = False
+        if parser.skip_if('name', 'ignore'):
+            parser.expect('name', 'missing')
+            ignore_missing = True
+        if parser.skip_if('name', 'with'):
+            parser.expect('name', 'context')
+        elif parser.at('name', 'without'):
+            raise TemplateSyntaxError("{% include ... without context %} is not supported", lineno)
+        parser.expect_end()
+        return Include(template, ignore_missing, lineno)
+
+    # Statement tags and their parsers; any other tag name is a syntax error
+    TAG_HANDLERS: Dict[str, Callable[['TemplateParser', str, int], Node]] = {
+        'if': parse_if,
+        'for': parse_for,
+        'set': parse_set,
+        'cache': parse_cache,
+        'extends': parse_extends,
+        'block': parse_block,
+        'include': parse_include,
+    }
+
+
+# ===== INHERITANCE =====
+
+def _map_bodies(nodes: List[Node], visit: Callable[[Node], Any]) -> List[Node]:
+    """Rebuild a node list, letting visit replace nodes; None means keep and descend"""
+    result: List[Node] = []
+    for node in nodes:
+        replacement = visit(node)
+        if replacement is not None:
+            if isinstance(replacement, list):
+                result.extend(replacement)
+            else:
+                result.append(replacement)
+            continue
+        if isinstance(node, If):
+            node = If([(test, _map_bodies(body, visit)) for test, body in node.branches],
+                      _map_bodies(node.else_body, visit), node.lineno)
+        elif isinstance(node, For):
+            node = For(node.target, node.iter, node.condition, _map_bodies(node.body, visit),
+                       _map_bodies(node.else_body, visit), node.lineno)
+        elif isinstance(node, CacheBlock):
+            node = CacheBlock(node.key, node.ttl, _map_bodies(node.body, visit), node.lineno)
+        elif isinstance(node, Block):
+            node = Block(node.name, _map_bodies(node.body, visit), node.parent, node.lineno)
+        elif isinstance(node, Scope):
+            node = Scope(_map_bodies(node.body, visit), node.lineno)
+        result.append(node)
+    return result
+
+
+def _collect_blocks(nodes: List[Node], blocks: Optional[Dict[str, Block]] = None) -> Dict[str, Block]:
+    """Every block defined in a template, nested ones included"""
+    if blocks is None:
+        blocks = {}
+
+    def visit(node: Node) -> None:
+        if isinstance(node, Block):
+            blocks.setdefault(node.name, node)
+        return None
+
+    _map_bodies(nodes, visit)
+    return blocks
+
+
+def _source_digest(source: Optional[str]) -> str:
+    return '' if source is None else hashlib.sha256(source.encode()).hexdigest()
+
+
+class TemplateResolver:
+    """Flattens {% extends %} and {% include %} into one node tree using a template loader
+
+    ``loader(name)`` returns template source, or None when the template does not exist.
+    """
+
+    def __init__(self, parse: Callable[[str], List[Node]], loader: Optional[Callable[[str], Optional[str]]]):
+        self.parse = parse
+        self.loader = loader
+        # (name, source digest) of every template looked up, in load order;
+        # missing templates get an empty digest so their creation is noticed too
+        self.dependencies: List[Tuple[str, str]] = []
+        self._sources: Dict[str, Optional[str]] = {}
+
+    def load(self, name: str, lineno: int) -> Optional[List[Node]]:
+        if self.loader is None:
+            raise TemplateSyntaxError(f"Cannot load {name!r} without a template loader", lineno)
+        if name not in self._sources:
+            source = self.loader(name)
+            self._sources[name] = source
+            self.dependencies.append((name, _source_digest(source)))
+        source = self._sources[name]
+        return None if source is None else self.parse(source)
+
+    def resolve(self, nodes: List[Node], stack: Tuple[str, ...] = ()) -> List[Node]:
+        """Return nodes with includes inlined and inheritance applied"""
+        nodes = self.expand_includes(nodes, stack)
+        extends = [node for node in nodes if isinstance(node, Extends)]
+        if not extends:
+            return nodes
+        if len(extends) > 1:
+            raise TemplateSyntaxError("A template can only extend one parent", extends[1].lineno)
+
+        parent_name = extends[0].template
+        if parent_name in stack:
+            raise TemplateSyntaxError(f"Circular {{% extends {parent_name!r} %}}", extends[0].lineno)
+        parent_nodes = self.load(parent_name, extends[0].lineno)
+        if parent_nodes is None:
+            raise TemplateNotFound(parent_name, extends[0].lineno)
+        layout = self.resolve(parent_nodes, stack + (parent_name,))
+
+        overrides = _collect_blocks(nodes)
+
+        def override(node: Node) -> Optional[Node]:
+            if isinstance(node, Block) and node.name in overrides and overrides[node.name] is not node:
+                return Block(node.name, overrides[node.name].body, node, node.lineno)
+            return None
+
+        # Only top-level {% set %} runs outside the child's blocks
+        assignments = [node for node in nodes if isinstance(node, Assign)]
+        return assignments + _map_bodies(layout, override)
+
+    def expand_includes(self, nodes: List[Node], stack: Tuple[str, ...]) -> List[Node]:
+        def include(node: Node) -> Optional[Any]:
+            if not isinstance(node, Include):
+                return None
+            if node.template in stack:
+                raise TemplateSyntaxError(f"Circular {{% include {node.template!r} %}}", node.lineno)
+            included = self.load(node.template, node.lineno)
+            if included is None:
+                if node.ignore_missing:
+                    return []
+                # Like Jinja, a missing include only fails when it is reached
+                return MissingTemplate(node.template, node.lineno)
+            return Scope(self.resolve(included, stack + (node.template,)), node.lineno)
+
+        return _map_bodies(nodes, include)
+
+
+class MissingTemplate(Node):
+    __slots__ = ('template',)
+
+    def __init__(self, template: str, lineno: int = 0):
+        self.template = template
+        self.lineno = lineno
+
+
+# ===== CODE GENERATOR =====
+
+_BINOPS = {'+', '-', '*', '/', '//', '%', '**'}
+
+
+def _set_targets(nodes: List[Node], names: Optional[List[str]] = None) -> List[str]:
+    """Names assigned by ``{% set %}`` in a scope, not descending into loops"""
+    if names is None:
+        names = []
+    for node in nodes:
+        if isinstance(node, Assign):
+            for name in node.target:
+                if name not in names:
+                    names.append(name)
+        elif isinstance(node, If):
+            for _, body in node.branches:
+                _set_targets(body, names)
+            _set_targets(node.else_body, names)
+    return names
+
+
+def _uses_name(nodes: List[Node], name: str) -> bool:
+    """Check whether ``name`` is referenced anywhere in ``nodes``"""
+    for node in nodes:
+        if isinstance(node, Output):
+            if name in expression_names(node.expr):
+                return True
+        elif isinstance(node, Assign):
+            if name in expression_names(node.expr):
+                return True
+        elif isinstance(node, If):
+            for test, body in node.branches:
+                if name in expression_names(test) or _uses_name(body, name):
+                    return True
+            if _uses_name(node.else_body, name):
+                return True
+        elif isinstance(node, For):
+            if name in expression_names(node.iter):
+                return True
+            if node.condition is not None and name in expression_names(node.condition):
+                return True
+            # A nested loop rebinds ``loop`` for its own body
+            if name == 'loop':
+                if _uses_name(node.else_body, name):
+                    return True
+                continue
+            if _uses_name(node.body, name) or _uses_name(node.else_body, name):
+                return True
+        elif isinstance(node, CacheBlock):
+            if name in expression_names(node.key):
+                return True
+            if node.ttl is not None and name in expression_names(node.ttl):
+                return True
+            if _uses_name(node.body, name):
+                return True
+        elif isinstance(node, Block):
+            block: Optional[Block] = node
+            while block is not None:
+                if _uses_name(block.body, name):
+                    return True
+                block = block.parent
+        elif isinstance(node, Scope):
+            if _uses_name(node.body, name):
+                return True
+    return False
+
+
+class CodeGenerator:
+    """Generates the Python source of a template render function"""
+
+    def __init__(self, filters: Dict[str, Callable], tests: Dict[str, Callable],
+                 fragments_enabled: bool = False, autoescape: bool = False):
+        self.filters = filters
+        self.tests = tests
+        self.fragments_enabled = fragments_enabled
+        self.autoescape = autoescape
+        # Open {% cache %} blocks: (scope depth, outer names read inside the block)
+        self.captures: List[Tuple[int, Dict[str, str]]] = []
+        self.loop_identifiers: Set[str] = set()
+        self.lines: List[str] = []
+        self.indent = 1
+        self.scopes: List[Dict[str, str]] = [{}]
+        self.free_names: List[str] = []
+        self.used_filters: Set[str] = set()
+        self.used_tests: Set[str] = set()
+        # (global name, leading constant arguments) of every call to a template global
+        self.call_sites: Set[Tuple[str, tuple]] = set()
+        self.counter = 0
+        self.pending_text: List[str] = []
+        self.blocks: List[Block] = []
+        self.python_source = ''
+
+    # Output helpers
+
+    def write(self, line: str):
+        self.flush_text()
+        self.lines.append('    ' * self.indent + line)
+
+    def write_text(self, text: str):
+        if text:
+            self.pending_text.append(text)
+
+    def flush_text(self):
+        if self.pending_text:
+            text = ''.join(self.pending_text)
+            self.pending_text = []
+            self.lines.append('    ' * self.indent + f'yield {text!r}')
+
+    def next_id(self) -> int:
+        self.counter += 1
+        return self.counter
+
+    # Scope helpers
+
+    def lookup(self, name: str) -> str:
+        for depth in range(len(self.scopes) - 1, -1, -1):
+            if name in self.scopes[depth]:
+                identifier = self.scopes[depth][name]
+                break
+        else:
+            depth = 0
+            identifier = f'c_{name}'
+            self.scopes[0][name] = identifier
+            self.free_names.append(name)
+
+        for capture_depth, captured in self.captures:
+            if depth < capture_depth:
+                captured[name] = identifier
+        return identifier
+
+    # Entry point
+
+    def generate(self, nodes: List[Node]) -> str:
+        for name in _set_targets(nodes):
+            self.lookup(name)
+        self.visit_body(nodes)
+        self.flush_text()
+
+        preamble = [
+            f"    c_{name} = ctx[{name!r}] if {name!r} in ctx else _globals_get({name!r}, UNDEFINED)"
+            for name in self.free_names
+        ]
+        source = ['def root(ctx):'] + preamble + self.lines
+        # Keep the function a generator even when the template is empty
+        source.append("    if False:\n        yield ''")
+        self.python_source = '\n'.join(source) + '\n'
+        return self.python_source
+
+    # Statements
+
+    def visit_body(self, nodes: List[Node]):
+        for node in nodes:
+            getattr(self, f'visit_{type(node).__name__}')(node)
+
+    def write_block(self, nodes: List[Node]):
+        """Write an indented statement block, padding empty bodies"""
+        self.flush_text()
+        start = len(self.lines)
+        self.indent += 1
+        self.visit_body(nodes)
+        self.flush_text()
+        if len(self.lines) == start:
+            self.lines.append('    ' * self.indent + 'pass')
+        self.indent -= 1
+
+    def visit_Text(self, node: Text):
+        self.write_text(node.data)
+
+    def visit_Output(self, node: Output):
+        if node.expr == ('call', ('name', 'super'), [], []):
+            if not self.blocks or self.blocks[-1].parent is None:
+                raise TemplateSyntaxError("super() outside an overriding block", node.lineno)
+            self.visit_Block(self.blocks[-1].parent)
+            return
+        convert = _escape if self.autoescape else _to_str
+        if node.expr[0] == 'const':
+            self.write_text(convert(node.expr[1]))
+            return
+        self.write(f'yield {convert.__name__}({self.expr(node.expr)})')
+
+    def visit_Assign(self, node: Assign):
+        value = self.expr(node.expr)
+        targets = [self.lookup(name) for name in node.target]
+        self.write(f"{', '.join(targets)} = {value}")
+
+    def visit_If(self, node: If):
+        for index, (test, body) in enumerate(node.branches):
+            keyword = 'if' if index == 0 else 'elif'
+            self.write(f'{keyword} {self.expr(test)}:')
+            self.write_block(body)
+        if node.else_body:
+            self.write('else:')
+            self.write_block(node.else_body)
+
+    def visit_For(self, node: For):
+        loop_id = self.next_id()
+        iter_source = self.expr(node.iter)
+
+        scope: Dict[str, str] = {}
+        for name in node.target:
+            scope[name] = f'l{loop_id}_{name}'
+        uses_loop = _uses_name(node.body, 'loop')
+        if uses_loop:
+            scope['loop'] = f'l{loop_id}_loop'
+            self.loop_identifiers.add(scope['loop'])
+
+        # Names assigned inside the loop start from their outer value
+        set_inits = []
+        for name in _set_targets(node.body):
+            if name not in scope:
+                set_inits.append((f'l{loop_id}_{name}', self.lookup(name)))
+                scope[name] = f'l{loop_id}_{name}'
+
+        target_ids = [scope[name] for name in node.target]
+        target = ', '.join(target_ids) if len(target_ids) > 1 else target_ids[0]
+        source = f'_iter({iter_source})'
+
+        self.scopes.append(scope)
+        if node.condition is not None:
+            condition = self.expr(node.condition)
+            source = f'({target} for {target} in {source} if {condition})'
+        self.scopes.pop()
+
+        else_flag = f'l{loop_id}_empty'
+        if node.else_body:
+            self.write(f'{else_flag} = True')
+        if uses_loop:
+            seq = f'l{loop_id}_seq'
+            self.write(f'{seq} = list({source})')
+            self.write(f'{scope["loop"]} = LoopContext(len({seq}))')
+            self.write(f'for {scope["loop"]}.index0, ({target}) in enumerate({seq}):')
+        else:
+            self.write(f'for {target} in {source}:')
+
+        self.scopes.append(scope)
+        self.indent += 1
+        if node.else_body:
+            self.write(f'{else_flag} = False')
+        for identifier, outer in set_inits:
+            self.write(f'{identifier} = {outer}')
+        self.indent -= 1
+        self.write_block(node.body)
+        self.scopes.pop()
+
+        if node.else_body:
+            self.write(f'if {else_flag}:')
+            self.write_block(node.else_body)
+
+    def visit_Scope(self, node: Scope):
+        # Names set inside start from their outer value and stay local
+        prefix = f's{self.next_id()}'
+        scope: Dict[str, str] = {}
+        for name in _set_targets(node.body):
+            self.write(f'{prefix}_{name} = {self.lookup(name)}')
+            scope[name] = f'{prefix}_{name}'
+        self.scopes.append(scope)
+        self.visit_body(node.body)
+        self.scopes.pop()
+
+    def visit_Block(self, node: Block):
+        self.blocks.append(node)
+        self.visit_Scope(Scope(node.body, node.lineno))
+        self.blocks.pop()
+
+    def visit_MissingTemplate(self, node: MissingTemplate):
+        self.write(f'raise TemplateNotFound({node.template!r})')
+
+    def visit_Extends(self, node: Extends):
+        raise TemplateSyntaxError("{% extends %} must be resolved before code generation", node.lineno)
+
+    def visit_Include(self, node: Include):
+        raise TemplateSyntaxError("{% include %} must be resolved before code generation", node.lineno)
+
+    def visit_CacheBlock(self, node: CacheBlock):
+        if not self.fragments_enabled:
+            self.visit_body(node.body)
+            return
+
+        prefix = f'k{self.next_id()}'
+        key_source = self.expr(node.key)
+        ttl_source = self.expr(node.ttl) if node.ttl is not None else 'None'
+
+        # The block renders in a nested function so its output can be captured
+        captured: Dict[str, str] = {}
+        scope: Dict[str, str] = {}
+        self.captures.append((len(self.scopes), captured))
+        set_inits = []
+        for name in _set_targets(node.body):
+            set_inits.append((f'{prefix}_{name}', self.lookup(name)))
+            scope[name] = f'{prefix}_{name}'
+
+        self.write(f'def {prefix}_render():')
+        start = len(self.lines)
+        self.scopes.append(scope)
+        self.indent += 1
+        for identifier, outer in set_inits:
+            self.write(f'{identifier} = {outer}')
+        self.indent -= 1
+        self.write_block(node.body)
+        self.scopes.pop()
+        self.captures.pop()
+
+        # Identical block bodies share entries; different bodies never collide
+        body_hash = hashlib.blake2b(
+            '\n'.join(self.lines[start:]).encode(), digest_size=8
+        ).hexdigest()
+
+        variables = []
+        for name, identifier in sorted(captured.items()):
+            if identifier in self.loop_identifiers:
+                identifier = f'({identifier}.index0, {identifier}.length)'
+            variables.append(f'{name!r}: {identifier}')
+
+        self.write(f"{prefix}_key = {body_hash + ':'!r} + _to_str({key_source})")
+        self.write(f"{prefix}_vars = {{{', '.join(variables)}}}")
+        self.write(f'{prefix}_out = _fragments.get_fragment({prefix}_key, {prefix}_vars)')
+        self.write(f'if {prefix}_out is None:')
+        self.indent += 1
+        # set_fragment also ends the fragment's recording, so it runs when the body raises too
+        self.write('try:')
+        self.indent += 1
+        self.write(f"{prefix}_out = ''.join({prefix}_render())")
+        self.indent -= 1
+        self.write('finally:')
+        self.indent += 1
+        self.write(f'_fragments.set_fragment({prefix}_key, {prefix}_vars, {prefix}_out, {ttl_source})')
+        self.indent -= 2
+        self.write(f'yield {prefix}_out')
+
+    # Expressions
+
+    def expr(self, node: tuple) -> str:
+        kind = node[0]
+        if kind == 'name':
+            return self.lookup(node[1])
+        if kind == 'const':
+            return repr(node[1])
+        if kind == 'attr':
+            return f'_attr({self.expr(node[1])}, {node[2]!r})'
+        if kind == 'item':
+            return f'_item({self.expr(node[1])}, {self.expr(node[2])})'
+        if kind == 'call':
+            func = self.expr(node[1])
+            if node[1][0] == 'name' and func == f'c_{node[1][1]}':
+                self.call_sites.add((node[1][1], _constant_prefix(node[2])))
+            return f'{func}({self.call_args(node[2], node[3])})'
+        if kind == 'filter':
+            _, value, name, args, kwargs = node
+            if name not in self.filters:
+                raise TemplateSyntaxError(f"Unknown filter {name!r}")
+            self.used_filters.add(name)
+            arguments = self.call_args([value] + list(args), kwargs)
+            return f'f_{name}({arguments})'
+        if kind == 'test':
+            _, value, name, args, negated = node
+            if name not in self.tests:
+                raise TemplateSyntaxError(f"Unknown test {name!r}")
+            self.used_tests.add(name)
+            call = f't_{name}({self.call_args([value] + list(args), [])})'
+            return f'(not {call})' if negated else call
+        if kind == 'binop':
+            return f'({self.expr(node[2])} {node[1]} {self.expr(node[3])})'
+        if kind == 'unop':
+            return f'({node[1]}{self.expr(node[2])})'
+        if kind == 'concat':
+            return '(' + ' + '.join(f'_to_str({self.expr(part)})' for part in node[1]) + ')'
+        if kind == 'compare':
+            parts = [self.expr(node[1])]
+            for op, operand in node[2]:
+                parts.append(op)
+                parts.append(self.expr(operand))
+            return '(' + ' '.join(parts) + ')'
+        if kind == 'and':
+            return f'({self.expr(node[1])} and {self.expr(node[2])})'
+        if kind == 'or':
+            return f'({self.expr(node[1])} or {self.expr(node[2])})'
+        if kind == 'not':
+            return f'(not {self.expr(node[1])})'
+        if kind == 'cond':
+            otherwise = self.expr(node[3]) if node[3] is not None else 'UNDEFINED'
+            return f'({self.expr(node[2])} if {self.expr(node[1])} else {otherwise})'
+        if kind == 'list':
+            return '[' + ', '.join(self.expr(item) for item in node[1]) + ']'
+        if kind == 'tuple':
+            items = [self.expr(item) for item in node[1]]
+            return '(' + ', '.join(items) + (',)' if len(items) == 1 else ')')
+        if kind == 'dict':
+            return '{' + ', '.join(f'{self.expr(k)}: {self.expr(v)}' for k, v in node[1]) + '}'
+        raise TemplateSyntaxError(f"Unsupported expression {kind!r}")
+
+    def call_args(self, args: List[tuple], kwargs: List[Tuple[str, tuple]]) -> str:
+        parts = [self.expr(arg) for arg in args]
+        parts.extend(f'{name}={self.expr(value)}' for name, value in kwargs)
+        return ', '.join(parts)
+
+
+def _constant_prefix(args: List[tuple]) -> tuple:
+    """Values of the leading arguments that are plain constants"""
+    prefix = []
+    for arg in args:
+        if arg[0] != 'const' or not isinstance(arg[1], (str, int, float, bool, type(None))):
+            break
+        prefix.append(arg[1])
+    return tuple(prefix)
+
+
+# ===== COMPILED TEMPLATES =====
+
+# Bump whenever the generated code changes shape, so stale artifacts are recompiled
+ARTIFACT_VERSION = 4
+
+class CompiledTemplate:
+    """A template compiled into a native Python render function"""
+
+    __slots__ = ('template_hash', 'source', 'python_source', 'referenced_names', 'artifact',
+                 'dependencies', 'call_sites', 'used_filters', 'used_tests', '_root')
+
+    def __init__(self, root: Callable, python_source: str, referenced_names: Tuple[str, ...],
+                 source: str = '', template_hash: Optional[str] = None, artifact: Optional[bytes] = None,
+                 dependencies: Tuple[Tuple[str, str], ...] = (),
+                 call_sites: Tuple[Tuple[str, tuple], ...] = (),
+                 used_filters: Tuple[str, ...] = (), used_tests: Tuple[str, ...] = ()):
+        self._root = root
+        self.python_source = python_source
+        self.referenced_names = referenced_names
+        self.source = source
+        self.template_hash = template_hash
+        # Serialized form accepted by TemplateCompiler.load
+        self.artifact = artifact
+        # (name, sha256 of source) of every extended or included template
+        self.dependencies = dependencies
+        # (global name, leading constant arguments) of the template's calls, found at compile time
+        self.call_sites = call_sites
+        # Filters and tests the template applies, bound from the compiler that loaded it
+        self.used_filters = used_filters
+        self.used_tests = used_tests
+
+    @property
+    def dependency_names(self) -> Tuple[str, ...]:
+        return tuple(name for name, _ in self.dependencies)
+
+    @property
+    def cache_namespace(self) -> str:
+        """Prefix for cached output, covering the template and everything it pulls in"""
+        if not self.dependencies:
+            return self.template_hash or ''
+        digest = hashlib.sha256(repr(self.dependencies).encode()).hexdigest()
+        return f"{self.template_hash}.{digest[:16]}"
+
+    def generate(self, context: Optional[Dict[str, Any]] = None) -> Iterator[str]:
+        """Yield the rendered output in chunks"""
+        return self._root(context or {})
+
+    def render(self, context: Optional[Dict[str, Any]] = None) -> str:
+        """Render the template to a string in a single pass"""
+        return ''.join(self._root(context or {}))
+
+    __call__ = render
+
+
+class TemplateCompiler:
+    """
+    Compiles turbo templates into Python functions
+    Supports variables, dotted access, filters, tests, for/if/set blocks,
+    {% cache %} fragment blocks and {% extends %}/{% block %}/{% include %},
+    which are flattened into the same render function at compile time
+    """
+
+    def __init__(self, globals: Optional[Dict[str, Any]] = None,
+                 filters: Optional[Dict[str, Callable]] = None,
+                 tests: Optional[Dict[str, Callable]] = None,
+                 fragment_cache: Any = None,
+                 loader: Optional[Callable[[str], Optional[str]]] = None):
+        # Object providing get_fragment(key, variables) and
+        # set_fragment(key, variables, content, ttl) for {% cache %} blocks;
+        # content is None when the block raised, so only its bookkeeping is undone
+        self.fragment_cache = fragment_cache
+        # Returns the source of a named template for extends/include, or None
+        self.loader = loader
+        self.globals: Dict[str, Any] = dict(DEFAULT_GLOBALS)
+        self.filters: Dict[str, Callable] = dict(DEFAULT_FILTERS)
+        self.tests: Dict[str, Callable] = dict(DEFAULT_TESTS)
+        if globals:
+            self.globals.update(globals)
+        if filters:
+            self.filters.update(filters)
+        if tests:
+            self.tests.update(tests)
+
+    def add_filter(self, name: str, func: Callable):
+        """Register a template filter"""
+        self.filters[name] = func
+
+    def add_test(self, name: str, func: Callable):
+        """Register a template test"""
+        self.tests[name] = func
+
+    def add_global(self, name: str, value: Any):
+        """Register a template global"""
+        self.globals[name] = value
+
+    def parse(self, source: str) -> List[Node]:
+        """Parse template source into a node tree"""
+        return TemplateParser(source).parse()
+
+    def resolve(self, nodes: List[Node], loader: Optional[Callable[[str], Optional[str]]] = None,
+                name: Optional[str] = None) -> Tuple[List[Node], Tuple[Tuple[str, str], ...]]:
+        """Flatten inheritance and includes, returning the nodes and their dependencies"""
+        resolver = TemplateResolver(self.parse, loader or self.loader)
+        nodes = resolver.resolve(nodes, (name,) if name else ())
+        return nodes, tuple(resolver.dependencies)
+
+    def generate(self, nodes: List[Node], autoescape: bool = False) -> CodeGenerator:
+        """Generate Python source for a parsed template"""
+        generator = CodeGenerator(self.filters, self.tests, self.fragment_cache is not None, autoescape)
+        generator.generate(self.resolve(nodes)[0])
+        return generator
+
+    def compile(self, source: str, template_hash: Optional[str] = None, autoescape: bool = False,
+                loader: Optional[Callable[[str], Optional[str]]] = None,
+                name: Optional[str] = None) -> CompiledTemplate:
+        """Compile template source into a :class:`CompiledTemplate`
+
+        With ``autoescape`` every output is HTML-escaped unless marked safe, as Jinja does.
+        ``loader`` resolves extended and included templates; ``name`` guards against self-reference.
+        """
+        artifact = self.dump(source, template_hash, autoescape, loader=loader, name=name)
+        # The dependencies were read just now, so there is nothing to re-check
+        return self.load(artifact, verify=False)
+
+    def dump(self, source: str, template_hash: Optional[str] = None, autoescape: bool = False,
+             fragments: Optional[bool] = None, loader: Optional[Callable[[str], Optional[str]]] = None,
+             name: Optional[str] = None) -> bytes:
+        """Compile template source to a serialized artifact without loading it
+
+        ``fragments`` overrides whether ``{% cache %}`` blocks are compiled for a fragment cache.
+        """
+        if fragments is None:
+            fragments = self.fragment_cache is not None
+        nodes, dependencies = self.resolve(self.parse(source), loader, name)
+        generator = CodeGenerator(self.filters, self.tests, fragments, autoescape)
+        generator.generate(nodes)
+        code = compile(generator.python_source, f'<turbo:{template_hash or "template"}>', 'exec')
+        return marshal.dumps((
+            ARTIFACT_VERSION,
+            importlib.util.MAGIC_NUMBER,
+            fragments,
+            code,
+            generator.python_source,
+            tuple(generator.free_names),
+            tuple(sorted(generator.used_filters)),
+            tuple(sorted(generator.used_tests)),
+            source,
+            template_hash,
+            dependencies,
+            tuple(sorted(generator.call_sites, key=repr)),
+        ))
+
+    def is_current(self, dependencies: Tuple[Tuple[str, str], ...],
+                   loader: Optional[Callable[[str], Optional[str]]] = None) -> bool:
+        """Whether every extended or included template still has the recorded source"""
+        loader = loader or self.loader
+        if loader is None:
+            return not dependencies
+        return all(_source_digest(loader(name)) == digest for name, digest in dependencies)
+
+    def load(self, artifact: bytes, loader: Optional[Callable[[str], Optional[str]]] = None,
+             verify: bool = True) -> CompiledTemplate:
+        """Load an artifact produced by :meth:`dump`, binding this compiler's filters and globals
+
+        Raises ``ValueError`` when the artifact was built by another compiler or Python version,
+        or when a template it extends or includes has changed since (checked through ``loader``).
+        """
+        try:
+            (version, magic, fragments, code, python_source, referenced_names,
+             used_filters, used_tests, source, template_hash, dependencies,
+             call_sites) = marshal.loads(artifact)
+        except (EOFError, TypeError, ValueError) as e:
+            raise ValueError(f"Corrupt template artifact: {e}")
+        if version != ARTIFACT_VERSION or magic != importlib.util.MAGIC_NUMBER:
+            raise ValueError("Template artifact was built by a different compiler")
+        if fragments != (self.fragment_cache is not None):
+            raise ValueError("Template artifact fragment caching does not match")
+        if verify and not self.is_current(dependencies, loader):
+            raise ValueError("Template artifact was built from extended or included templates that changed")
+
+        namespace: Dict[str, Any] = {
+            'UNDEFINED': UNDEFINED,
+            'LoopContext': LoopContext,
+            '_attr': _attr,
+            '_item': _item,
+            '_iter': _iter,
+            '_to_str': _to_str,
+            '_escape': _escape,
+            'TemplateNotFound': TemplateNotFound,
+            '_globals_get': self.globals.get,
+            '_fragments': self.fragment_cache,
+        }
+        for name in used_filters:
+            if name not in self.filters:
+                raise ValueError(f"Template artifact needs unknown filter {name!r}")
+            namespace[f'f_{name}'] = self.filters[name]
+        for name in used_tests:
+            if name not in self.tests:
+                raise ValueError(f"Template artifact needs unknown test {name!r}")
+            namespace[f't_{name}'] = self.tests[name]
+
+        exec(code, namespace)
+        return CompiledTemplate(
+            namespace['root'],
+            python_source,
+            referenced_names,
+            source,
+            template_hash,
+            artifact,
+            dependencies,
+            call_sites,
+            used_filters,
+            used_tests
+        )